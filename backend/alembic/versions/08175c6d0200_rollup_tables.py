@@ -0,0 +1,103 @@
+"""rollup tables
+
+Revision ID: 08175c6d0200
+Revises: 88e3b53a7920
+Create Date: 2026-10-19 13:36:02.915427
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '08175c6d0200'
+down_revision: Union[str, Sequence[str], None] = '88e3b53a7920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'rollup_title_years',
+        sa.Column('start_year', sa.Integer(), nullable=False),
+        sa.Column('title_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('start_year', 'title_type'),
+    )
+    op.create_table(
+        'rollup_title_genres',
+        sa.Column('start_year', sa.Integer(), nullable=False),
+        sa.Column('title_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('genre', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('start_year', 'title_type', 'genre'),
+    )
+    op.create_table(
+        'rollup_runtimes',
+        sa.Column('title_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('runtime_bucket', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('title_type', 'runtime_bucket'),
+    )
+    op.create_table(
+        'rollup_ratings',
+        sa.Column('rating_tenths', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('rating_tenths'),
+    )
+    op.create_table(
+        'rollup_professions',
+        sa.Column('profession', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('profession'),
+    )
+    op.execute("""
+        INSERT INTO rollup_title_years (start_year, title_type, total)
+        SELECT COALESCE(start_year, 0), title_type, COUNT(*)
+        FROM titles
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        INSERT INTO rollup_title_genres (start_year, title_type, genre, total)
+        SELECT start_year, title_type, genre, COUNT(*)
+        FROM (
+            SELECT
+                COALESCE(start_year, 0) AS start_year,
+                title_type,
+                unnest(COALESCE(NULLIF(genres, '{}'), ARRAY[''])) AS genre
+            FROM titles
+        ) k
+        GROUP BY 1, 2, 3
+    """)
+    op.execute("""
+        INSERT INTO rollup_runtimes (title_type, runtime_bucket, total)
+        SELECT title_type, runtime_minutes / 10 * 10, COUNT(*)
+        FROM titles
+        WHERE runtime_minutes IS NOT NULL
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        INSERT INTO rollup_ratings (rating_tenths, total)
+        SELECT (round(average_rating::numeric, 1) * 10)::int, COUNT(*)
+        FROM title_ratings
+        GROUP BY 1
+    """)
+    op.execute("""
+        INSERT INTO rollup_professions (profession, total)
+        SELECT profession, COUNT(*)
+        FROM (SELECT unnest(primary_professions) AS profession FROM people) k
+        GROUP BY 1
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rollup_professions')
+    op.drop_table('rollup_ratings')
+    op.drop_table('rollup_runtimes')
+    op.drop_table('rollup_title_genres')
+    op.drop_table('rollup_title_years')
@@ -0,0 +1,123 @@
+"""dictionary encode low cardinality columns
+
+Revision ID: 4f6e0b9d2c1a
+Revises: d3a91f6c27b4
+Create Date: 2026-10-19 17:24:38.190266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f6e0b9d2c1a'
+down_revision: Union[str, Sequence[str], None] = 'd3a91f6c27b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table, column, dictionary domain, array column
+CODED_COLUMNS: tuple[tuple[str, str, str, bool], ...] = (
+    ('titles', 'title_type', 'title_type', False),
+    ('titles', 'genres', 'genre', True),
+    ('people', 'primary_professions', 'profession', True),
+    ('title_principals', 'category', 'category', False),
+    ('title_akas', 'region', 'region', False),
+    ('title_akas', 'language', 'language', False),
+    ('title_akas', 'types', 'aka_type', True),
+    ('title_akas', 'attributes', 'aka_attribute', True),
+    ('filmography', 'category', 'category', False),
+    ('filmography', 'categories', 'category', True),
+    ('filmography', 'title_type', 'title_type', False),
+)
+
+
+def _alter_columns(text_to_code: bool) -> None:
+    """rewrite each table once, converting all its coded columns"""
+    tables: dict[str, list[str]] = {}
+    for table_name, column, domain, is_array in CODED_COLUMNS:
+        if text_to_code:
+            column_type = 'SMALLINT[]' if is_array else 'SMALLINT'
+            function = 'pg_temp.dictionary_encode_array' if is_array else 'pg_temp.dictionary_encode'
+        else:
+            column_type = 'TEXT[]' if is_array else 'VARCHAR'
+            function = 'pg_temp.dictionary_decode_array' if is_array else 'pg_temp.dictionary_decode'
+
+        tables.setdefault(table_name, []).append(
+            f"ALTER COLUMN {column} TYPE {column_type} USING {function}('{domain}', {column})"
+        )
+
+    for table_name, alterations in tables.items():
+        op.execute(f'ALTER TABLE {table_name} ' + ', '.join(alterations))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'dictionary_codes',
+        sa.Column('domain', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('code', sa.SmallInteger(), autoincrement=False, nullable=False),
+        sa.Column('value', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.PrimaryKeyConstraint('domain', 'code'),
+    )
+    op.create_index('ix_dictionary_codes_domain_value', 'dictionary_codes', ['domain', 'value'], unique=True)
+
+    seen: set[str] = set()
+    for table_name, column, domain, is_array in CODED_COLUMNS:
+        if domain in seen or table_name == 'filmography':
+            continue
+        seen.add(domain)
+        values = f'unnest({column})' if is_array else column
+        op.execute(f"""
+            INSERT INTO dictionary_codes (domain, code, value)
+            SELECT '{domain}', row_number() OVER (ORDER BY value), value
+            FROM (SELECT DISTINCT {values} AS value FROM {table_name}) v
+            WHERE value IS NOT NULL
+            """)
+
+    op.execute("""
+        CREATE FUNCTION pg_temp.dictionary_encode(text, text) RETURNS smallint
+        LANGUAGE sql STABLE STRICT
+        AS $$ SELECT code FROM dictionary_codes WHERE domain = $1 AND value = $2 $$
+        """)
+    op.execute("""
+        CREATE FUNCTION pg_temp.dictionary_encode_array(text, text[]) RETURNS smallint[]
+        LANGUAGE sql STABLE STRICT
+        AS $$
+            SELECT ARRAY(
+                SELECT d.code
+                FROM unnest($2) WITH ORDINALITY AS e(value, position)
+                JOIN dictionary_codes d ON d.domain = $1 AND d.value = e.value
+                ORDER BY e.position
+            )
+        $$
+        """)
+    _alter_columns(text_to_code=True)
+    for table_name in ('titles', 'people', 'title_principals', 'title_akas', 'filmography'):
+        op.execute(f'ANALYZE {table_name}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        CREATE FUNCTION pg_temp.dictionary_decode(text, smallint) RETURNS text
+        LANGUAGE sql STABLE STRICT
+        AS $$ SELECT value FROM dictionary_codes WHERE domain = $1 AND code = $2 $$
+        """)
+    op.execute("""
+        CREATE FUNCTION pg_temp.dictionary_decode_array(text, smallint[]) RETURNS text[]
+        LANGUAGE sql STABLE STRICT
+        AS $$
+            SELECT ARRAY(
+                SELECT d.value
+                FROM unnest($2) WITH ORDINALITY AS e(code, position)
+                JOIN dictionary_codes d ON d.domain = $1 AND d.code = e.code
+                ORDER BY e.position
+            )
+        $$
+        """)
+    _alter_columns(text_to_code=False)
+    op.drop_index('ix_dictionary_codes_domain_value', table_name='dictionary_codes')
+    op.drop_table('dictionary_codes')
@@ -0,0 +1,62 @@
+"""collaborators read model
+
+Revision ID: 5a160c0c4c16
+Revises: 8ddb879809f2
+Create Date: 2026-10-19 11:21:54.630915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a160c0c4c16'
+down_revision: Union[str, Sequence[str], None] = '8ddb879809f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'collaborators',
+        sa.Column('nconst', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('collaborator_nconst', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('shared_titles', sa.Integer(), nullable=False),
+        sa.Column('last_shared_year', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('nconst', 'rank'),
+    )
+    op.execute("""
+        INSERT INTO collaborators (nconst, rank, collaborator_nconst, shared_titles, last_shared_year)
+        WITH pairs AS (
+            SELECT
+                f.nconst,
+                p.nconst AS collaborator_nconst,
+                COUNT(DISTINCT f.tconst) AS shared_titles,
+                MAX(f.start_year) AS last_shared_year
+            FROM filmography f
+            JOIN title_principals p ON p.tconst = f.tconst AND p.nconst <> f.nconst
+            GROUP BY f.nconst, p.nconst
+        ),
+        ranked AS (
+            SELECT
+                *,
+                row_number() OVER (
+                    PARTITION BY nconst
+                    ORDER BY shared_titles DESC, last_shared_year DESC NULLS LAST, collaborator_nconst
+                ) AS rank
+            FROM pairs
+        )
+        SELECT nconst, rank, collaborator_nconst, shared_titles, last_shared_year
+        FROM ranked
+        WHERE rank <= 50
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('collaborators')
@@ -0,0 +1,38 @@
+"""leaderboards
+
+Revision ID: 88e3b53a7920
+Revises: 8bb55b277bee
+Create Date: 2026-10-19 12:47:36.218840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '88e3b53a7920'
+down_revision: Union[str, Sequence[str], None] = '8bb55b277bee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'leaderboards',
+        sa.Column('genre', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('title_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('decade', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('tconst', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('weighted_rating', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('genre', 'title_type', 'decade', 'rank'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('leaderboards')
@@ -0,0 +1,36 @@
+"""similar titles
+
+Revision ID: 8bb55b277bee
+Revises: 5a160c0c4c16
+Create Date: 2026-10-19 12:08:13.402771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8bb55b277bee'
+down_revision: Union[str, Sequence[str], None] = '5a160c0c4c16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'similar_titles',
+        sa.Column('tconst', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('similar_tconst', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('tconst', 'rank'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('similar_titles')
@@ -0,0 +1,78 @@
+"""filmography read model
+
+Revision ID: 8ddb879809f2
+Revises: c940a5527a43
+Create Date: 2026-10-19 10:03:27.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8ddb879809f2'
+down_revision: Union[str, Sequence[str], None] = 'c940a5527a43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'filmography',
+        sa.Column('nconst', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('tconst', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('ordering', sa.Integer(), nullable=False),
+        sa.Column('category', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('categories', postgresql.ARRAY(sa.TEXT()), nullable=False),
+        sa.Column('job', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('characters', postgresql.ARRAY(sa.TEXT()), nullable=True),
+        sa.Column('title_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('primary_title', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('original_title', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('start_year', sa.Integer(), nullable=True),
+        sa.Column('end_year', sa.Integer(), nullable=True),
+        sa.Column('average_rating', sa.Float(), nullable=True),
+        sa.Column('num_votes', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('nconst', 'tconst'),
+    )
+    op.execute("""
+        INSERT INTO filmography (
+            nconst, tconst, ordering, category, categories, job, characters,
+            title_type, primary_title, original_title, start_year, end_year, average_rating, num_votes
+        )
+        WITH credits AS (
+            SELECT
+                nconst,
+                tconst,
+                MIN(ordering) AS ordering,
+                array_agg(DISTINCT category ORDER BY category) AS categories
+            FROM title_principals
+            GROUP BY nconst, tconst
+        )
+        SELECT
+            c.nconst, c.tconst, c.ordering, p.category, c.categories, p.job, p.characters,
+            t.title_type, t.primary_title, t.original_title, t.start_year, t.end_year, r.average_rating, r.num_votes
+        FROM credits c
+        JOIN title_principals p ON p.tconst = c.tconst AND p.ordering = c.ordering
+        JOIN titles t ON t.tconst = c.tconst
+        LEFT JOIN title_ratings r ON r.tconst = c.tconst
+        ORDER BY c.nconst, t.start_year DESC NULLS LAST, t.primary_title, c.tconst
+    """)
+    op.create_index(
+        'ix_filmography_nconst_start_year',
+        'filmography',
+        ['nconst', sa.text('start_year DESC NULLS LAST'), 'primary_title', 'tconst'],
+        unique=False,
+    )
+    op.execute("ALTER TABLE filmography CLUSTER ON ix_filmography_nconst_start_year")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_filmography_nconst_start_year', table_name='filmography')
+    op.drop_table('filmography')
@@ -0,0 +1,37 @@
+"""drop redundant indexes
+
+Revision ID: a5c2e71f9b38
+Revises: 4f6e0b9d2c1a
+Create Date: 2026-10-19 18:05:52.613907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c2e71f9b38'
+down_revision: Union[str, Sequence[str], None] = '4f6e0b9d2c1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# index, table, column, all covered by the leading primary key column
+REDUNDANT_INDEXES: tuple[tuple[str, str, str], ...] = (
+    ('ix_title_ratings_tconst', 'title_ratings', 'tconst'),
+    ('ix_episodes_tconst', 'episodes', 'tconst'),
+    ('ix_title_principals_tconst', 'title_principals', 'tconst'),
+    ('ix_title_akas_title_id', 'title_akas', 'title_id'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for index_name, table_name, _ in REDUNDANT_INDEXES:
+        op.drop_index(index_name, table_name=table_name, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for index_name, table_name, column in REDUNDANT_INDEXES:
+        op.create_index(index_name, table_name, [column], unique=False)
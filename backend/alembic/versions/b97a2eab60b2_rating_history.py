@@ -0,0 +1,59 @@
+"""rating history
+
+Revision ID: b97a2eab60b2
+Revises: 08175c6d0200
+Create Date: 2026-10-19 14:10:45.772031
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b97a2eab60b2'
+down_revision: Union[str, Sequence[str], None] = '08175c6d0200'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'rating_history',
+        sa.Column('tconst', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('average_rating', sa.Float(), nullable=False),
+        sa.Column('num_votes', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('tconst', 'snapshot_date'),
+        postgresql_partition_by='RANGE (snapshot_date)',
+    )
+    op.create_index(
+        'ix_rating_history_snapshot_date',
+        'rating_history',
+        ['snapshot_date'],
+        unique=False,
+        postgresql_using='brin',
+    )
+
+    # seed the current month with today's ratings as the baseline
+    month = date.today().replace(day=1)
+    next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    op.execute(f"""
+        CREATE TABLE rating_history_{month.year:04d}_{month.month:02d}
+        PARTITION OF rating_history
+        FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')
+    """)
+    op.execute("""
+        INSERT INTO rating_history (tconst, snapshot_date, average_rating, num_votes)
+        SELECT tconst, CURRENT_DATE, average_rating, num_votes
+        FROM title_ratings
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rating_history')
@@ -0,0 +1,73 @@
+"""series seasons summary and episode order index
+
+Revision ID: c940a5527a43
+Revises: 3e0cbadc8330
+Create Date: 2026-10-19 09:12:41.502318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c940a5527a43'
+down_revision: Union[str, Sequence[str], None] = '3e0cbadc8330'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'series_seasons',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('parent_tconst', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('season_number', sa.Integer(), nullable=True),
+        sa.Column('episode_count', sa.Integer(), nullable=False),
+        sa.Column('start_year', sa.Integer(), nullable=True),
+        sa.Column('end_year', sa.Integer(), nullable=True),
+        sa.Column('mean_rating', sa.Float(), nullable=True),
+        sa.Column('total_votes', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_series_seasons_parent_tconst_season_number',
+        'series_seasons',
+        ['parent_tconst', 'season_number'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_episodes_parent_tconst_season_episode',
+        'episodes',
+        ['parent_tconst', 'season_number', 'episode_number', 'tconst'],
+        unique=False,
+    )
+    op.drop_index(op.f('ix_episodes_parent_tconst'), table_name='episodes')
+    op.execute("""
+        INSERT INTO series_seasons (
+            parent_tconst, season_number, episode_count, start_year, end_year, mean_rating, total_votes
+        )
+        SELECT
+            e.parent_tconst,
+            e.season_number,
+            COUNT(*),
+            MIN(t.start_year),
+            MAX(t.start_year),
+            AVG(r.average_rating),
+            COALESCE(SUM(r.num_votes), 0)
+        FROM episodes e
+        JOIN titles t ON t.tconst = e.tconst
+        LEFT JOIN title_ratings r ON r.tconst = e.tconst
+        GROUP BY e.parent_tconst, e.season_number
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_episodes_parent_tconst'), 'episodes', ['parent_tconst'], unique=False)
+    op.drop_index('ix_episodes_parent_tconst_season_episode', table_name='episodes')
+    op.drop_index('ix_series_seasons_parent_tconst_season_number', table_name='series_seasons')
+    op.drop_table('series_seasons')
@@ -0,0 +1,68 @@
+"""hash partition principals and akas
+
+Revision ID: d3a91f6c27b4
+Revises: b97a2eab60b2
+Create Date: 2026-10-19 16:02:11.408513
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a91f6c27b4'
+down_revision: Union[str, Sequence[str], None] = 'b97a2eab60b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 16
+
+
+def _rebuild_table(table_name: str, partition_key: str | None) -> None:
+    """copy rows into a new table, hash partitioned by partition_key or plain, and swap it in"""
+    new_table = f'{table_name}_rebuild'
+    if partition_key:
+        op.execute(
+            f'CREATE TABLE {new_table} (LIKE {table_name} INCLUDING DEFAULTS) PARTITION BY HASH ({partition_key})'
+        )
+        for remainder in range(PARTITIONS):
+            op.execute(
+                f'CREATE TABLE {table_name}_p{remainder} PARTITION OF {new_table} '
+                f'FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})'
+            )
+    else:
+        op.execute(f'CREATE TABLE {new_table} (LIKE {table_name} INCLUDING DEFAULTS)')
+
+    op.execute(f'INSERT INTO {new_table} SELECT * FROM {table_name}')
+    op.drop_table(table_name)
+    op.rename_table(new_table, table_name)
+
+
+def _create_constraints() -> None:
+    op.create_primary_key('title_principals_pkey', 'title_principals', ['tconst', 'ordering'])
+    op.create_foreign_key('title_principals_tconst_fkey', 'title_principals', 'titles', ['tconst'], ['tconst'])
+    op.create_foreign_key('title_principals_nconst_fkey', 'title_principals', 'people', ['nconst'], ['nconst'])
+    op.create_index(op.f('ix_title_principals_category'), 'title_principals', ['category'], unique=False)
+    op.create_index(op.f('ix_title_principals_nconst'), 'title_principals', ['nconst'], unique=False)
+    op.create_index(op.f('ix_title_principals_tconst'), 'title_principals', ['tconst'], unique=False)
+
+    op.create_primary_key('title_akas_pkey', 'title_akas', ['title_id', 'ordering'])
+    op.create_foreign_key('title_akas_title_id_fkey', 'title_akas', 'titles', ['title_id'], ['tconst'])
+    op.create_index(op.f('ix_title_akas_title_id'), 'title_akas', ['title_id'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rebuild_table('title_principals', 'tconst')
+    _rebuild_table('title_akas', 'title_id')
+    _create_constraints()
+    op.execute('ANALYZE title_principals')
+    op.execute('ANALYZE title_akas')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rebuild_table('title_principals', None)
+    _rebuild_table('title_akas', None)
+    _create_constraints()
@@ -0,0 +1,28 @@
+"""import task row count
+
+Revision ID: e6b1d49c8a27
+Revises: a5c2e71f9b38
+Create Date: 2026-10-19 18:41:07.328514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1d49c8a27'
+down_revision: Union[str, Sequence[str], None] = 'a5c2e71f9b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('import_tasks', sa.Column('row_count', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('import_tasks', 'row_count')
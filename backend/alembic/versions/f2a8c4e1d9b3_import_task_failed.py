@@ -0,0 +1,30 @@
+"""import task failed
+
+Revision ID: f2a8c4e1d9b3
+Revises: e6b1d49c8a27
+Create Date: 2026-10-19 21:12:44.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8c4e1d9b3'
+down_revision: Union[str, Sequence[str], None] = 'e6b1d49c8a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'import_tasks', sa.Column('failed', sa.Boolean(), server_default=sa.text('false'), nullable=False)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('import_tasks', 'failed')
@@ -0,0 +1,167 @@
+"""concurrency limits and rate limits for expensive read routes"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from os import environ
+from time import monotonic
+from typing import Any, AsyncGenerator, AsyncIterator, Callable
+
+from fastapi import HTTPException, Request
+from metrics import metrics
+
+ADMISSION_WAIT_SECONDS = float(environ.get("ADMISSION_WAIT_SECONDS", "2"))
+ADMISSION_QUEUE_SIZE = int(environ.get("ADMISSION_QUEUE_SIZE", "32"))
+ADMISSION_RATE_PER_SECOND = float(environ.get("ADMISSION_RATE_PER_SECOND", "10"))
+ADMISSION_RATE_BURST = int(environ.get("ADMISSION_RATE_BURST", "30"))
+ADMISSION_CONCURRENCY = {
+    "search": int(environ.get("ADMISSION_SEARCH_CONCURRENCY", "4")),
+    "list": int(environ.get("ADMISSION_LIST_CONCURRENCY", "4")),
+    "heavy": int(environ.get("ADMISSION_HEAVY_CONCURRENCY", "1")),
+}
+# rate limit buckets kept before refilled ones are dropped
+RATE_LIMIT_MAX_CLIENTS = 10_000
+
+
+class ConcurrencyGate:
+    """
+    Limit the requests of a route class running at once. Requests over the
+    limit wait in a bounded queue, and fail with 503 when the queue is full or
+    no slot frees up within the wait deadline.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, wait_seconds: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.wait_seconds = wait_seconds
+        self._semaphore = asyncio.Semaphore(limit)
+        # requests running or waiting for a slot
+        self._pending = 0
+        self._stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_deadline": 0}
+
+    def _reject(self, reason: str, detail: str) -> HTTPException:
+        """count rejection and build its response"""
+        self._stats[f"rejected_{reason}"] += 1
+        metrics.admission_rejected.inc(self.name, reason)
+        return HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(round(self.wait_seconds))})
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """hold a slot of the gate, waiting for one up to the deadline"""
+        if self._pending >= self.limit + self.queue_size:
+            raise self._reject("queue_full", f"too many {self.name} requests queued")
+        if self._pending >= self.limit:
+            self._stats["queued"] += 1
+
+        self._pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.wait_seconds)
+            except TimeoutError as exc:
+                raise self._reject("deadline", f"no {self.name} slot free within {self.wait_seconds}s") from exc
+
+            self._stats["admitted"] += 1
+            try:
+                yield
+            finally:
+                self._semaphore.release()
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> dict[str, Any]:
+        """limit, current usage and counters"""
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "running": min(self._pending, self.limit),
+            "waiting": max(self._pending - self.limit, 0),
+            **self._stats,
+        }
+
+
+class RateLimiter:
+    """token bucket per client, refilled at rate per second up to burst"""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._rejected = 0
+
+    def check(self, client: str) -> None:
+        """take a token of client, raise 429 if its bucket is empty"""
+        if self.rate <= 0:
+            return
+
+        now = monotonic()
+        tokens, updated = self._buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._rejected += 1
+            metrics.admission_rejected.inc("rate_limit", "rate")
+            retry_after = max(1, round((1 - tokens) / self.rate))
+            self._buckets[client] = (tokens, now)
+            raise HTTPException(
+                status_code=429, detail="rate limit exceeded", headers={"Retry-After": str(retry_after)}
+            )
+
+        self._buckets[client] = (tokens - 1, now)
+        if len(self._buckets) > RATE_LIMIT_MAX_CLIENTS:
+            self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        """drop buckets that refilled completely, same as a new client"""
+        self._buckets = {
+            client: (tokens, updated)
+            for client, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * self.rate < self.burst
+        }
+
+    def stats(self) -> dict[str, Any]:
+        """settings and counters"""
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "rejected": self._rejected,
+        }
+
+
+def client_key(request: Request) -> str:
+    """
+    Client address of the request. Not the bearer token: API_TOKEN is shared
+    by all clients, and unverified tokens are free to pick.
+    """
+    return "client:" + (request.client.host if request.client else "unknown")
+
+
+class AdmissionControl:
+    """gates per route class and the shared rate limiter"""
+
+    def __init__(self) -> None:
+        self.gates = {
+            name: ConcurrencyGate(name, limit, ADMISSION_QUEUE_SIZE, ADMISSION_WAIT_SECONDS)
+            for name, limit in ADMISSION_CONCURRENCY.items()
+        }
+        self.rate_limiter = RateLimiter(ADMISSION_RATE_PER_SECOND, ADMISSION_RATE_BURST)
+
+    def dependency(self, route_class: str) -> Callable[[Request], AsyncGenerator[None, None]]:
+        """route dependency applying the rate limit and holding a slot of the gate while the route runs"""
+        gate = self.gates[route_class]
+
+        async def admit(request: Request) -> AsyncGenerator[None, None]:
+            self.rate_limiter.check(client_key(request))
+            async with gate.admit():
+                yield
+
+        return admit
+
+    def stats(self) -> dict[str, Any]:
+        """gate and rate limit counters"""
+        return {
+            "gates": {name: gate.stats() for name, gate in self.gates.items()},
+            "rate_limit": self.rate_limiter.stats(),
+        }
+
+
+admission_control = AdmissionControl()
@@ -0,0 +1,107 @@
+"""analytics endpoints served from rollup tables"""
+
+from typing import Any
+
+from api.params import AnalyticsRuntimesParams, AnalyticsTitlesParams
+from api.serializers import json_response
+from dependencies import get_read_session
+from fastapi import APIRouter, Depends, Response
+from http_cache import conditional_get
+from models import RollupProfession, RollupRating, RollupRuntime, RollupTitleGenre, RollupTitleYear
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+TITLE_DATASETS = ("title.basics.tsv",)
+RATING_DATASETS = ("title.ratings.tsv",)
+PROFESSION_DATASETS = ("name.basics.tsv",)
+
+
+@router.get(
+    "/titles",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*TITLE_DATASETS))],
+)
+async def get_title_counts(
+    params: AnalyticsTitlesParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """title counts grouped by start year, title type or genre"""
+    rollup: type[RollupTitleGenre] | type[RollupTitleYear] = RollupTitleYear
+    if params.group_by == "genre" or params.genre:
+        rollup = RollupTitleGenre
+
+    group_column = getattr(rollup, params.group_by)
+    stmt = select(group_column, func.sum(rollup.total)).group_by(group_column).order_by(group_column)
+    if params.title_type:
+        stmt = stmt.where(rollup.title_type == params.title_type)
+    if params.genre:
+        stmt = stmt.where(RollupTitleGenre.genre == params.genre)
+    if params.year_from:
+        stmt = stmt.where(rollup.start_year >= params.year_from)
+    if params.year_to:
+        stmt = stmt.where(rollup.start_year <= params.year_to)
+
+    result = await session.execute(stmt)
+    payloads: list[dict[str, Any]] = []
+    for value, total in result.all():
+        if params.group_by == "start_year" and value == 0:
+            value = None
+        if params.group_by == "genre" and value == "":
+            value = None
+        payloads.append({params.group_by: value, "count": int(total)})
+
+    return json_response(payloads)
+
+
+@router.get(
+    "/ratings",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*RATING_DATASETS))],
+)
+async def get_rating_histogram(
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """rated titles per average rating in steps of 0.1"""
+    result = await session.execute(
+        select(RollupRating.rating_tenths, RollupRating.total).order_by(RollupRating.rating_tenths)
+    )
+    return json_response([{"rating": rating_tenths / 10, "count": total} for rating_tenths, total in result.all()])
+
+
+@router.get(
+    "/runtimes",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*TITLE_DATASETS))],
+)
+async def get_runtime_distribution(
+    params: AnalyticsRuntimesParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """title counts per runtime in 10 minute buckets"""
+    stmt = (
+        select(RollupRuntime.runtime_bucket, func.sum(RollupRuntime.total))
+        .group_by(RollupRuntime.runtime_bucket)
+        .order_by(RollupRuntime.runtime_bucket)
+    )
+    if params.title_type:
+        stmt = stmt.where(RollupRuntime.title_type == params.title_type)
+    if params.max_minutes is not None:
+        stmt = stmt.where(RollupRuntime.runtime_bucket <= params.max_minutes)
+
+    result = await session.execute(stmt)
+    return json_response([{"runtime_minutes": bucket, "count": int(total)} for bucket, total in result.all()])
+
+
+@router.get(
+    "/professions",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*PROFESSION_DATASETS))],
+)
+async def get_profession_counts(
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """people per profession, most common first"""
+    stmt = select(RollupProfession.profession, RollupProfession.total)
+    result = await session.execute(stmt.order_by(RollupProfession.total.desc()))  # type: ignore
+    return json_response([{"profession": profession, "count": total} for profession, total in result.all()])
@@ -0,0 +1,44 @@
+"""total counts for paginated list responses"""
+
+from os import environ
+from typing import Any, Generic, TypeVar
+
+from api.query_cost import explain_plan
+from pydantic import BaseModel
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# planner estimates at or below this are replaced by an exact count
+TOTAL_EXACT_THRESHOLD = int(environ.get("TOTAL_EXACT_THRESHOLD", "10000"))
+
+ResultT = TypeVar("ResultT")
+
+
+class Envelope(BaseModel, Generic[ResultT]):
+    """schema of a list response wrapped by envelope"""
+
+    total: int
+    total_exact: bool
+    facets: dict[str, dict[str, int]] | None = None
+    results: list[ResultT]
+
+
+async def estimate_total(session: AsyncSession, stmt: Select) -> tuple[int, bool]:
+    """
+    Rows matching stmt without pagination, and whether the count is exact.
+    Takes the planner row estimate, small results are counted instead.
+    """
+    unpaged = stmt.limit(None).offset(None).order_by(None)
+    estimate = int((await explain_plan(session, unpaged))["Plan Rows"])
+    if estimate > TOTAL_EXACT_THRESHOLD:
+        return estimate, False
+
+    total = (await session.execute(select(func.count()).select_from(unpaged.subquery()))).scalar_one()
+    return total, True
+
+
+def envelope(
+    results: list[Any], total: int, exact: bool, facets: dict[str, dict[str, int]] | None = None
+) -> dict[str, Any]:
+    """list response wrapped with its total and facet counts"""
+    return {"total": total, "total_exact": exact, "facets": facets, "results": results}
@@ -0,0 +1,227 @@
+"""bulk export endpoints streaming full tables"""
+
+import csv
+import json
+from io import StringIO
+from typing import Any, AsyncIterator, cast
+
+import asyncpg
+from api.params import (
+    ExportAkasParams,
+    ExportEpisodesParams,
+    ExportParams,
+    ExportPeopleParams,
+    ExportPrincipalsParams,
+    ExportRatingsParams,
+    ExportTitlesParams,
+)
+from dictionary import decode_array_sql, decode_sql, encode_sql
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from replicas import replica_router
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+EXPORT_PREFETCH = 5_000
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+EXPORT_COLUMNS: dict[str, tuple[str, ...]] = {
+    "titles": (
+        "tconst",
+        f"{decode_sql('title_type', 'title_type')} AS title_type",
+        "primary_title",
+        "original_title",
+        "is_adult",
+        "start_year",
+        "end_year",
+        "runtime_minutes",
+        f"{decode_array_sql('genre', 'genres')} AS genres",
+    ),
+    "people": (
+        "nconst",
+        "primary_name",
+        "birth_year",
+        "death_year",
+        f"{decode_array_sql('profession', 'primary_professions')} AS primary_professions",
+        "known_for_titles",
+    ),
+    "title_ratings": (
+        "tconst",
+        "round(average_rating::numeric, 1)::float8 AS average_rating",
+        "num_votes",
+    ),
+    "episodes": (
+        "tconst",
+        "parent_tconst",
+        "season_number",
+        "episode_number",
+    ),
+    "title_akas": (
+        "title_id",
+        "ordering",
+        "title",
+        f"{decode_sql('region', 'region')} AS region",
+        f"{decode_sql('language', 'language')} AS language",
+        f"{decode_array_sql('aka_type', 'types')} AS types",
+        f"{decode_array_sql('aka_attribute', 'attributes')} AS attributes",
+        "is_original",
+    ),
+    "title_principals": (
+        "tconst",
+        "ordering",
+        "nconst",
+        f"{decode_sql('category', 'category')} AS category",
+        "job",
+        "characters",
+    ),
+}
+
+
+class _Filters:
+    """collect WHERE conditions with positional asyncpg arguments"""
+
+    def __init__(self) -> None:
+        self.conditions: list[str] = []
+        self.args: list[Any] = []
+
+    def add(self, condition: str, value: Any) -> None:
+        """add condition, {} is replaced with the argument placeholder"""
+        self.args.append(value)
+        self.conditions.append(condition.format(f"${len(self.args)}"))
+
+
+def _build_query(table_name: str, filters: _Filters) -> str:
+    """build export select statement"""
+    query = f"SELECT {', '.join(EXPORT_COLUMNS[table_name])} FROM {table_name}"
+    if filters.conditions:
+        query += " WHERE " + " AND ".join(filters.conditions)
+    return query
+
+
+def _csv_value(value: Any) -> Any:
+    """flatten values to csv cells"""
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _encode_ndjson(records: list[asyncpg.Record]) -> str:
+    """encode records as newline delimited json"""
+    return "".join(json.dumps(dict(record), ensure_ascii=False, separators=(",", ":")) + "\n" for record in records)
+
+
+def _encode_csv(records: list[asyncpg.Record]) -> str:
+    """encode records as csv rows"""
+    buf = StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerows([_csv_value(value) for value in record.values()] for record in records)
+    return buf.getvalue()
+
+
+def _encode_csv_header(record: asyncpg.Record) -> str:
+    """encode csv header row from record keys"""
+    buf = StringIO()
+    csv.writer(buf, lineterminator="\n").writerow(record.keys())
+    return buf.getvalue()
+
+
+async def _stream_records(query: str, args: list[Any], export_format: str) -> AsyncIterator[bytes]:
+    """stream query results through a server-side cursor in fixed size batches"""
+    encode = _encode_csv if export_format == "csv" else _encode_ndjson
+    read_engine = await replica_router.pick_engine()
+    async with read_engine.connect() as conn:
+        raw_conn = await conn.get_raw_connection()
+        db_conn = cast(asyncpg.Connection, raw_conn.driver_connection)
+        async with db_conn.transaction(readonly=True):
+            batch: list[asyncpg.Record] = []
+            needs_header = export_format == "csv"
+            async for record in db_conn.cursor(query, *args, prefetch=EXPORT_PREFETCH):
+                if needs_header:
+                    yield _encode_csv_header(record).encode("utf-8")
+                    needs_header = False
+
+                batch.append(record)
+                if len(batch) >= EXPORT_PREFETCH:
+                    yield encode(batch).encode("utf-8")
+                    batch = []
+
+            if batch:
+                yield encode(batch).encode("utf-8")
+
+
+def _export_response(table_name: str, filters: _Filters, params: ExportParams) -> StreamingResponse:
+    """build streaming response for table export"""
+    query = _build_query(table_name, filters)
+    return StreamingResponse(
+        _stream_records(query, filters.args, params.format),
+        media_type=EXPORT_MEDIA_TYPES[params.format],
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.{params.format}"'},
+    )
+
+
+@router.get("/titles")
+async def export_titles(params: ExportTitlesParams = Depends()) -> StreamingResponse:
+    """export titles"""
+    filters = _Filters()
+    if params.title_type:
+        filters.add(f"title_type = {encode_sql('title_type', '{}')}", params.title_type)
+    if params.genre:
+        filters.add(f"{encode_sql('genre', '{}')} = ANY(genres)", params.genre)
+    if params.year_from:
+        filters.add("start_year >= {}", params.year_from)
+    return _export_response("titles", filters, params)
+
+
+@router.get("/people")
+async def export_people(params: ExportPeopleParams = Depends()) -> StreamingResponse:
+    """export people"""
+    filters = _Filters()
+    if params.profession:
+        filters.add(f"{encode_sql('profession', '{}')} = ANY(primary_professions)", params.profession)
+    return _export_response("people", filters, params)
+
+
+@router.get("/ratings")
+async def export_ratings(params: ExportRatingsParams = Depends()) -> StreamingResponse:
+    """export title ratings"""
+    filters = _Filters()
+    if params.min_rating is not None:
+        filters.add("average_rating >= {}", params.min_rating)
+    if params.min_votes is not None:
+        filters.add("num_votes >= {}", params.min_votes)
+    return _export_response("title_ratings", filters, params)
+
+
+@router.get("/episodes")
+async def export_episodes(params: ExportEpisodesParams = Depends()) -> StreamingResponse:
+    """export episodes"""
+    filters = _Filters()
+    if params.parent_tconst:
+        filters.add("parent_tconst = {}", params.parent_tconst)
+    return _export_response("episodes", filters, params)
+
+
+@router.get("/akas")
+async def export_akas(params: ExportAkasParams = Depends()) -> StreamingResponse:
+    """export title akas"""
+    filters = _Filters()
+    if params.region:
+        filters.add(f"region = {encode_sql('region', '{}')}", params.region)
+    if params.language:
+        filters.add(f"language = {encode_sql('language', '{}')}", params.language)
+    return _export_response("title_akas", filters, params)
+
+
+@router.get("/principals")
+async def export_principals(params: ExportPrincipalsParams = Depends()) -> StreamingResponse:
+    """export title principals"""
+    filters = _Filters()
+    if params.category:
+        filters.add(f"category = {encode_sql('category', '{}')}", params.category)
+    if params.nconst:
+        filters.add("nconst = {}", params.nconst)
+    return _export_response("title_principals", filters, params)
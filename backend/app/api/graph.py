@@ -0,0 +1,141 @@
+"""collaboration graph endpoints"""
+
+import asyncio
+from typing import Annotated, Any
+
+from api.params import GraphNeighborhoodParams, GraphPathParams
+from dependencies import get_read_session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from graph import PERSON, CollaborationGraph, GraphSearchLimitError, collaboration_graph
+from http_cache import conditional_get
+from models import Person, Title
+from response_cache import cached_json
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(prefix="/api/graph", tags=["graph"])
+GRAPH_DATASETS = ("title.principals.tsv", "name.basics.tsv", "title.basics.tsv")
+
+
+def _get_graph() -> CollaborationGraph:
+    """loaded graph, raise 503 before the first build"""
+    if not collaboration_graph.load_if_changed():
+        raise HTTPException(status_code=503, detail="collaboration graph not built yet, run principals ingest")
+
+    return collaboration_graph
+
+
+def _get_person_index(graph: CollaborationGraph, nconst: str) -> int:
+    """graph node of person, raise 404 if missing"""
+    person_index = graph.person_index(nconst)
+    if person_index is None:
+        raise HTTPException(status_code=404, detail=f"person not found in graph: {nconst}")
+
+    return person_index
+
+
+async def _person_names(session: AsyncSession, nconsts: list[str]) -> dict[str, str | None]:
+    """primary name by nconst"""
+    if not nconsts:
+        return {}
+
+    result = await session.execute(
+        select(Person.nconst, Person.primary_name).where(Person.nconst.in_(nconsts))  # type: ignore
+    )
+    return dict(result.tuples().all())
+
+
+async def _titles(session: AsyncSession, tconsts: list[str]) -> dict[str, tuple[str, int | None]]:
+    """primary title and start year by tconst"""
+    if not tconsts:
+        return {}
+
+    result = await session.execute(
+        select(Title.tconst, Title.primary_title, Title.start_year).where(Title.tconst.in_(tconsts))  # type: ignore
+    )
+    return {tconst: (primary_title, start_year) for tconst, primary_title, start_year in result.all()}
+
+
+@router.get(
+    "/path",
+    response_model=dict[str, Any],
+    dependencies=[Depends(conditional_get(*GRAPH_DATASETS))],
+)
+async def get_shortest_path(
+    request: Request,
+    params: GraphPathParams = Depends(),
+    category: Annotated[list[str] | None, Query()] = None,
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """shortest connection between two people over shared titles"""
+    graph = _get_graph()
+    source = _get_person_index(graph, params.source)
+    target = _get_person_index(graph, params.target)
+
+    async def build() -> dict[str, Any]:
+        category_mask = graph.category_mask(category)
+        try:
+            path = await asyncio.to_thread(graph.shortest_path, source, target, category_mask, params.max_hops)
+        except GraphSearchLimitError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+        payload: dict[str, Any] = {"source": params.source, "target": params.target, "degrees": None, "path": []}
+        if path is None:
+            return payload
+
+        nodes = [(kind, graph.nconst(index) if kind == PERSON else graph.tconst(index)) for kind, index in path]
+        names = await _person_names(session, [const for kind, const in nodes if kind == PERSON])
+        titles = await _titles(session, [const for kind, const in nodes if kind != PERSON])
+        for kind, const in nodes:
+            if kind == PERSON:
+                payload["path"].append({"nconst": const, "primary_name": names.get(const)})
+            else:
+                primary_title, start_year = titles.get(const, (None, None))
+                payload["path"].append({"tconst": const, "primary_title": primary_title, "start_year": start_year})
+
+        payload["degrees"] = len(path) // 2
+        return payload
+
+    return await cached_json(request, GRAPH_DATASETS, build)
+
+
+@router.get(
+    "/people/{nconst}/neighborhood",
+    response_model=dict[str, Any],
+    dependencies=[Depends(conditional_get(*GRAPH_DATASETS))],
+)
+async def get_person_neighborhood(
+    nconst: str,
+    request: Request,
+    params: GraphNeighborhoodParams = Depends(),
+    category: Annotated[list[str] | None, Query()] = None,
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """people within hops of person, closest first"""
+    graph = _get_graph()
+    source = _get_person_index(graph, nconst)
+
+    async def build() -> dict[str, Any]:
+        category_mask = graph.category_mask(category)
+        try:
+            people, distances = await asyncio.to_thread(graph.neighborhood, source, category_mask, params.hops)
+        except GraphSearchLimitError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+        page_slice = slice((params.page - 1) * params.size, params.page * params.size)
+        page = [
+            (graph.nconst(int(person_index)), int(distance))
+            for person_index, distance in zip(people[page_slice], distances[page_slice])
+        ]
+        names = await _person_names(session, [person_nconst for person_nconst, _ in page])
+        return {
+            "nconst": nconst,
+            "hops": params.hops,
+            "total": len(people),
+            "people": [
+                {"nconst": person_nconst, "primary_name": names.get(person_nconst), "distance": distance}
+                for person_nconst, distance in page
+            ],
+        }
+
+    return await cached_json(request, GRAPH_DATASETS, build)
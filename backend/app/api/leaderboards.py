@@ -0,0 +1,123 @@
+"""leaderboard and trending endpoints"""
+
+from typing import Any
+
+from api.params import LeaderboardParams, TrendingParams
+from api.serializers import RATING_COLUMNS, TITLE_COLUMNS, RowMapper, add_rating, round_rating
+from dependencies import get_read_session
+from fastapi import APIRouter, Depends, Request, Response
+from http_cache import conditional_get
+from models import Leaderboard, RatingHistory, Title, TitleRating
+from response_cache import cached_json
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+router = APIRouter(prefix="/api", tags=["leaderboards"])
+LEADERBOARD_DATASETS = ("title.basics.tsv", "title.ratings.tsv")
+LEADERBOARD_COLUMNS = (Leaderboard.rank, Leaderboard.weighted_rating)
+LEADERBOARD_TITLE_ROW = RowMapper(TITLE_COLUMNS, start=len(LEADERBOARD_COLUMNS))
+RATING_START = len(LEADERBOARD_COLUMNS) + len(TITLE_COLUMNS)
+TRENDING_TITLE_ROW = RowMapper(TITLE_COLUMNS, start=2)
+TRENDING_RATING_START = 2 + len(TITLE_COLUMNS)
+
+
+@router.get(
+    "/leaderboards",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*LEADERBOARD_DATASETS))],
+)
+async def list_leaderboard(
+    request: Request,
+    params: LeaderboardParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """top titles by weighted rating, optionally per genre, title type and decade"""
+
+    async def build() -> list[dict[str, Any]]:
+        result = await session.execute(
+            select(*LEADERBOARD_COLUMNS, *TITLE_COLUMNS, *RATING_COLUMNS)
+            .join(Title, Title.tconst == Leaderboard.tconst)
+            .outerjoin(TitleRating, TitleRating.tconst == Title.tconst)
+            .where(
+                Leaderboard.genre == (params.genre or ""),
+                Leaderboard.title_type == (params.title_type or ""),
+                Leaderboard.decade == (params.decade or 0),
+            )
+            .order_by(Leaderboard.rank)
+            .limit(params.size)
+            .offset((params.page - 1) * params.size)
+        )
+        payloads: list[dict[str, Any]] = []
+        for row in result.all():
+            payload = {"rank": row[0], "weighted_rating": round(row[1], 3)}
+            payload.update(add_rating(LEADERBOARD_TITLE_ROW(row), row, RATING_START))
+            payloads.append(payload)
+        return payloads
+
+    return await cached_json(request, LEADERBOARD_DATASETS, build)
+
+
+@router.get(
+    "/trending",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*LEADERBOARD_DATASETS))],
+)
+async def list_trending(
+    request: Request,
+    params: TrendingParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """titles with the largest vote gain or rating change over the last days"""
+    window_start = func.current_date() - params.days
+    latest = (
+        select(RatingHistory.tconst, RatingHistory.average_rating, RatingHistory.num_votes)
+        .where(RatingHistory.snapshot_date > window_start)
+        .distinct(RatingHistory.tconst)
+        .order_by(RatingHistory.tconst, RatingHistory.snapshot_date.desc())  # type: ignore
+        .cte("latest")
+    )
+    previous_history = aliased(RatingHistory)
+    previous = (
+        select(previous_history.average_rating, previous_history.num_votes)
+        .where(previous_history.tconst == latest.c.tconst, previous_history.snapshot_date <= window_start)
+        .order_by(previous_history.snapshot_date.desc())  # type: ignore
+        .limit(1)
+        .lateral("previous")
+    )
+    # titles first seen within the window are compared against their earliest snapshot in it
+    first_history = aliased(RatingHistory)
+    first = (
+        select(first_history.average_rating, first_history.num_votes)
+        .where(first_history.tconst == latest.c.tconst, first_history.snapshot_date > window_start)
+        .order_by(first_history.snapshot_date)
+        .limit(1)
+        .lateral("first")
+    )
+    baseline_votes = func.coalesce(previous.c.num_votes, first.c.num_votes)
+    baseline_rating = func.coalesce(previous.c.average_rating, first.c.average_rating)
+    vote_gain = (latest.c.num_votes - baseline_votes).label("vote_gain")
+    rating_change = (latest.c.average_rating - baseline_rating).label("rating_change")
+    order_column = vote_gain if params.metric == "votes" else rating_change
+
+    async def build() -> list[dict[str, Any]]:
+        result = await session.execute(
+            select(vote_gain, rating_change, *TITLE_COLUMNS, *RATING_COLUMNS)
+            .select_from(latest)
+            .outerjoin(previous, true())
+            .outerjoin(first, true())
+            .join(Title, Title.tconst == latest.c.tconst)
+            .outerjoin(TitleRating, TitleRating.tconst == Title.tconst)
+            .where(latest.c.num_votes >= params.min_votes)
+            .order_by(order_column.desc().nulls_last(), Title.tconst)
+            .limit(params.size)
+            .offset((params.page - 1) * params.size)
+        )
+        payloads: list[dict[str, Any]] = []
+        for row in result.all():
+            payload = {"vote_gain": row[0], "rating_change": round_rating(row[1])}
+            payload["title"] = add_rating(TRENDING_TITLE_ROW(row), row, TRENDING_RATING_START)
+            payloads.append(payload)
+        return payloads
+
+    return await cached_json(request, LEADERBOARD_DATASETS, build, coalesce=True)
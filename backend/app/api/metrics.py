@@ -0,0 +1,14 @@
+"""prometheus metrics endpoint"""
+
+from database import pool_stats
+from fastapi import APIRouter
+from fastapi.responses import Response
+from metrics import PROMETHEUS_CONTENT_TYPE, metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """request, query, pool and ingest metrics in prometheus text format"""
+    return Response(metrics.render(pool_stats()), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,6 +1,6 @@
 """shared API query parameter models"""
 
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
 from fastapi import Query
 from pydantic import BaseModel
@@ -11,11 +11,19 @@ class PaginationParams(BaseModel):
     size: Annotated[int, Query(default=50, ge=1, le=500)]
 
 
+class EnvelopeParams(PaginationParams):
+    envelope: Annotated[bool, Query(default=False)]
+
+
+class PersonParams(BaseModel):
+    collaborators: Annotated[int, Query(default=10, ge=0, le=50)]
+
+
 class CategoryParams(PaginationParams):
     category: Annotated[Optional[str], Query(default=None)]
 
 
-class ListTitlesParams(PaginationParams):
+class ListTitlesParams(EnvelopeParams):
     genre: Annotated[Optional[str], Query(default=None)]
     year_from: Annotated[Optional[int], Query(default=None, ge=1800)]
     min_rating: Annotated[Optional[float], Query(default=None, ge=0.0, le=10.0)]
@@ -26,7 +34,75 @@ class ListSeriesEpisodesParams(PaginationParams):
     season_number: Annotated[Optional[int], Query(default=None, ge=1)]
 
 
-class SearchParams(PaginationParams):
+class SearchParams(EnvelopeParams):
     q: Annotated[str, Query(min_length=1)]
     title_type: Annotated[Optional[str], Query(default=None)]
     year_from: Annotated[Optional[int], Query(default=None, ge=1800)]
+
+
+class GraphPathParams(BaseModel):
+    source: Annotated[str, Query(min_length=3)]
+    target: Annotated[str, Query(min_length=3)]
+    max_hops: Annotated[int, Query(default=6, ge=1, le=6)]
+
+
+class GraphNeighborhoodParams(PaginationParams):
+    hops: Annotated[int, Query(default=1, ge=1, le=3)]
+
+
+class TrendingParams(PaginationParams):
+    days: Annotated[int, Query(default=7, ge=1, le=90)]
+    metric: Annotated[Literal["votes", "rating"], Query(default="votes")]
+    min_votes: Annotated[int, Query(default=1000, ge=0)]
+
+
+class LeaderboardParams(PaginationParams):
+    genre: Annotated[Optional[str], Query(default=None)]
+    title_type: Annotated[Optional[str], Query(default=None)]
+    decade: Annotated[Optional[int], Query(default=None, ge=1870, multiple_of=10)]
+
+
+class AnalyticsTitlesParams(BaseModel):
+    group_by: Annotated[Literal["start_year", "title_type", "genre"], Query(default="start_year")]
+    title_type: Annotated[Optional[str], Query(default=None)]
+    genre: Annotated[Optional[str], Query(default=None)]
+    year_from: Annotated[Optional[int], Query(default=None, ge=1800)]
+    year_to: Annotated[Optional[int], Query(default=None, ge=1800)]
+
+
+class AnalyticsRuntimesParams(BaseModel):
+    title_type: Annotated[Optional[str], Query(default=None)]
+    max_minutes: Annotated[Optional[int], Query(default=None, ge=0)]
+
+
+class ExportParams(BaseModel):
+    format: Annotated[Literal["ndjson", "csv"], Query(default="ndjson")]
+
+
+class ExportTitlesParams(ExportParams):
+    title_type: Annotated[Optional[str], Query(default=None)]
+    genre: Annotated[Optional[str], Query(default=None)]
+    year_from: Annotated[Optional[int], Query(default=None, ge=1800)]
+
+
+class ExportPeopleParams(ExportParams):
+    profession: Annotated[Optional[str], Query(default=None)]
+
+
+class ExportRatingsParams(ExportParams):
+    min_rating: Annotated[Optional[float], Query(default=None, ge=0.0, le=10.0)]
+    min_votes: Annotated[Optional[int], Query(default=None, ge=0)]
+
+
+class ExportEpisodesParams(ExportParams):
+    parent_tconst: Annotated[Optional[str], Query(default=None)]
+
+
+class ExportAkasParams(ExportParams):
+    region: Annotated[Optional[str], Query(default=None)]
+    language: Annotated[Optional[str], Query(default=None)]
+
+
+class ExportPrincipalsParams(ExportParams):
+    category: Annotated[Optional[str], Query(default=None)]
+    nconst: Annotated[Optional[str], Query(default=None)]
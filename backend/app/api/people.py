@@ -2,78 +2,146 @@
 
 from typing import Any
 
-from api.params import CategoryParams
-from dependencies import get_session
-from fastapi import APIRouter, Depends, HTTPException
-from models import Person, Title, TitlePrincipal
-from sqlalchemy import select
+from api.params import CategoryParams, PersonParams
+from api.serializers import (
+    COLLABORATOR_COLUMNS,
+    CREDIT_COLUMNS,
+    CREDIT_RATING_COLUMNS,
+    CREDIT_TITLE_COLUMNS,
+    RowMapper,
+    add_rating,
+    json_response,
+)
+from dependencies import get_read_session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from http_cache import conditional_get
+from models import Collaborator, Filmography, Person, Title, TitlePrincipal
+from response_cache import cached_json
+from sqlalchemy import Select, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/api", tags=["people"])
+PERSON_DATASETS = ("name.basics.tsv", "title.basics.tsv", "title.principals.tsv")
+CREDIT_DATASETS = ("title.principals.tsv", "title.basics.tsv", "title.ratings.tsv")
+CREDIT_ROW = RowMapper(CREDIT_COLUMNS)
+CREDIT_TITLE_ROW = RowMapper(CREDIT_TITLE_COLUMNS, start=len(CREDIT_COLUMNS))
+CREDIT_RATING_START = len(CREDIT_COLUMNS) + len(CREDIT_TITLE_COLUMNS)
+COLLABORATOR_ROW = RowMapper(COLLABORATOR_COLUMNS)
 
 
-@router.get("/people/{nconst}")
+def person_credits_query(nconst: str, params: CategoryParams) -> Select:
+    """
+    Credits of person with title and rating, latest first. With a category,
+    ordering, job and characters are taken from the first credit of that
+    category instead of the first credit of the title.
+    """
+    stmt = (
+        select(*CREDIT_COLUMNS, *CREDIT_TITLE_COLUMNS, *CREDIT_RATING_COLUMNS)
+        .where(Filmography.nconst == nconst)
+        .order_by(
+            Filmography.start_year.desc().nulls_last(),  # type: ignore
+            Filmography.primary_title,
+            Filmography.tconst,
+        )
+    )
+    if params.category:
+        principal = (
+            select(TitlePrincipal.ordering, TitlePrincipal.category, TitlePrincipal.job, TitlePrincipal.characters)
+            .where(
+                TitlePrincipal.tconst == Filmography.tconst,
+                TitlePrincipal.nconst == Filmography.nconst,
+                TitlePrincipal.category == params.category,
+            )
+            .order_by(TitlePrincipal.ordering)
+            .limit(1)
+            .lateral("principal")
+        )
+        stmt = (
+            stmt.with_only_columns(
+                Filmography.tconst,
+                principal.c.ordering,
+                principal.c.category,
+                Filmography.categories,
+                principal.c.job,
+                principal.c.characters,
+                *CREDIT_TITLE_COLUMNS,
+                *CREDIT_RATING_COLUMNS,
+            )
+            .select_from(Filmography)
+            .join(principal, true())
+            .where(Filmography.categories.any(params.category))  # type: ignore  # pylint: disable=no-member
+        )
+
+    return stmt.limit(params.size).offset((params.page - 1) * params.size)
+
+
+@router.get(
+    "/people/{nconst}",
+    response_model=dict[str, Any],
+    dependencies=[Depends(conditional_get(*PERSON_DATASETS))],
+)
 async def get_person(
     nconst: str,
-    session: AsyncSession = Depends(get_session),
-) -> dict[str, Any]:
-    """single person"""
-    result = await session.execute(select(Person).where(Person.nconst == nconst))
-    person = result.scalar_one_or_none()
-    if person is None:
-        raise HTTPException(status_code=404, detail="person not found")
-    known_for_titles: list[dict[str, Any]] = []
-    if person.known_for_titles:
-        titles_result = await session.execute(select(Title).where(Title.tconst.in_(person.known_for_titles)))
-        titles = titles_result.scalars().all()
-        titles_by_id = {title.tconst: title for title in titles}
-        known_for_titles = [
-            titles_by_id[tconst].model_dump() for tconst in person.known_for_titles if tconst in titles_by_id
-        ]
-
-    payload = person.model_dump()
-    payload["known_for_titles"] = known_for_titles
-    return payload
-
-
-@router.get("/people/{nconst}/credits")
+    request: Request,
+    params: PersonParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """single person with top collaborators"""
+
+    async def build() -> dict[str, Any]:
+        result = await session.execute(select(Person).where(Person.nconst == nconst))
+        person = result.scalar_one_or_none()
+        if person is None:
+            raise HTTPException(status_code=404, detail="person not found")
+        known_for_titles: list[dict[str, Any]] = []
+        if person.known_for_titles:
+            titles_result = await session.execute(select(Title).where(Title.tconst.in_(person.known_for_titles)))
+            titles = titles_result.scalars().all()
+            titles_by_id = {title.tconst: title for title in titles}
+            known_for_titles = [
+                titles_by_id[tconst].model_dump() for tconst in person.known_for_titles if tconst in titles_by_id
+            ]
+
+        payload = person.model_dump()
+        payload["known_for_titles"] = known_for_titles
+        payload["collaborators"] = await _list_collaborators(session, nconst, params.collaborators)
+        return payload
+
+    return await cached_json(request, PERSON_DATASETS, build)
+
+
+async def _list_collaborators(session: AsyncSession, nconst: str, limit: int) -> list[dict[str, Any]]:
+    """top collaborators by rank"""
+    if not limit:
+        return []
+
+    result = await session.execute(
+        select(*COLLABORATOR_COLUMNS)
+        .join(Person, Person.nconst == Collaborator.collaborator_nconst)
+        .where(Collaborator.nconst == nconst)
+        .order_by(Collaborator.rank)
+        .limit(limit)
+    )
+    return [COLLABORATOR_ROW(row) for row in result.all()]
+
+
+@router.get(
+    "/people/{nconst}/credits",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*CREDIT_DATASETS))],
+)
 async def list_person_credits(
     nconst: str,
     params: CategoryParams = Depends(),
-    session: AsyncSession = Depends(get_session),
-) -> list[dict[str, Any]]:
-    """list of credits of person"""
-    stmt = (
-        select(TitlePrincipal, Title)
-        .join(Title, Title.tconst == TitlePrincipal.tconst)
-        .where(TitlePrincipal.nconst == nconst)
-        .distinct(TitlePrincipal.tconst)
-        .order_by(TitlePrincipal.tconst, Title.start_year.desc(), Title.primary_title)  # type: ignore
-    )
-    if params.category:
-        stmt = stmt.where(TitlePrincipal.category == params.category)
-
-    stmt = stmt.limit(params.size).offset((params.page - 1) * params.size)
-    result = await session.execute(stmt)
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """list of credits of person, one per title, latest first"""
+    result = await session.execute(person_credits_query(nconst, params))
 
     people_credits: list[dict[str, Any]] = []
-    for principal, title in result.all():
-        people_credits.append(
-            {
-                "tconst": principal.tconst,
-                "ordering": principal.ordering,
-                "category": principal.category,
-                "job": principal.job,
-                "characters": principal.characters,
-                "title": {
-                    "tconst": title.tconst,
-                    "title_type": title.title_type,
-                    "primary_title": title.primary_title,
-                    "original_title": title.original_title,
-                    "start_year": title.start_year,
-                    "end_year": title.end_year,
-                },
-            }
-        )
+    for row in result.all():
+        payload = CREDIT_ROW(row)
+        payload["title"] = add_rating({"tconst": payload["tconst"], **CREDIT_TITLE_ROW(row)}, row, CREDIT_RATING_START)
+        people_credits.append(payload)
 
-    return people_credits
+    return json_response(people_credits)
@@ -0,0 +1,64 @@
+"""planner estimates of route queries, to reject or downgrade expensive ones before running them"""
+
+import json
+from contextlib import asynccontextmanager
+from os import environ
+from typing import Any, AsyncIterator
+
+from admission import admission_control
+from fastapi import HTTPException
+from metrics import metrics
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+# queries estimated above this are rejected, above the heavy cost they share the heavy gate
+QUERY_MAX_COST = float(environ.get("QUERY_MAX_COST", "5000000"))
+QUERY_HEAVY_COST = float(environ.get("QUERY_HEAVY_COST", "100000"))
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN of a select, keeping its bind parameters"""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select) -> None:
+        self.stmt = stmt
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.stmt, **kw)}"
+
+
+async def explain_plan(session: AsyncSession, stmt: Select) -> dict[str, Any]:
+    """top plan node of stmt"""
+    explained = (await session.execute(Explain(stmt))).scalar_one()
+    return (json.loads(explained) if isinstance(explained, str) else explained)[0]["Plan"]
+
+
+@asynccontextmanager
+async def cost_guard(session: AsyncSession, stmt: Select, route: str) -> AsyncIterator[float]:
+    """
+    Plan stmt before running it. Queries estimated above QUERY_MAX_COST fail
+    with 422, queries above QUERY_HEAVY_COST run in the heavy gate so they
+    cannot take all connections of their route. Before waiting for the gate
+    the session transaction is rolled back, returning its connection to the
+    pool, and its statement_timeout is set again once admitted.
+    """
+    cost = float((await explain_plan(session, stmt))["Total Cost"])
+    if cost > QUERY_MAX_COST:
+        metrics.query_cost_rejected.inc(route)
+        raise HTTPException(status_code=422, detail="query too expensive, add filters or request an earlier page")
+
+    if cost <= QUERY_HEAVY_COST:
+        yield cost
+        return
+
+    timeout = (await session.execute(text("SELECT current_setting('statement_timeout')"))).scalar_one()
+    await session.rollback()
+    async with admission_control.gates["heavy"].admit():
+        await session.execute(text("SELECT set_config('statement_timeout', :timeout, true)"), {"timeout": timeout})
+        yield cost
@@ -1,21 +1,22 @@
 """search endpoints"""
 
+from admission import admission_control
+from api.envelope import Envelope, envelope, estimate_total
 from api.params import SearchParams
-from dependencies import get_session
-from fastapi import APIRouter, Depends
+from api.query_cost import cost_guard
+from api.serializers import json_response
+from dependencies import get_read_session, statement_timeout
+from fastapi import APIRouter, Depends, Response
+from http_cache import conditional_get
 from models import Person, Title
-from sqlalchemy import or_, select
+from sqlalchemy import Select, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/api/search", tags=["search"])
 
 
-@router.get("/titles")
-async def search_titles(
-    params: SearchParams = Depends(),
-    session: AsyncSession = Depends(get_session),
-) -> list[Title]:
-    """search titles"""
+def search_titles_query(params: SearchParams) -> Select:
+    """titles with primary or original title containing q"""
     like = f"%{params.q}%"
     stmt = select(Title).where(
         or_(
@@ -27,19 +28,61 @@ async def search_titles(
         stmt = stmt.where(Title.title_type == params.title_type)
     if params.year_from and Title.start_year:
         stmt = stmt.where(Title.start_year >= params.year_from)
-    stmt = stmt.limit(params.size).offset((params.page - 1) * params.size)
-    result = await session.execute(stmt)
-    return result.scalars().all()
+    return stmt.limit(params.size).offset((params.page - 1) * params.size)
 
 
-@router.get("/people")
-async def search_people(
-    params: SearchParams = Depends(),
-    session: AsyncSession = Depends(get_session),
-) -> list[Person]:
-    """search people"""
+def search_people_query(params: SearchParams) -> Select:
+    """people with name containing q"""
     like = f"%{params.q}%"
     stmt = select(Person).where(Person.primary_name.ilike(like))  # type: ignore
-    stmt = stmt.limit(params.size).offset((params.page - 1) * params.size)
-    result = await session.execute(stmt)
-    return result.scalars().all()
+    return stmt.limit(params.size).offset((params.page - 1) * params.size)
+
+
+@router.get(
+    "/titles",
+    response_model=list[Title] | Envelope[Title],
+    dependencies=[
+        Depends(conditional_get("title.basics.tsv")),
+        Depends(admission_control.dependency("search"), scope="function"),
+        Depends(statement_timeout("search")),
+    ],
+)
+async def search_titles(
+    params: SearchParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+) -> list[Title] | Response:
+    """search titles, with envelope wrapped with the total"""
+    stmt = search_titles_query(params)
+    async with cost_guard(session, stmt, "/api/search/titles"):
+        result = await session.execute(stmt)
+    titles = result.scalars().all()
+    if not params.envelope:
+        return titles
+
+    total, exact = await estimate_total(session, stmt)
+    return json_response(envelope([row.model_dump(mode="json") for row in titles], total, exact))
+
+
+@router.get(
+    "/people",
+    response_model=list[Person] | Envelope[Person],
+    dependencies=[
+        Depends(conditional_get("name.basics.tsv")),
+        Depends(admission_control.dependency("search"), scope="function"),
+        Depends(statement_timeout("search")),
+    ],
+)
+async def search_people(
+    params: SearchParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+) -> list[Person] | Response:
+    """search people, with envelope wrapped with the total"""
+    stmt = search_people_query(params)
+    async with cost_guard(session, stmt, "/api/search/people"):
+        result = await session.execute(stmt)
+    people = result.scalars().all()
+    if not params.envelope:
+        return people
+
+    total, exact = await estimate_total(session, stmt)
+    return json_response(envelope([row.model_dump(mode="json") for row in people], total, exact))
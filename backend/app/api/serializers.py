@@ -0,0 +1,115 @@
+"""fast-path row mapping and json serialization for hot read endpoints"""
+
+from typing import Any, Sequence
+
+import orjson
+from fastapi import Response
+from models import Collaborator, Episode, Filmography, Person, SeriesSeason, Title, TitlePrincipal, TitleRating
+
+TITLE_COLUMNS = (
+    Title.tconst,
+    Title.title_type,
+    Title.primary_title,
+    Title.original_title,
+    Title.is_adult,
+    Title.start_year,
+    Title.end_year,
+    Title.runtime_minutes,
+    Title.genres,
+)
+RATING_COLUMNS = (
+    TitleRating.average_rating,
+    TitleRating.num_votes,
+)
+PERSON_COLUMNS = (
+    Person.nconst,
+    Person.primary_name,
+    Person.birth_year,
+    Person.death_year,
+    Person.primary_professions,
+    Person.known_for_titles,
+)
+PRINCIPAL_COLUMNS = (
+    TitlePrincipal.tconst,
+    TitlePrincipal.ordering,
+    TitlePrincipal.nconst,
+    TitlePrincipal.category,
+    TitlePrincipal.job,
+    TitlePrincipal.characters,
+)
+EPISODE_COLUMNS = (
+    Episode.tconst,
+    Episode.parent_tconst,
+    Episode.season_number,
+    Episode.episode_number,
+)
+SEASON_COLUMNS = (
+    SeriesSeason.season_number,
+    SeriesSeason.episode_count,
+    SeriesSeason.start_year,
+    SeriesSeason.end_year,
+    SeriesSeason.mean_rating,
+    SeriesSeason.total_votes,
+)
+COLLABORATOR_COLUMNS = (
+    Collaborator.collaborator_nconst.label("nconst"),  # type: ignore
+    Person.primary_name,
+    Collaborator.shared_titles,
+    Collaborator.last_shared_year,
+)
+CREDIT_COLUMNS = (
+    Filmography.tconst,
+    Filmography.ordering,
+    Filmography.category,
+    Filmography.categories,
+    Filmography.job,
+    Filmography.characters,
+)
+CREDIT_TITLE_COLUMNS = (
+    Filmography.title_type,
+    Filmography.primary_title,
+    Filmography.original_title,
+    Filmography.start_year,
+    Filmography.end_year,
+)
+CREDIT_RATING_COLUMNS = (
+    Filmography.average_rating,
+    Filmography.num_votes,
+)
+
+
+class RowMapper:
+    """map a fixed slice of a flat result row to a payload dict"""
+
+    def __init__(self, columns: Sequence[Any], start: int = 0) -> None:
+        self.keys: tuple[str, ...] = tuple(column.key for column in columns)
+        self.start = start
+        self.stop = start + len(self.keys)
+
+    def __call__(self, row: Sequence[Any]) -> dict[str, Any]:
+        start, stop = self.start, self.stop
+        return dict(zip(self.keys, row[start:stop]))
+
+
+def round_rating(average_rating: float | None) -> float | None:
+    """round rating to one decimal, float4 values carry noise otherwise"""
+    if average_rating is None:
+        return None
+    return round(average_rating, 1)
+
+
+def add_rating(payload: dict[str, Any], row: Sequence[Any], start: int) -> dict[str, Any]:
+    """add average_rating and num_votes from RATING_COLUMNS at row position"""
+    payload["average_rating"] = round_rating(row[start])
+    payload["num_votes"] = row[start + 1]
+    return payload
+
+
+def json_response(payload: Any) -> Response:
+    """serialize payload with orjson straight into the response body"""
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+
+def json_fragment(payload: Any) -> orjson.Fragment:
+    """pre-serialize a payload once to embed it repeatedly"""
+    return orjson.Fragment(orjson.dumps(payload))
@@ -2,51 +2,119 @@
 
 from typing import Any
 
+from admission import admission_control
 from api.params import ListSeriesEpisodesParams
-from dependencies import get_session
-from fastapi import APIRouter, Depends, HTTPException
-from models import Episode, Title, TitleRating
-from sqlalchemy import select
+from api.query_cost import cost_guard
+from api.serializers import (
+    EPISODE_COLUMNS,
+    RATING_COLUMNS,
+    SEASON_COLUMNS,
+    TITLE_COLUMNS,
+    RowMapper,
+    add_rating,
+    json_fragment,
+    round_rating,
+)
+from dependencies import get_read_session, statement_timeout
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from http_cache import conditional_get
+from models import Episode, SeriesSeason, Title, TitleRating
+from response_cache import cached_json
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/api", tags=["series"])
+EPISODE_DATASETS = ("title.episode.tsv", "title.basics.tsv", "title.ratings.tsv")
+EPISODE_TITLE_COLUMNS = TITLE_COLUMNS[1:]
+EPISODE_ROW = RowMapper(EPISODE_COLUMNS + EPISODE_TITLE_COLUMNS)
+PARENT_ROW = RowMapper(TITLE_COLUMNS)
+RATING_START = len(EPISODE_COLUMNS) + len(EPISODE_TITLE_COLUMNS)
+SEASON_DATASETS = ("title.episode.tsv", "title.basics.tsv", "title.ratings.tsv")
+SEASON_ROW = RowMapper(SEASON_COLUMNS)
 
 
-@router.get("/series/{tconst}/episodes")
-async def list_series_episodes(
-    tconst: str,
-    params: ListSeriesEpisodesParams = Depends(),
-    session: AsyncSession = Depends(get_session),
-) -> list[dict[str, Any]]:
-    """episodes in series"""
-    parent_result = await session.execute(select(Title).where(Title.tconst == tconst))
-    parent = parent_result.scalar_one_or_none()
-    if parent is None:
-        raise HTTPException(status_code=404, detail="series not found")
-
+def series_episodes_query(tconst: str, params: ListSeriesEpisodesParams) -> Select:
+    """episodes of series with title and rating, in season and episode order"""
     stmt = (
-        select(Episode, Title, TitleRating)
+        select(*EPISODE_COLUMNS, *EPISODE_TITLE_COLUMNS, *RATING_COLUMNS)
         .join(Title, Title.tconst == Episode.tconst)
         .outerjoin(TitleRating, TitleRating.tconst == Title.tconst)
         .where(Episode.parent_tconst == tconst)
-        .order_by(Episode.season_number, Episode.episode_number)
+        .order_by(Episode.season_number, Episode.episode_number, Episode.tconst)
     )
     if params.season_number:
         stmt = stmt.where(Episode.season_number == params.season_number)
 
-    result = await session.execute(stmt)
-    payloads: list[dict[str, Any]] = []
-    parent_payload = parent.model_dump()
-    for episode, title, rating in result.all():
-        payload = episode.model_dump()
-        payload.update(title.model_dump())
-        if rating:
-            payload.update(rating.model_dump())
-            if payload.get("average_rating") is not None:
-                payload["average_rating"] = round(payload["average_rating"], 1)
-        else:
-            payload["average_rating"] = None
-            payload["num_votes"] = None
-        payload["parent"] = parent_payload
-        payloads.append(payload)
-    return payloads
+    return stmt.limit(params.size).offset((params.page - 1) * params.size)
+
+
+async def _get_parent_row(session: AsyncSession, tconst: str) -> Any:
+    """series title row, raise 404 if missing"""
+    parent_result = await session.execute(select(*TITLE_COLUMNS).where(Title.tconst == tconst))
+    parent_row = parent_result.one_or_none()
+    if parent_row is None:
+        raise HTTPException(status_code=404, detail="series not found")
+
+    return parent_row
+
+
+@router.get(
+    "/series/{tconst}/episodes",
+    response_model=list[dict[str, Any]],
+    dependencies=[
+        Depends(conditional_get(*EPISODE_DATASETS)),
+        Depends(admission_control.dependency("list"), scope="function"),
+        Depends(statement_timeout("list")),
+    ],
+)
+async def list_series_episodes(
+    tconst: str,
+    request: Request,
+    params: ListSeriesEpisodesParams = Depends(),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """episodes in series"""
+
+    async def build() -> list[dict[str, Any]]:
+        parent_row = await _get_parent_row(session, tconst)
+        stmt = series_episodes_query(tconst, params)
+        async with cost_guard(session, stmt, "/api/series/{tconst}/episodes"):
+            result = await session.execute(stmt)
+        parent_payload = json_fragment(PARENT_ROW(parent_row))
+        payloads: list[dict[str, Any]] = []
+        for row in result.all():
+            payload = add_rating(EPISODE_ROW(row), row, RATING_START)
+            payload["parent"] = parent_payload
+            payloads.append(payload)
+        return payloads
+
+    return await cached_json(request, EPISODE_DATASETS, build, coalesce=True)
+
+
+@router.get(
+    "/series/{tconst}/seasons",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*SEASON_DATASETS))],
+)
+async def list_series_seasons(
+    tconst: str,
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """season summary of series"""
+
+    async def build() -> list[dict[str, Any]]:
+        await _get_parent_row(session, tconst)
+        result = await session.execute(
+            select(*SEASON_COLUMNS)
+            .where(SeriesSeason.parent_tconst == tconst)
+            .order_by(SeriesSeason.season_number.nulls_last())  # type: ignore
+        )
+        payloads: list[dict[str, Any]] = []
+        for row in result.all():
+            payload = SEASON_ROW(row)
+            payload["mean_rating"] = round_rating(payload["mean_rating"])
+            payloads.append(payload)
+        return payloads
+
+    return await cached_json(request, SEASON_DATASETS, build)
@@ -0,0 +1,214 @@
+"""import task and dataset stats endpoints"""
+
+from os import environ
+from pathlib import Path
+from stat import S_ISREG
+from typing import Any
+
+from api.params import PaginationParams
+from dependencies import get_session
+from fastapi import APIRouter, Depends
+from generation import dataset_generations
+from models import ImportTask
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(prefix="/api", tags=["ingest"])
+INDEX_TABLES: tuple[str, ...] = (
+    "titles",
+    "people",
+    "title_ratings",
+    "episodes",
+    "title_akas",
+    "title_principals",
+)
+DATASET_TABLE_MAP: dict[str, str] = {
+    "title.basics.tsv": "titles",
+    "name.basics.tsv": "people",
+    "title.ratings.tsv": "title_ratings",
+    "title.episode.tsv": "episodes",
+    "title.akas.tsv": "title_akas",
+    "title.principals.tsv": "title_principals",
+}
+# sizes and planner estimates summed over partitions, database size evaluated once
+TABLE_CATALOG_QUERY = text("""
+    WITH database AS MATERIALIZED (
+        SELECT pg_database_size(current_database()) AS size_bytes
+    )
+    SELECT
+        t.relname AS table_name,
+        SUM(pg_total_relation_size(p.relid))::bigint AS size_bytes,
+        SUM(GREATEST(c.reltuples, 0))::bigint AS row_estimate,
+        MAX(database.size_bytes) AS database_size_bytes
+    FROM pg_class t
+    CROSS JOIN LATERAL pg_partition_tree(t.oid) p
+    JOIN pg_class c ON c.oid = p.relid
+    CROSS JOIN database
+    WHERE t.relname = ANY(:table_names) AND t.relnamespace = 'public'::regnamespace AND p.isleaf
+    GROUP BY t.relname
+    """)
+
+
+class CacheDirUsage:
+    """
+    Bytes of the files in the cache dir and its subdirectories. Every file is
+    stated on each call: downloads and extracts grow in place and files in
+    subdirectories are replaced, neither changes the mtime of the cache dir.
+    The dir only holds the datasets of running imports and the facet and
+    graph arrays, so a call takes a few dozen stat calls.
+    """
+
+    def __init__(self, cache_dir: Path | None) -> None:
+        self.cache_dir = cache_dir
+
+    def size_bytes(self) -> int:
+        """current cache dir size"""
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return 0
+
+        size_bytes = 0
+        for path in self.cache_dir.rglob("*"):
+            try:
+                file_stat = path.stat()
+            except FileNotFoundError:
+                # removed by an import or a swapped build while walking
+                continue
+            if S_ISREG(file_stat.st_mode):
+                size_bytes += file_stat.st_size
+
+        return size_bytes
+
+
+cache_dir_usage = CacheDirUsage(Path(environ["CACHE_DIR"]) if environ.get("CACHE_DIR") else None)
+_stats_cache: dict[tuple[int, ...], dict[str, Any]] = {}
+
+
+def _human_bytes(size_bytes: int) -> str:
+    """format bytes as a human-readable string"""
+    units = ("B", "KB", "MB", "GB", "TB", "PB")
+    size = float(size_bytes)
+    unit_idx = 0
+    while size >= 1024 and unit_idx < len(units) - 1:
+        size /= 1024
+        unit_idx += 1
+    return f"{size:.2f} {units[unit_idx]}"
+
+
+@router.get("/import-tasks")
+async def list_import_tasks(
+    params: PaginationParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+) -> list[dict[str, Any]]:
+    """list paginated import task records"""
+    stmt = (
+        select(ImportTask)
+        .order_by(ImportTask.import_start_time)
+        .limit(params.size)
+        .offset((params.page - 1) * params.size)
+    )
+    result = await session.execute(stmt)
+    tasks = list(result.scalars().all())
+    return [
+        {
+            **task.model_dump(),
+            "size_compressed_mb": round(task.size_compressed / (1024 * 1024), 2),
+            "size_raw_mb": round(task.size_raw / (1024 * 1024), 2),
+        }
+        for task in tasks
+    ]
+
+
+@router.get("/stats")
+async def get_index_stats(
+    session: AsyncSession = Depends(get_session),
+) -> dict[str, Any]:
+    """dataset and index stats"""
+    generations = await dataset_generations.get(DATASET_TABLE_MAP)
+    payload = _stats_cache.get(generations)
+    if payload is None:
+        payload = await _build_index_stats(session)
+        _stats_cache.clear()
+        _stats_cache[generations] = payload
+
+    db_size_bytes = payload["database_size_bytes"]
+    cache_size_bytes = cache_dir_usage.size_bytes()
+    return {
+        "datasets": payload["datasets"],
+        "total_document_count": payload["total_document_count"],
+        "disk_usage_bytes": {
+            "database": db_size_bytes,
+            "cache": cache_size_bytes,
+            "total": db_size_bytes + cache_size_bytes,
+        },
+        "disk_usage_human": {
+            "database": _human_bytes(db_size_bytes),
+            "cache": _human_bytes(cache_size_bytes),
+            "total": _human_bytes(db_size_bytes + cache_size_bytes),
+        },
+        "import_task_count": payload["import_task_count"],
+    }
+
+
+async def _build_index_stats(session: AsyncSession) -> dict[str, Any]:
+    """import task aggregates, row counts and table sizes, without scanning any table"""
+    tasks_result = await session.execute(
+        select(
+            ImportTask.filename,
+            func.count().label("runs"),
+            func.max(ImportTask.import_start_time).label("last_import_time"),
+            func.sum(ImportTask.size_compressed).label("size_compressed_total"),
+            func.sum(ImportTask.size_raw).label("size_raw_total"),
+            func.avg(ImportTask.duration).label("avg_duration"),
+        ).group_by(ImportTask.filename)
+    )
+    task_rows = tasks_result.all()
+    task_stats_by_filename = {
+        row.filename: {
+            "runs": row.runs,
+            "last_import_time": row.last_import_time.isoformat() if row.last_import_time else None,
+            "size_compressed_total": int(row.size_compressed_total or 0),
+            "size_raw_total": int(row.size_raw_total or 0),
+            "avg_duration_seconds": float(row.avg_duration or 0.0),
+        }
+        for row in task_rows
+    }
+
+    row_count_result = await session.execute(
+        select(ImportTask.filename, ImportTask.row_count)
+        .distinct(ImportTask.filename)
+        .order_by(ImportTask.filename, ImportTask.id.desc())  # type: ignore  # pylint: disable=no-member
+    )
+    row_counts = {row.filename: row.row_count for row in row_count_result.all()}
+
+    catalog_result = await session.execute(TABLE_CATALOG_QUERY, {"table_names": list(INDEX_TABLES)})
+    catalog_rows = catalog_result.all()
+    table_catalog = {row.table_name: row for row in catalog_rows}
+    db_size_bytes = int(catalog_rows[0].database_size_bytes) if catalog_rows else 0
+
+    datasets = []
+    for dataset_name, table_name in DATASET_TABLE_MAP.items():
+        stats = task_stats_by_filename.get(dataset_name, {})
+        catalog_row = table_catalog.get(table_name)
+        document_count = row_counts.get(dataset_name)
+        estimated = document_count is None
+        if document_count is None:
+            document_count = int(catalog_row.row_estimate) if catalog_row else 0
+        table_disk_size_bytes = int(catalog_row.size_bytes) if catalog_row else 0
+        datasets.append(
+            {
+                "dataset_name": dataset_name,
+                "indexed": bool(stats),
+                "document_count": document_count,
+                "document_count_estimated": estimated,
+                "disk_usage_bytes": table_disk_size_bytes,
+                "disk_usage_human": _human_bytes(table_disk_size_bytes),
+                **stats,
+            }
+        )
+
+    return {
+        "datasets": datasets,
+        "total_document_count": sum(dataset["document_count"] for dataset in datasets),
+        "database_size_bytes": db_size_bytes,
+        "import_task_count": sum(dataset["runs"] for dataset in datasets if dataset.get("runs")),
+    }
@@ -0,0 +1,57 @@
+"""runtime status endpoints"""
+
+from typing import Any
+
+from admission import admission_control
+from database import pool_stats
+from facets import title_facets
+from fastapi import APIRouter
+from graph import collaboration_graph
+from replicas import replica_router
+from response_cache import response_cache
+from singleflight import single_flight
+
+router = APIRouter(prefix="/api/status", tags=["status"])
+
+
+@router.get("/cache")
+async def get_cache_status() -> dict[str, Any]:
+    """response cache counters"""
+    return response_cache.stats()
+
+
+@router.get("/pools")
+async def get_pool_status() -> dict[str, Any]:
+    """connection pool saturation and checkout latency"""
+    return pool_stats()
+
+
+@router.get("/replicas")
+async def get_replica_status() -> dict[str, Any]:
+    """read replica health, lag and fallback counter"""
+    return replica_router.stats()
+
+
+@router.get("/coalescing")
+async def get_coalescing_status() -> dict[str, Any]:
+    """request coalescing counters"""
+    return single_flight.stats()
+
+
+@router.get("/graph")
+async def get_graph_status() -> dict[str, Any]:
+    """collaboration graph size and build time"""
+    collaboration_graph.load_if_changed()
+    return collaboration_graph.stats()
+
+
+@router.get("/facets")
+async def get_facet_status() -> dict[str, Any]:
+    """title facet bitmap size and build time"""
+    return title_facets.stats()
+
+
+@router.get("/admission")
+async def get_admission_status() -> dict[str, Any]:
+    """admission gate usage and rejection counters"""
+    return admission_control.stats()
@@ -2,24 +2,44 @@
 
 from typing import Annotated, Any
 
+from admission import admission_control
+from api.envelope import Envelope, envelope, estimate_total
 from api.params import CategoryParams, ListTitlesParams
-from dependencies import get_session
-from fastapi import APIRouter, Depends, HTTPException, Query
-from models import Person, Title, TitlePrincipal, TitleRating
-from sqlalchemy import select
+from api.query_cost import cost_guard
+from api.serializers import (
+    PERSON_COLUMNS,
+    PRINCIPAL_COLUMNS,
+    RATING_COLUMNS,
+    TITLE_COLUMNS,
+    RowMapper,
+    add_rating,
+    json_response,
+    round_rating,
+)
+from dependencies import get_read_session, statement_timeout
+from facets import title_facets
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from http_cache import conditional_get
+from models import Person, RatingHistory, SimilarTitle, Title, TitlePrincipal, TitleRating
+from response_cache import cached_json
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/api", tags=["titles"])
+TITLE_DATASETS = ("title.basics.tsv", "title.ratings.tsv")
+PRINCIPAL_DATASETS = ("title.principals.tsv", "name.basics.tsv")
+SIMILAR_DATASETS = ("title.principals.tsv", "title.basics.tsv", "title.ratings.tsv")
+RATING_HISTORY_DATASETS = ("title.ratings.tsv",)
+TITLE_ROW = RowMapper(TITLE_COLUMNS)
+PRINCIPAL_ROW = RowMapper(PRINCIPAL_COLUMNS)
+PRINCIPAL_PERSON_ROW = RowMapper(PERSON_COLUMNS, start=len(PRINCIPAL_COLUMNS))
+RATING_START = len(TITLE_COLUMNS)
+SIMILAR_TITLE_ROW = RowMapper(TITLE_COLUMNS, start=1)
 
 
-@router.get("/titles")
-async def list_titles(
-    params: ListTitlesParams = Depends(),
-    tconst: Annotated[list[str] | None, Query()] = None,
-    session: AsyncSession = Depends(get_session),
-) -> list[dict[str, Any]]:
-    """get list of titles"""
-    stmt = select(Title, TitleRating).outerjoin(TitleRating, TitleRating.tconst == Title.tconst)
+def list_titles_query(params: ListTitlesParams, tconst: list[str] | None = None) -> Select:
+    """titles with rating, filtered and paginated"""
+    stmt = select(*TITLE_COLUMNS, *RATING_COLUMNS).outerjoin(TitleRating, TitleRating.tconst == Title.tconst)
 
     if tconst:
         stmt = stmt.where(Title.tconst.in_(tconst))  # type: ignore  # pylint: disable=no-member
@@ -32,71 +52,160 @@ async def list_titles(
     if params.min_rating is not None:
         stmt = stmt.where(TitleRating.average_rating >= params.min_rating)
 
-    stmt = stmt.limit(params.size).offset((params.page - 1) * params.size)
-    result = await session.execute(stmt)
-    payloads: list[dict[str, Any]] = []
-    for title, rating in result.all():
-        payload = title.model_dump()
-        if rating:
-            payload.update(rating.model_dump())
-            if payload.get("average_rating") is not None:
-                payload["average_rating"] = round(payload["average_rating"], 1)
-        else:
-            payload["average_rating"] = None
-            payload["num_votes"] = None
-        payloads.append(payload)
+    return stmt.limit(params.size).offset((params.page - 1) * params.size)
+
+
+def title_principals_query(tconst: str, params: CategoryParams) -> Select:
+    """principals of title with person, in billing order"""
+    stmt = (
+        select(*PRINCIPAL_COLUMNS, *PERSON_COLUMNS)
+        .join(Person, Person.nconst == TitlePrincipal.nconst)
+        .where(TitlePrincipal.tconst == tconst)
+    )
+    if params.category:
+        stmt = stmt.where(TitlePrincipal.category == params.category)
+    stmt = stmt.order_by(TitlePrincipal.ordering)
+
+    return stmt.limit(params.size).offset((params.page - 1) * params.size)
+
 
-    return payloads
+@router.get(
+    "/titles",
+    response_model=list[dict[str, Any]] | Envelope[dict[str, Any]],
+    dependencies=[
+        Depends(conditional_get(*TITLE_DATASETS)),
+        Depends(admission_control.dependency("list"), scope="function"),
+        Depends(statement_timeout("list")),
+    ],
+)
+async def list_titles(
+    params: ListTitlesParams = Depends(),
+    tconst: Annotated[list[str] | None, Query()] = None,
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """get list of titles, with envelope wrapped with total and facet counts"""
+    stmt = list_titles_query(params, tconst)
+    async with cost_guard(session, stmt, "/api/titles"):
+        result = await session.execute(stmt)
+    titles = [add_rating(TITLE_ROW(row), row, RATING_START) for row in result.all()]
+    if not params.envelope:
+        return json_response(titles)
 
+    if not tconst and title_facets.load_if_changed():
+        bits = title_facets.filter_bits(params.title_type, params.genre, params.year_from, params.min_rating)
+        return json_response(envelope(titles, title_facets.count(bits), True, title_facets.facet_counts(bits)))
 
-@router.get("/titles/{tconst}")
+    total, exact = await estimate_total(session, stmt)
+    return json_response(envelope(titles, total, exact))
+
+
+@router.get(
+    "/titles/{tconst}",
+    response_model=dict[str, Any],
+    dependencies=[Depends(conditional_get(*TITLE_DATASETS))],
+)
 async def get_title(
     tconst: str,
-    session: AsyncSession = Depends(get_session),
-) -> dict[str, Any]:
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
     """get single title"""
-    result = await session.execute(
-        select(Title, TitleRating)
-        .outerjoin(TitleRating, TitleRating.tconst == Title.tconst)
-        .where(Title.tconst == tconst)
-    )
-    row = result.one_or_none()
-    title = row[0] if row else None
-    if title is None:
-        raise HTTPException(status_code=404, detail="title not found")
-    rating = row[1] if row else None
-    payload = title.model_dump()
-    if rating:
-        payload.update(rating.model_dump())
-        if payload.get("average_rating") is not None:
-            payload["average_rating"] = round(payload["average_rating"], 1)
-    else:
-        payload["average_rating"] = None
-        payload["num_votes"] = None
-    return payload
-
-
-@router.get("/titles/{tconst}/principals")
+
+    async def build() -> dict[str, Any]:
+        result = await session.execute(
+            select(*TITLE_COLUMNS, *RATING_COLUMNS)
+            .outerjoin(TitleRating, TitleRating.tconst == Title.tconst)
+            .where(Title.tconst == tconst)
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="title not found")
+        return add_rating(TITLE_ROW(row), row, RATING_START)
+
+    return await cached_json(request, TITLE_DATASETS, build, coalesce=True)
+
+
+@router.get(
+    "/titles/{tconst}/principals",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*PRINCIPAL_DATASETS))],
+)
 async def list_title_principals(
     tconst: str,
+    request: Request,
     params: CategoryParams = Depends(),
-    session: AsyncSession = Depends(get_session),
-) -> list[dict[str, Any]]:
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
     """get list title principal"""
-    stmt = (
-        select(TitlePrincipal, Person)
-        .join(Person, Person.nconst == TitlePrincipal.nconst)
-        .where(TitlePrincipal.tconst == tconst)
-    )
-    if params.category:
-        stmt = stmt.where(TitlePrincipal.category == params.category)
-    stmt = stmt.order_by(TitlePrincipal.ordering)
+    stmt = title_principals_query(tconst, params)
+
+    async def build() -> list[dict[str, Any]]:
+        result = await session.execute(stmt)
+        payloads: list[dict[str, Any]] = []
+        for row in result.all():
+            payload = PRINCIPAL_ROW(row)
+            payload["person"] = PRINCIPAL_PERSON_ROW(row)
+            payloads.append(payload)
+        return payloads
+
+    return await cached_json(request, PRINCIPAL_DATASETS, build)
+
+
+@router.get(
+    "/titles/{tconst}/similar",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*SIMILAR_DATASETS))],
+)
+async def list_similar_titles(
+    tconst: str,
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """precomputed similar titles, most similar first"""
+
+    async def build() -> list[dict[str, Any]]:
+        result = await session.execute(
+            select(SimilarTitle.score, *TITLE_COLUMNS, *RATING_COLUMNS)
+            .join(Title, Title.tconst == SimilarTitle.similar_tconst)
+            .outerjoin(TitleRating, TitleRating.tconst == Title.tconst)
+            .where(SimilarTitle.tconst == tconst)
+            .order_by(SimilarTitle.rank)
+        )
+        rows = result.all()
+        if not rows and await session.scalar(select(Title.tconst).where(Title.tconst == tconst)) is None:
+            raise HTTPException(status_code=404, detail="title not found")
+
+        payloads: list[dict[str, Any]] = []
+        for row in rows:
+            payload = add_rating(SIMILAR_TITLE_ROW(row), row, 1 + RATING_START)
+            payload["score"] = round(row[0], 4)
+            payloads.append(payload)
+        return payloads
+
+    return await cached_json(request, SIMILAR_DATASETS, build)
+
+
+@router.get(
+    "/titles/{tconst}/ratings-history",
+    response_model=list[dict[str, Any]],
+    dependencies=[Depends(conditional_get(*RATING_HISTORY_DATASETS))],
+)
+async def list_title_rating_history(
+    tconst: str,
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """rating and votes at every import that changed them, oldest first"""
+
+    async def build() -> list[dict[str, Any]]:
+        result = await session.execute(
+            select(RatingHistory.snapshot_date, RatingHistory.average_rating, RatingHistory.num_votes)
+            .where(RatingHistory.tconst == tconst)
+            .order_by(RatingHistory.snapshot_date)
+        )
+        return [
+            {"snapshot_date": snapshot_date, "average_rating": round_rating(average_rating), "num_votes": num_votes}
+            for snapshot_date, average_rating, num_votes in result.all()
+        ]
 
-    stmt = stmt.limit(params.size).offset((params.page - 1) * params.size)
-    result = await session.execute(stmt)
-    payloads: list[dict[str, Any]] = []
-    for principal, person in result.all():
-        payload = principal.model_dump()
-        payload["person"] = person.model_dump()
-        payloads.append(payload)
-    return payloads
+    return await cached_json(request, RATING_HISTORY_DATASETS, build)
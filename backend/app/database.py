@@ -1,17 +1,154 @@
 """connect to PG"""
 
+import asyncio
+import logging
 from os import environ
+from time import perf_counter
+from typing import Any
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncpg
+from metrics import instrument_engine
+from roles import WEB_CONCURRENCY, serves_ingest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel import SQLModel
 
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    """parse non negative integer env var"""
+    value = environ.get(name)
+    if value is None or value == "":
+        return default
+
+    if not value.isdigit():
+        raise ValueError(f"failed to parse {name}, expected a none negative integer.")
+
+    return int(value)
+
+
 DATABASE_URL = environ["DATABASE_URL"]
+DATABASE_URL_SYNC = environ.get("DATABASE_URL_SYNC", "")
+DB_CONNECTION_BUDGET = _env_int("DB_CONNECTION_BUDGET", 0)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = float(environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+DB_STATEMENT_CACHE_SIZE = _env_int("DB_STATEMENT_CACHE_SIZE", 500)
+DB_PGBOUNCER = environ.get("DB_PGBOUNCER", "").lower() in ("1", "true", "yes")
+DB_API_WORK_MEM = environ.get("DB_API_WORK_MEM", "")
+DB_INGEST_POOL_SIZE = _env_int("DB_INGEST_POOL_SIZE", 2)
+DB_INGEST_PARTITION_WORKERS = _env_int("DB_INGEST_PARTITION_WORKERS", 8)
+DB_INGEST_WORK_MEM = environ.get("DB_INGEST_WORK_MEM", "")
+DB_INGEST_MAINTENANCE_WORK_MEM = environ.get("DB_INGEST_MAINTENANCE_WORK_MEM", "")
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    future=True,
-)
+
+class PoolMetrics:
+    """checkout latency and timeout counters of a pool"""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, wait_seconds: float) -> None:
+        """record one successful checkout"""
+        self.checkouts += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """counters as dict"""
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """async queue pool recording checkout wait time and timeouts"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> Any:
+        start = perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+
+        self.metrics.record_checkout(perf_counter() - start)
+        return conn
+
+
+def _server_settings(application_name: str, settings: dict[str, str]) -> dict[str, str]:
+    """session GUCs sent on connect, PgBouncer only accepts the application name"""
+    server_settings = {"application_name": application_name}
+    configured = {key: value for key, value in settings.items() if value}
+    if configured and DB_PGBOUNCER:
+        logger.warning("session settings are not supported with DB_PGBOUNCER, ignoring: %s", ", ".join(configured))
+        return server_settings
+
+    server_settings.update(configured)
+    return server_settings
+
+
+def _api_pool_size() -> tuple[int, int]:
+    """pool size and overflow per worker, from the connection budget if configured"""
+    if not DB_CONNECTION_BUDGET:
+        return DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+    budget = DB_CONNECTION_BUDGET
+    if serves_ingest():
+        budget -= DB_INGEST_POOL_SIZE + DB_INGEST_PARTITION_WORKERS
+
+    return max(1, budget // max(1, WEB_CONCURRENCY)), 0
+
+
+def _api_connect_args() -> dict[str, Any]:
+    """asyncpg connect arguments of the api engine"""
+    connect_args: dict[str, Any] = {
+        "server_settings": _server_settings("imdb-db-api", {"work_mem": DB_API_WORK_MEM}),
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+    if DB_PGBOUNCER:
+        # transaction pooling can route statements to other backends, never reuse prepared statements
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+    return connect_args
+
+
+def create_api_engine(database_url: str) -> AsyncEngine:
+    """create async engine with configured pool and session settings"""
+    pool_size, max_overflow = _api_pool_size()
+    api_engine = create_async_engine(
+        database_url,
+        echo=False,
+        future=True,
+        poolclass=MeteredQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args=_api_connect_args(),
+    )
+    instrument_engine(api_engine)
+    return api_engine
+
+
+engine = create_api_engine(DATABASE_URL)
 
 
 AsyncSessionLocal = async_sessionmaker(
@@ -19,6 +156,93 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+_ingest_pool: asyncpg.Pool | None = None
+_partition_pool: asyncpg.Pool | None = None
+_ingest_pool_lock = asyncio.Lock()
+
+
+async def _create_ingest_pool(max_size: int) -> asyncpg.Pool:
+    """asyncpg pool with ingest session settings"""
+    return await asyncpg.create_pool(
+        dsn=DATABASE_URL_SYNC,
+        min_size=1,
+        max_size=max_size,
+        statement_cache_size=0 if DB_PGBOUNCER else DB_STATEMENT_CACHE_SIZE,
+        server_settings=_server_settings(
+            "imdb-db-ingest",
+            {
+                "work_mem": DB_INGEST_WORK_MEM,
+                "maintenance_work_mem": DB_INGEST_MAINTENANCE_WORK_MEM,
+            },
+        ),
+    )
+
+
+async def get_ingest_pool() -> asyncpg.Pool:
+    """shared asyncpg pool for ingest, created on first use"""
+    global _ingest_pool  # pylint: disable=global-statement
+
+    async with _ingest_pool_lock:
+        if _ingest_pool is None:
+            _ingest_pool = await _create_ingest_pool(max(1, DB_INGEST_POOL_SIZE))
+
+    return _ingest_pool
+
+
+async def get_partition_pool() -> asyncpg.Pool:
+    """
+    Separate asyncpg pool for partition workers, created on first use. The
+    ingest keeps its own connection while partitions are merged, a shared
+    pool would serialize the merge or run out of connections.
+    """
+    global _partition_pool  # pylint: disable=global-statement
+
+    async with _ingest_pool_lock:
+        if _partition_pool is None:
+            _partition_pool = await _create_ingest_pool(max(1, DB_INGEST_PARTITION_WORKERS))
+
+    return _partition_pool
+
+
+async def close_pools() -> None:
+    """close ingest pools and dispose api engine connections"""
+    global _ingest_pool, _partition_pool  # pylint: disable=global-statement
+
+    for pool in (_ingest_pool, _partition_pool):
+        if pool is not None:
+            await pool.close()
+    _ingest_pool = _partition_pool = None
+
+    await engine.dispose()
+
+
+def pool_stats() -> dict[str, Any]:
+    """saturation and checkout counters of all pools"""
+    api_pool = engine.sync_engine.pool
+    _, max_overflow = _api_pool_size()
+    api_stats: dict[str, Any] = {
+        "size": api_pool.size(),  # type: ignore[attr-defined]
+        "max_overflow": max_overflow,
+        "checked_out": api_pool.checkedout(),  # type: ignore[attr-defined]
+        "checked_in": api_pool.checkedin(),  # type: ignore[attr-defined]
+        "overflow": max(0, api_pool.overflow()),  # type: ignore[attr-defined]
+    }
+    capacity = api_stats["size"] + api_stats["max_overflow"]
+    api_stats["saturation"] = round(api_stats["checked_out"] / capacity, 3) if capacity else 0.0
+    if isinstance(api_pool, MeteredQueuePool):
+        api_stats.update(api_pool.metrics.as_dict())
+
+    stats: dict[str, Any] = {"api": api_stats}
+    for name, pool in (("ingest", _ingest_pool), ("ingest_partitions", _partition_pool)):
+        if pool is not None:
+            stats[name] = {
+                "size": pool.get_size(),
+                "max_size": pool.get_max_size(),
+                "idle": pool.get_idle_size(),
+            }
+
+    return stats
+
 
 async def init_db() -> None:
     """async init db"""
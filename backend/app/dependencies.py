@@ -2,19 +2,71 @@
 
 import secrets
 from os import environ
-from typing import Annotated, AsyncGenerator
+from typing import Annotated, AsyncGenerator, Awaitable, Callable
 
 from database import AsyncSessionLocal
-from fastapi import Header, HTTPException
+from dictionary import code_dictionary
+from fastapi import Depends, Header, HTTPException
+from generation import dataset_generations
+from replicas import is_connection_error, replica_router
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# statement_timeout budgets per route class, 0 to disable
+STATEMENT_TIMEOUTS_MS = {
+    "search": int(environ.get("DB_SEARCH_STATEMENT_TIMEOUT_MS", "5000")),
+    "list": int(environ.get("DB_LIST_STATEMENT_TIMEOUT_MS", "5000")),
+}
+
+
+async def _refresh_code_dictionary(session: AsyncSession) -> None:
+    """reload dictionary codes once per dataset generation"""
+    await code_dictionary.refresh(session, await dataset_generations.latest())
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Async database session dependency"""
     async with AsyncSessionLocal() as session:
+        await _refresh_code_dictionary(session)
         yield session
 
 
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Async database session dependency for read-only endpoints, served by a replica when available"""
+    replica = await replica_router.pick()
+    if replica is None:
+        async with AsyncSessionLocal() as session:
+            await _refresh_code_dictionary(session)
+            yield session
+        return
+
+    async with replica.sessionmaker() as session:
+        try:
+            await _refresh_code_dictionary(session)
+            yield session
+        except Exception as exc:
+            if is_connection_error(exc):
+                replica_router.mark_unhealthy(replica)
+            raise
+
+
+def statement_timeout(route_class: str) -> Callable[[AsyncSession], Awaitable[None]]:
+    """
+    Build dependency limiting every statement of the read session to the
+    budget of the route class. Set for the transaction only, so the pooled
+    connection keeps its default.
+    """
+    timeout_ms = STATEMENT_TIMEOUTS_MS[route_class]
+
+    async def set_statement_timeout(session: AsyncSession = Depends(get_read_session)) -> None:
+        if timeout_ms:
+            await session.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"), {"timeout": f"{timeout_ms}ms"}
+            )
+
+    return set_statement_timeout
+
+
 async def verify_bearer_token(
     authorization: Annotated[str | None, Header()] = None,
 ) -> None:
@@ -0,0 +1,119 @@
+"""smallint codes of low cardinality text columns"""
+
+import asyncio
+import logging
+from typing import Any, Iterable
+
+from sqlalchemy import SmallInteger, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import TypeDecorator
+
+logger = logging.getLogger(__name__)
+
+
+class CodeDictionary:
+    """
+    In-memory copy of dictionary_codes. Codes are only ever appended by
+    imports, the copy is reloaded when the dataset generation changed.
+    """
+
+    def __init__(self) -> None:
+        self.generation: int | None = None
+        self._values: dict[str, dict[int, str]] = {}
+        self._codes: dict[str, dict[str, int]] = {}
+        self._lock = asyncio.Lock()
+
+    def encode(self, domain: str, value: str) -> int | None:
+        """code of value, None if the value never occurred"""
+        return self._codes.get(domain, {}).get(value)
+
+    def decode(self, domain: str, code: int) -> str | None:
+        """value of code"""
+        value = self._values.get(domain, {}).get(code)
+        if value is None:
+            logger.warning("unknown dictionary code domain=%s code=%s", domain, code)
+        return value
+
+    def load(self, rows: Iterable[tuple[str, int, str]], generation: int) -> None:
+        """replace dictionary with rows of domain, code and value"""
+        values: dict[str, dict[int, str]] = {}
+        for domain, code, value in rows:
+            values.setdefault(domain, {})[code] = value
+
+        self._values = values
+        self._codes = {domain: {value: code for code, value in codes.items()} for domain, codes in values.items()}
+        self.generation = generation
+
+    async def refresh(self, session: AsyncSession, generation: int) -> None:
+        """reload from database if loaded for another generation"""
+        if self.generation == generation:
+            return
+
+        async with self._lock:
+            if self.generation == generation:
+                return
+
+            result = await session.execute(text("SELECT domain, code, value FROM dictionary_codes"))
+            self.load(result.tuples().all(), generation)
+            logger.info("loaded dictionary codes generation=%s codes=%s", generation, self.size)
+
+    @property
+    def size(self) -> int:
+        """number of codes over all domains"""
+        return sum(len(codes) for codes in self._values.values())
+
+
+code_dictionary = CodeDictionary()
+
+
+class CodedText(TypeDecorator):  # pylint: disable=too-many-ancestors,abstract-method
+    """text stored as smallint code of a dictionary domain"""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, domain: str) -> None:
+        super().__init__()
+        self.domain = domain
+
+    def process_bind_param(self, value: Any, dialect: Any) -> int | None:
+        if value is None:
+            return None
+        return code_dictionary.encode(self.domain, value)
+
+    def process_result_value(self, value: Any, dialect: Any) -> str | None:
+        if value is None:
+            return None
+        return code_dictionary.decode(self.domain, value)
+
+
+def encode_sql(domain: str, expression: str) -> str:
+    """sql expression coding a text expression"""
+    return f"(SELECT c.code FROM dictionary_codes c WHERE c.domain = '{domain}' AND c.value = {expression})"
+
+
+def encode_array_sql(domain: str, expression: str) -> str:
+    """sql expression coding a text[] expression, keeps element order"""
+    return f"""
+        CASE WHEN {expression} IS NULL THEN NULL ELSE ARRAY(
+            SELECT d.code
+            FROM unnest({expression}) WITH ORDINALITY AS e(value, position)
+            JOIN dictionary_codes d ON d.domain = '{domain}' AND d.value = e.value
+            ORDER BY e.position
+        ) END"""
+
+
+def decode_sql(domain: str, expression: str) -> str:
+    """sql expression decoding a smallint expression"""
+    return f"(SELECT c.value FROM dictionary_codes c WHERE c.domain = '{domain}' AND c.code = {expression})"
+
+
+def decode_array_sql(domain: str, expression: str) -> str:
+    """sql expression decoding a smallint[] expression, keeps element order"""
+    return f"""
+        CASE WHEN {expression} IS NULL THEN NULL ELSE ARRAY(
+            SELECT d.value
+            FROM unnest({expression}) WITH ORDINALITY AS e(code, position)
+            JOIN dictionary_codes d ON d.domain = '{domain}' AND d.code = e.code
+            ORDER BY e.position
+        ) END"""
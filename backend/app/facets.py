@@ -0,0 +1,137 @@
+"""title facet bitmaps for totals and facet counts without scanning titles"""
+
+import logging
+import math
+from os import environ
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from npy_store import NpyDirectory, swap_npy_dir
+
+logger = logging.getLogger(__name__)
+
+FACETS_DIR = Path(environ.get("FACETS_DIR") or Path(environ.get("CACHE_DIR", ".")) / "facets")
+FACET_NAMES: tuple[str, ...] = ("title_type", "genre", "decade")
+RANGE_NAMES: tuple[str, ...] = ("start_year", "rating_tenths")
+# genre codes above 62 do not fit the signed 64 bit genre mask
+MAX_GENRE_CODE = 62
+
+
+def build_facet_arrays(
+    title_types: np.ndarray, genre_masks: np.ndarray, start_years: np.ndarray, rating_tenths: np.ndarray
+) -> tuple[dict[str, np.ndarray], dict[str, list[int]]]:
+    """
+    One packed bitmap per facet value with a bit per title, in the same title
+    order for every bitmap. Title types and genres are dictionary codes, genre
+    masks have bit code set for every genre of the title.
+    """
+    arrays: dict[str, np.ndarray] = {}
+    values: dict[str, list[int]] = {}
+    decades = start_years // 10 * 10
+    for name, column in (("title_type", title_types), ("decade", decades)):
+        facet_values = [int(value) for value in np.unique(column) if value > 0]
+        values[name] = facet_values
+        arrays[name] = _packed_rows([column == value for value in facet_values], len(column))
+
+    genre_codes = [code for code in range(1, MAX_GENRE_CODE + 1) if np.any(genre_masks & (1 << code))]
+    values["genre"] = genre_codes
+    arrays["genre"] = _packed_rows([(genre_masks & (1 << code)) != 0 for code in genre_codes], len(genre_masks))
+
+    arrays["start_year"] = start_years.astype(np.int16)
+    arrays["rating_tenths"] = rating_tenths.astype(np.int16)
+    return arrays, values
+
+
+def _packed_rows(masks: list[np.ndarray], title_count: int) -> np.ndarray:
+    """boolean masks as rows of packed bits"""
+    packed = np.zeros((len(masks), math.ceil(title_count / 8)), dtype=np.uint8)
+    for row, mask in enumerate(masks):
+        packed[row] = np.packbits(mask)
+    return packed
+
+
+def save_facets(arrays: dict[str, np.ndarray], labels: dict[str, list[str]], facets_dir: Path) -> None:
+    """write bitmaps and their labels, then swap the facets directory in place"""
+    meta = {"titles": len(arrays["start_year"]), "labels": labels}
+    swap_npy_dir({name: arrays[name] for name in FACET_NAMES + RANGE_NAMES}, meta, facets_dir)
+    logger.info("saved title facets titles=%s", meta["titles"])
+
+
+class TitleFacets(NpyDirectory):
+    """
+    Read-only view of the persisted facet bitmaps, memory mapped and reloaded
+    when a new build replaced the files. Filters are intersected bitwise and
+    counted with popcount, no query touches the titles table.
+    """
+
+    ARRAY_NAMES = FACET_NAMES + RANGE_NAMES
+    DESCRIPTION = "title facets"
+
+    def __init__(self, facets_dir: Path) -> None:
+        super().__init__(facets_dir)
+        self._positions: dict[str, dict[str, int]] = {}
+        self._all_bits = np.empty(0, dtype=np.uint8)
+
+    def _on_load(self, meta: dict[str, Any], arrays: dict[str, np.ndarray]) -> None:
+        self._positions = {
+            name: {label: position for position, label in enumerate(meta["labels"][name])} for name in FACET_NAMES
+        }
+        self._all_bits = np.packbits(np.ones(meta["titles"], dtype=bool))
+
+    def filter_bits(
+        self,
+        title_type: str | None = None,
+        genre: str | None = None,
+        year_from: int | None = None,
+        min_rating: float | None = None,
+    ) -> np.ndarray:
+        """packed bits of titles matching all filters"""
+        bits = self._all_bits.copy()
+        for name, label in (("title_type", title_type), ("genre", genre)):
+            if label:
+                position = self._positions[name].get(label)
+                if position is None:
+                    return np.zeros_like(bits)
+                bits &= self._arrays[name][position]
+
+        if year_from:
+            bits &= np.packbits(self._arrays["start_year"] >= year_from)
+        if min_rating is not None:
+            # stored as rounded tenths, titles without rating are -1
+            bits &= np.packbits(self._arrays["rating_tenths"] >= math.ceil(round(min_rating * 10, 6)))
+
+        return bits
+
+    def count(self, bits: np.ndarray) -> int:
+        """titles set in bits"""
+        return int(np.bitwise_count(bits).sum())
+
+    def facet_counts(self, bits: np.ndarray) -> dict[str, dict[str, int]]:
+        """titles set in bits per value of every facet, values without titles left out"""
+        facets: dict[str, dict[str, int]] = {}
+        for name in FACET_NAMES:
+            value_counts: dict[str, int] = {}
+            for label, value_bits in zip(self.meta["labels"][name], self._arrays[name]):
+                value_count = int(np.bitwise_count(value_bits & bits).sum())
+                if value_count:
+                    value_counts[label] = value_count
+            facets[name] = value_counts
+
+        return facets
+
+    def stats(self) -> dict[str, Any]:
+        """facet sizes and build time"""
+        if not self.load_if_changed():
+            return {"loaded": False}
+
+        return {
+            "loaded": True,
+            "titles": self.meta["titles"],
+            "values": {name: len(self.meta["labels"][name]) for name in FACET_NAMES},
+            "size_bytes": sum(array.nbytes for array in self._arrays.values()),
+            "built_at": self.meta["built_at"],
+        }
+
+
+title_facets = TitleFacets(FACETS_DIR)
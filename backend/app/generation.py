@@ -0,0 +1,91 @@
+"""dataset generations derived from the latest import task per dataset"""
+
+import asyncio
+import logging
+from os import environ
+from time import monotonic
+from typing import Callable, Iterable
+
+from database import AsyncSessionLocal
+from models import ImportTask
+from sqlalchemy import func, select
+
+logger = logging.getLogger(__name__)
+
+GENERATION_REFRESH_SECONDS = float(environ.get("GENERATION_REFRESH_SECONDS", "30"))
+
+
+class DatasetGenerations:
+    """
+    In-memory view of the latest import task id per dataset.
+    Bumped directly by in-process imports, refreshed from the database
+    at most once per interval to pick up imports of other processes.
+    """
+
+    def __init__(self, refresh_seconds: float) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._generations: dict[str, int] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._listeners: list[Callable[[set[str]], None]] = []
+
+    def add_listener(self, listener: Callable[[set[str]], None]) -> None:
+        """register callback receiving the dataset names with a new generation"""
+        self._listeners.append(listener)
+
+    def current(self, dataset_names: Iterable[str]) -> tuple[int, ...]:
+        """last known generations without refresh"""
+        return tuple(self._generations.get(dataset_name, 0) for dataset_name in dataset_names)
+
+    async def get(self, dataset_names: Iterable[str]) -> tuple[int, ...]:
+        """generations of datasets, refresh first if stale"""
+        if self._is_stale():
+            await self.refresh()
+        return self.current(dataset_names)
+
+    async def latest(self) -> int:
+        """highest generation over all datasets, refresh first if stale"""
+        if self._is_stale():
+            await self.refresh()
+        return max(self._generations.values(), default=0)
+
+    async def refresh(self) -> None:
+        """load latest import task id per dataset"""
+        async with self._lock:
+            if not self._is_stale():
+                return
+
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(ImportTask.filename, func.max(ImportTask.id)).group_by(ImportTask.filename)
+                )
+                generations = {filename: int(task_id) for filename, task_id in result.all()}
+
+            self._update(generations)
+            self._loaded_at = monotonic()
+
+    def bump(self, dataset_name: str, generation: int) -> None:
+        """set generation after a completed in-process import"""
+        self._update({dataset_name: generation})
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def _update(self, generations: dict[str, int]) -> None:
+        changed = {
+            dataset_name
+            for dataset_name, generation in generations.items()
+            if self._generations.get(dataset_name, 0) < generation
+        }
+        if not changed:
+            return
+
+        for dataset_name in changed:
+            self._generations[dataset_name] = generations[dataset_name]
+
+        logger.info("dataset generation changed datasets=%s", ", ".join(sorted(changed)))
+        for listener in self._listeners:
+            listener(changed)
+
+
+dataset_generations = DatasetGenerations(refresh_seconds=GENERATION_REFRESH_SECONDS)
@@ -0,0 +1,270 @@
+"""person title collaboration graph as compressed sparse row arrays"""
+
+import logging
+from os import environ
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from npy_store import NpyDirectory, swap_npy_dir
+
+logger = logging.getLogger(__name__)
+
+GRAPH_DIR = Path(environ.get("GRAPH_DIR") or Path(environ.get("CACHE_DIR", ".")) / "graph")
+GRAPH_MAX_VISITED = int(environ.get("GRAPH_MAX_VISITED", "2000000"))
+
+PERSON = "person"
+TITLE = "title"
+ARRAY_NAMES: tuple[str, ...] = (
+    "person_ids",
+    "person_offsets",
+    "person_titles",
+    "person_categories",
+    "title_ids",
+    "title_offsets",
+    "title_people",
+    "title_categories",
+)
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+class GraphSearchLimitError(Exception):
+    """search visited more nodes than GRAPH_MAX_VISITED"""
+
+
+def encode_nconst(person_id: int) -> str:
+    """numeric id to nconst"""
+    return f"nm{person_id:07d}"
+
+
+def encode_tconst(title_id: int) -> str:
+    """numeric id to tconst"""
+    return f"tt{title_id:07d}"
+
+
+def decode_const(const: str, prefix: str) -> int | None:
+    """numeric part of nconst or tconst, None if malformed"""
+    start = len(prefix)
+    digits = const[start:]
+    if not const.startswith(prefix) or not digits.isdigit():
+        return None
+
+    return int(digits)
+
+
+def _csr(
+    sources: np.ndarray, targets: np.ndarray, categories: np.ndarray, node_count: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """offsets, targets and edge categories grouped by source node"""
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+    return offsets, targets[order].astype(np.int32), categories[order].astype(np.uint8)
+
+
+def build_graph_arrays(
+    person_values: np.ndarray, title_values: np.ndarray, category_codes: np.ndarray
+) -> dict[str, np.ndarray]:
+    """build person to title and title to person adjacency from edge lists"""
+    person_ids, person_index = np.unique(person_values, return_inverse=True)
+    title_ids, title_index = np.unique(title_values, return_inverse=True)
+
+    person_offsets, person_titles, person_categories = _csr(person_index, title_index, category_codes, len(person_ids))
+    title_offsets, title_people, title_categories = _csr(title_index, person_index, category_codes, len(title_ids))
+    return {
+        "person_ids": person_ids.astype(np.int32),
+        "person_offsets": person_offsets,
+        "person_titles": person_titles,
+        "person_categories": person_categories,
+        "title_ids": title_ids.astype(np.int32),
+        "title_offsets": title_offsets,
+        "title_people": title_people,
+        "title_categories": title_categories,
+    }
+
+
+def save_graph(arrays: dict[str, np.ndarray], categories: list[str], graph_dir: Path) -> None:
+    """write arrays and their meta, then swap the graph directory in place"""
+    meta = {
+        "categories": categories,
+        "people": len(arrays["person_ids"]),
+        "titles": len(arrays["title_ids"]),
+        "edges": len(arrays["person_titles"]),
+    }
+    swap_npy_dir({name: arrays[name] for name in ARRAY_NAMES}, meta, graph_dir)
+    logger.info("saved collaboration graph people=%s titles=%s edges=%s", meta["people"], meta["titles"], meta["edges"])
+
+
+class _Search:
+    """one side of a bidirectional breadth first search"""
+
+    def __init__(self, start: int) -> None:
+        self.parents: dict[str, dict[int, int]] = {PERSON: {start: -1}, TITLE: {}}
+        self.levels: dict[str, list[np.ndarray]] = {PERSON: [np.array([start], dtype=np.int64)], TITLE: []}
+        self.visited: dict[str, np.ndarray] = {PERSON: np.array([start], dtype=np.int64), TITLE: EMPTY}
+        self.frontier = self.visited[PERSON]
+        self.kind = PERSON
+
+    @property
+    def visited_count(self) -> int:
+        """nodes seen on this side"""
+        return len(self.parents[PERSON]) + len(self.parents[TITLE])
+
+    def trace(self, kind: str, node: int) -> list[tuple[str, int]]:
+        """nodes from node back to the start"""
+        path = [(kind, node)]
+        while (parent := self.parents[kind][node]) != -1:
+            kind = TITLE if kind == PERSON else PERSON
+            node = parent
+            path.append((kind, node))
+        return path
+
+
+class CollaborationGraph(NpyDirectory):
+    """
+    Read-only view of the persisted graph, arrays are memory mapped.
+    Reloaded when a new build replaced the files on disk.
+    """
+
+    ARRAY_NAMES = ARRAY_NAMES
+    DESCRIPTION = "collaboration graph"
+
+    def __init__(self, graph_dir: Path) -> None:
+        super().__init__(graph_dir)
+        self.categories: list[str] = []
+
+    def _on_load(self, meta: dict[str, Any], arrays: dict[str, np.ndarray]) -> None:
+        self.categories = meta["categories"]
+
+    def person_index(self, nconst: str) -> int | None:
+        """graph node of person, None if person has no credits"""
+        person_id = decode_const(nconst, "nm")
+        if person_id is None:
+            return None
+
+        person_ids = self._arrays["person_ids"]
+        position = int(np.searchsorted(person_ids, person_id))
+        if position < len(person_ids) and person_ids[position] == person_id:
+            return position
+
+        return None
+
+    def nconst(self, person_index: int) -> str:
+        """nconst of graph node"""
+        return encode_nconst(int(self._arrays["person_ids"][person_index]))
+
+    def tconst(self, title_index: int) -> str:
+        """tconst of graph node"""
+        return encode_tconst(int(self._arrays["title_ids"][title_index]))
+
+    def category_mask(self, categories: list[str] | None) -> np.ndarray | None:
+        """edge filter by category code, None to keep all edges"""
+        if not categories:
+            return None
+
+        return np.isin(np.array(self.categories, dtype=object), categories)
+
+    def shortest_path(
+        self, source: int, target: int, category_mask: np.ndarray | None, max_hops: int
+    ) -> list[tuple[str, int]] | None:
+        """alternating person and title nodes of a shortest path, None if further than max_hops"""
+        if source == target:
+            return [(PERSON, source)]
+
+        forward, backward = _Search(source), _Search(target)
+        for _ in range(2 * max_hops):
+            if not len(forward.frontier) or not len(backward.frontier):
+                return None
+
+            side, other = forward, backward
+            if self._edge_count(backward) < self._edge_count(forward):
+                side, other = backward, forward
+
+            self._step(side, category_mask)
+            if forward.visited_count + backward.visited_count > GRAPH_MAX_VISITED:
+                raise GraphSearchLimitError("path search exceeded the node budget")
+
+            meeting = self._meeting(side, other)
+            if meeting is not None:
+                path = forward.trace(side.kind, meeting)[::-1] + backward.trace(side.kind, meeting)[1:]
+                return path
+
+        return None
+
+    def neighborhood(self, source: int, category_mask: np.ndarray | None, hops: int) -> tuple[np.ndarray, np.ndarray]:
+        """people within hops of source and their distance, ordered by distance"""
+        search = _Search(source)
+        people: list[np.ndarray] = []
+        distances: list[np.ndarray] = []
+        for hop in range(1, hops + 1):
+            self._step(search, category_mask)
+            self._step(search, category_mask)
+            if search.visited_count > GRAPH_MAX_VISITED:
+                raise GraphSearchLimitError("neighborhood exceeded the node budget")
+
+            people.append(search.frontier)
+            distances.append(np.full(len(search.frontier), hop, dtype=np.int64))
+
+        if not people:
+            return EMPTY, EMPTY
+
+        return np.concatenate(people), np.concatenate(distances)
+
+    def stats(self) -> dict[str, Any]:
+        """graph size and build time"""
+        return {"loaded": bool(self._arrays), **self.meta}
+
+    def _adjacency(self, kind: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if kind == PERSON:
+            return self._arrays["person_offsets"], self._arrays["person_titles"], self._arrays["person_categories"]
+
+        return self._arrays["title_offsets"], self._arrays["title_people"], self._arrays["title_categories"]
+
+    def _edge_count(self, search: _Search) -> int:
+        offsets, _, _ = self._adjacency(search.kind)
+        return int((offsets[search.frontier + 1] - offsets[search.frontier]).sum())
+
+    def _expand(self, kind: str, nodes: np.ndarray, category_mask: np.ndarray | None) -> tuple[np.ndarray, np.ndarray]:
+        """neighbors of nodes, with the node each neighbor was reached from"""
+        offsets, targets, categories = self._adjacency(kind)
+        starts = offsets[nodes]
+        lengths = offsets[nodes + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return EMPTY, EMPTY
+
+        sources = np.repeat(nodes, lengths)
+        edges = np.arange(total, dtype=np.int64) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        neighbors = targets[edges].astype(np.int64)
+        if category_mask is not None:
+            keep = category_mask[categories[edges]]
+            neighbors, sources = neighbors[keep], sources[keep]
+
+        return neighbors, sources
+
+    def _step(self, search: _Search, category_mask: np.ndarray | None) -> None:
+        """expand search by one level, person to title or title to person"""
+        next_kind = TITLE if search.kind == PERSON else PERSON
+        neighbors, sources = self._expand(search.kind, search.frontier, category_mask)
+        neighbors, first = np.unique(neighbors, return_index=True)
+        sources = sources[first]
+
+        new = ~np.isin(neighbors, search.visited[next_kind], assume_unique=True)
+        neighbors, sources = neighbors[new], sources[new]
+
+        search.parents[next_kind].update(zip(neighbors.tolist(), sources.tolist()))
+        search.visited[next_kind] = np.union1d(search.visited[next_kind], neighbors)
+        search.levels[next_kind].append(neighbors)
+        search.frontier, search.kind = neighbors, next_kind
+
+    def _meeting(self, side: _Search, other: _Search) -> int | None:
+        """frontier node of side seen by other at the lowest level"""
+        for level in other.levels[side.kind]:
+            common = np.intersect1d(side.frontier, level, assume_unique=True)
+            if len(common):
+                return int(common[0])
+
+        return None
+
+
+collaboration_graph = CollaborationGraph(GRAPH_DIR)
@@ -0,0 +1,101 @@
+"""conditional GET support keyed to dataset import generations"""
+
+import hashlib
+from os import environ
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException, Request
+from generation import dataset_generations
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HTTP_CACHE_CONTROL = environ.get("HTTP_CACHE_CONTROL", "public, max-age=60")
+ETAG_SEED = environ.get("GIT_COMMIT", "unknown")
+
+
+def request_key(request: Request) -> str:
+    """route path with normalized query string"""
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def route_path(request: Request) -> str:
+    """path template of the matched route"""
+    route = request.scope.get("route")
+    return getattr(route, "path", request.url.path)
+
+
+def _make_etag(request: Request, dataset_names: tuple[str, ...], generations: tuple[int, ...]) -> str:
+    """weak etag from build, route, normalized query and dataset generations"""
+    generation_tag = ",".join(f"{name}:{generation}" for name, generation in zip(dataset_names, generations))
+    digest = hashlib.sha1(
+        f"{ETAG_SEED}|{request_key(request)}|{generation_tag}".encode("utf-8"),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """weak comparison of If-None-Match header against etag"""
+    if not if_none_match:
+        return False
+
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+
+    return etag.removeprefix("W/") in {candidate.removeprefix("W/") for candidate in candidates}
+
+
+def _cache_headers(etag: str) -> dict[str, str]:
+    """validator and freshness headers"""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": HTTP_CACHE_CONTROL,
+    }
+    if environ.get("API_TOKEN"):
+        headers["Vary"] = "Authorization"
+
+    return headers
+
+
+def conditional_get(*dataset_names: str) -> Callable[[Request], Awaitable[None]]:
+    """
+    Build dependency answering If-None-Match with 304 before the endpoint runs.
+    The etag changes with the next completed import of any of the datasets.
+    """
+
+    async def check_etag(request: Request) -> None:
+        generations = await dataset_generations.get(dataset_names)
+        etag = _make_etag(request, dataset_names, generations)
+        headers = _cache_headers(etag)
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+
+        request.state.cache_headers = headers
+
+    return check_etag
+
+
+class CacheHeadersMiddleware:
+    """add headers stored by conditional_get to successful responses"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                cache_headers = scope.get("state", {}).get("cache_headers")
+                if cache_headers:
+                    headers = MutableHeaders(scope=message)
+                    for key, value in cache_headers.items():
+                        headers[key] = value
+
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_headers)
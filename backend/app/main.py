@@ -16,14 +16,26 @@ except ModuleNotFoundError:
 
 from os import environ
 
-from api.ingest import router as ingest_router
+from api.analytics import router as analytics_router
+from api.export import router as export_router
+from api.graph import router as graph_router
+from api.leaderboards import router as leaderboards_router
+from api.metrics import router as metrics_router
 from api.people import router as people_router
 from api.search import router as search_router
 from api.series import router as series_router
+from api.stats import router as stats_router
+from api.status import router as status_router
 from api.titles import router as titles_router
+from database import close_pools
 from dependencies import verify_bearer_token
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
+from http_cache import CacheHeadersMiddleware
+from metrics import MetricsMiddleware
+from replicas import replica_router
+from roles import ROLE, serves_ingest, serves_reads
+from timeouts import EXCEPTION_HANDLERS, CancelOnDisconnectMiddleware
 
 logging.basicConfig(
     level=logging.INFO,
@@ -38,21 +50,48 @@ app = FastAPI(
     title="IMDb Read-Only API",
     version=git_tag,
     description=f"build tag={git_tag} commit={git_commit}",
+    exception_handlers=EXCEPTION_HANDLERS,
 )
 
+app.add_middleware(CancelOnDisconnectMiddleware)
+app.add_middleware(CacheHeadersMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 FRONTEND_DIST = Path("/app/frontend-dist")
 
-app.include_router(titles_router, dependencies=[Depends(verify_bearer_token)])
-app.include_router(series_router, dependencies=[Depends(verify_bearer_token)])
-app.include_router(people_router, dependencies=[Depends(verify_bearer_token)])
-app.include_router(search_router, dependencies=[Depends(verify_bearer_token)])
-app.include_router(ingest_router, dependencies=[Depends(verify_bearer_token)])
+if serves_reads():
+    app.include_router(titles_router, dependencies=[Depends(verify_bearer_token)])
+    app.include_router(series_router, dependencies=[Depends(verify_bearer_token)])
+    app.include_router(people_router, dependencies=[Depends(verify_bearer_token)])
+    app.include_router(search_router, dependencies=[Depends(verify_bearer_token)])
+    app.include_router(export_router, dependencies=[Depends(verify_bearer_token)])
+    app.include_router(graph_router, dependencies=[Depends(verify_bearer_token)])
+    app.include_router(leaderboards_router, dependencies=[Depends(verify_bearer_token)])
+    app.include_router(analytics_router, dependencies=[Depends(verify_bearer_token)])
+
+if serves_ingest():
+    # ingest subsystem is only imported by processes running it
+    from api.ingest import router as ingest_router
+
+    app.include_router(ingest_router, dependencies=[Depends(verify_bearer_token)])
+
+app.include_router(stats_router, dependencies=[Depends(verify_bearer_token)])
+app.include_router(status_router, dependencies=[Depends(verify_bearer_token)])
+app.include_router(metrics_router, dependencies=[Depends(verify_bearer_token)])
 
 
 @app.on_event("startup")
 async def on_startup() -> None:
     """startup checks"""
-    Path(environ["CACHE_DIR"]).mkdir(parents=True, exist_ok=True)
+    if serves_ingest():
+        Path(environ["CACHE_DIR"]).mkdir(parents=True, exist_ok=True)
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    """release database connections"""
+    await close_pools()
+    await replica_router.close()
 
 
 @app.get("/api")
@@ -63,6 +102,7 @@ async def api_is_up():
         "git_tag": git_tag,
         "git_commit": git_commit,
         "has_auth": bool(environ.get("API_TOKEN")),
+        "role": ROLE,
     }
 
 
@@ -0,0 +1,325 @@
+"""request, query, pool and ingest metrics in prometheus text format"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import environ
+from time import perf_counter, time
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+DB_SLOW_QUERY_MS = float(environ.get("DB_SLOW_QUERY_MS", "500"))
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+SECONDS_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS: tuple[float, ...] = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|\b\d+(?:\.\d+)?\b")
+SQL_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def _escape(value: str) -> str:
+    """escape label value"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    """prometheus label set"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric(ABC):
+    """named metric with one series per label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+
+    def header(self) -> list[str]:
+        """help and type lines"""
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """to implement: exposition lines"""
+
+
+class Counter(Metric):
+    """monotonically increasing value"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """increase series of label values"""
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labels, values)} {value}" for values, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """value that can go up and down"""
+
+    kind = "gauge"
+
+    def set(self, value: float, *label_values: str) -> None:
+        """set series of label values"""
+        self._values[label_values] = value
+
+
+class Histogram(Metric):
+    """observations counted in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...], buckets: tuple[float, ...]) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """count value in its bucket of the series"""
+        counts = self._counts.setdefault(label_values, [0] * (len(self.buckets) + 1))
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[position] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[label_values] = self._sums.get(label_values, 0.0) + value
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for values, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                bucket_label = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, values, bucket_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {round(self._sums[values], 6)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+POOL_GAUGES: tuple[tuple[str, str], ...] = (
+    ("size", "connections kept in the pool"),
+    ("max_size", "maximum connections of the pool"),
+    ("max_overflow", "connections allowed above the pool size"),
+    ("checked_out", "connections in use"),
+    ("idle", "idle connections"),
+    ("overflow", "connections above the pool size"),
+    ("saturation", "checked out share of the pool capacity"),
+)
+POOL_COUNTERS: tuple[tuple[str, str], ...] = (
+    ("checkouts", "connection checkouts"),
+    ("timeouts", "checkouts failed by pool timeout"),
+    ("wait_seconds_total", "time waited for connection checkouts"),
+)
+
+
+def _pool_metrics(pool_stats: dict[str, Any]) -> list[Metric]:
+    """pool stats labeled by pool"""
+    pool_metrics: list[Metric] = []
+    for key, help_text in POOL_GAUGES:
+        gauge = Gauge(f"imdb_db_pool_{key}", help_text, ("pool",))
+        for pool, stats in pool_stats.items():
+            if key in stats:
+                gauge.set(stats[key], pool)
+        pool_metrics.append(gauge)
+
+    for key, help_text in POOL_COUNTERS:
+        counter = Counter(f"imdb_db_pool_{key.removesuffix('_total')}_total", help_text, ("pool",))
+        for pool, stats in pool_stats.items():
+            if key in stats:
+                counter.inc(pool, amount=stats[key])
+        pool_metrics.append(counter)
+
+    return pool_metrics
+
+
+class MetricsRegistry:
+    """metrics of this worker process"""
+
+    def __init__(self) -> None:
+        self.http_requests = Counter(
+            "imdb_http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status")
+        )
+        self.http_duration = Histogram(
+            "imdb_http_request_duration_seconds", "HTTP request latency by route", ("route",), SECONDS_BUCKETS
+        )
+        self.db_queries = Histogram(
+            "imdb_db_queries_per_request", "SQL statements per request by route", ("route",), QUERY_COUNT_BUCKETS
+        )
+        self.db_duration = Histogram(
+            "imdb_db_seconds_per_request", "SQL execution time per request by route", ("route",), SECONDS_BUCKETS
+        )
+        self.db_rows = Counter("imdb_db_rows_total", "rows returned by SQL statements by route", ("route",))
+        self.db_slow_queries = Counter(
+            "imdb_db_slow_queries_total", "SQL statements slower than DB_SLOW_QUERY_MS by route", ("route",)
+        )
+        self.admission_rejected = Counter(
+            "imdb_admission_rejected_total", "requests rejected by admission control", ("gate", "reason")
+        )
+        self.query_cost_rejected = Counter(
+            "imdb_query_cost_rejected_total", "queries rejected by planner cost estimate by route", ("route",)
+        )
+        self.db_timeouts = Counter(
+            "imdb_db_timeouts_total", "statement and pool checkout timeouts by route", ("route", "kind")
+        )
+        self.http_disconnects = Counter(
+            "imdb_http_client_disconnects_total", "requests cancelled by a client disconnect by route", ("route",)
+        )
+        self.ingest_running = Gauge("imdb_ingest_phase_running", "ingest phase in progress", ("dataset", "phase"))
+        self.ingest_duration = Gauge(
+            "imdb_ingest_phase_duration_seconds", "duration of last completed ingest phase", ("dataset", "phase")
+        )
+        self.ingest_completed = Gauge(
+            "imdb_ingest_phase_completed_timestamp_seconds",
+            "unix time of last completed ingest phase",
+            ("dataset", "phase"),
+        )
+
+    def render(self, pool_stats: dict[str, Any]) -> str:
+        """all metrics and pool gauges in text exposition format"""
+        registered: list[Metric] = [value for value in vars(self).values() if isinstance(value, Metric)]
+        registered.extend(_pool_metrics(pool_stats))
+        return "\n".join(line for metric in registered for line in metric.render()) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def normalize_sql(statement: str) -> str:
+    """statement with literals and placeholders replaced, for grouping in logs"""
+    normalized = SQL_LITERALS.sub("?", " ".join(statement.split()))
+    return SQL_VALUE_LISTS.sub("(...)", normalized)[:2000]
+
+
+class RequestQueries:
+    """SQL statements executed while serving one request"""
+
+    def __init__(self, scope: Scope) -> None:
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+    @property
+    def route(self) -> str:
+        """path template of the matched route"""
+        return getattr(self.scope.get("route"), "path", "unmatched")
+
+
+_request_queries: ContextVar[RequestQueries | None] = ContextVar("request_queries", default=None)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """record duration and rows of every statement of the engine"""
+    sync_engine = engine.sync_engine
+
+    # pylint: disable=unused-argument
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = perf_counter() - conn.info["query_start"].pop()
+        # the asyncpg adapter reports selected rows from the command status
+        rows = max(cursor.rowcount, 0)
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.seconds += duration
+            queries.rows += rows
+
+        if DB_SLOW_QUERY_MS and duration * 1000 >= DB_SLOW_QUERY_MS:
+            route = queries.route if queries is not None else "-"
+            metrics.db_slow_queries.inc(route)
+            logger.warning(
+                "slow query route=%s duration=%.3fs rows=%s sql=%s", route, duration, rows, normalize_sql(statement)
+            )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            query_start = exception_context.connection.info.get("query_start")
+            if query_start:
+                query_start.pop()
+
+
+@contextmanager
+def ingest_phase(dataset_name: str, phase: str) -> Iterator[None]:
+    """track running state and duration of an ingest phase"""
+    metrics.ingest_running.set(1, dataset_name, phase)
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.ingest_running.set(0, dataset_name, phase)
+
+    metrics.ingest_duration.set(round(perf_counter() - start, 3), dataset_name, phase)
+    metrics.ingest_completed.set(round(time()), dataset_name, phase)
+
+
+class MetricsMiddleware:
+    """record latency and SQL statements per route"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(scope)
+        token = _request_queries.set(queries)
+        start = perf_counter()
+        status = 500
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            recorded = True
+            route = queries.route
+            metrics.http_requests.inc(route, scope["method"], str(status))
+            metrics.http_duration.observe(perf_counter() - start, route)
+            metrics.db_queries.observe(queries.count, route)
+            metrics.db_duration.observe(queries.seconds, route)
+            metrics.db_rows.inc(route, amount=queries.rows)
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+            await send(message)
+            # background tasks run after the last body message, not part of the request
+            if message["type"] == "http.response.body" and not message.get("more_body") and not recorded:
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _request_queries.reset(token)
+            if not recorded:
+                record()
@@ -1,9 +1,10 @@
 """define db models"""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import BigInteger, Column, DateTime
+from dictionary import CodedText
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, SmallInteger, text
 from sqlalchemy.dialects.postgresql import ARRAY, TEXT
 from sqlmodel import Field, Relationship, SQLModel
 
@@ -14,7 +15,7 @@ class Title(SQLModel, table=True):
     __tablename__ = "titles"
 
     tconst: str = Field(primary_key=True)
-    title_type: str
+    title_type: str = Field(sa_column=Column(CodedText("title_type"), nullable=False))
     primary_title: str
     original_title: Optional[str]
     is_adult: bool
@@ -22,7 +23,7 @@ class Title(SQLModel, table=True):
     end_year: Optional[int]
     runtime_minutes: Optional[int]
 
-    genres: Optional[list[str]] = Field(sa_column=Column(ARRAY(TEXT)))
+    genres: Optional[list[str]] = Field(sa_column=Column(ARRAY(CodedText("genre"))))
 
     rating: Optional["TitleRating"] = Relationship(
         back_populates="title",
@@ -44,7 +45,7 @@ class Person(SQLModel, table=True):
     birth_year: Optional[int]
     death_year: Optional[int]
 
-    primary_professions: Optional[list[str]] = Field(sa_column=Column(ARRAY(TEXT)))
+    primary_professions: Optional[list[str]] = Field(sa_column=Column(ARRAY(CodedText("profession"))))
 
     known_for_titles: Optional[list[str]] = Field(sa_column=Column(ARRAY(TEXT)))
 
@@ -57,7 +58,6 @@ class TitleRating(SQLModel, table=True):
     tconst: str = Field(
         foreign_key="titles.tconst",
         primary_key=True,
-        index=True,
     )
     average_rating: float
     num_votes: int
@@ -69,15 +69,22 @@ class Episode(SQLModel, table=True):
     """episode"""
 
     __tablename__ = "episodes"
+    __table_args__ = (
+        Index(
+            "ix_episodes_parent_tconst_season_episode",
+            "parent_tconst",
+            "season_number",
+            "episode_number",
+            "tconst",
+        ),
+    )
 
     tconst: str = Field(
         primary_key=True,
         foreign_key="titles.tconst",
-        index=True,
     )
     parent_tconst: str = Field(
         foreign_key="titles.tconst",
-        index=True,
     )
 
     season_number: Optional[int]
@@ -89,38 +96,54 @@ class Episode(SQLModel, table=True):
     )
 
 
+class SeriesSeason(SQLModel, table=True):
+    """per season aggregates of a series, rebuilt at episode and ratings ingest"""
+
+    __tablename__ = "series_seasons"
+    __table_args__ = (Index("ix_series_seasons_parent_tconst_season_number", "parent_tconst", "season_number"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    parent_tconst: str
+    season_number: Optional[int]
+    episode_count: int
+    start_year: Optional[int]
+    end_year: Optional[int]
+    mean_rating: Optional[float]
+    total_votes: int
+
+
 class TitleAka(SQLModel, table=True):
-    """title aka localized"""
+    """title aka localized, hash partitioned by title_id"""
 
     __tablename__ = "title_akas"
+    __table_args__ = ({"postgresql_partition_by": "HASH (title_id)"},)
 
     title_id: str = Field(
         foreign_key="titles.tconst",
         primary_key=True,
-        index=True,
     )
     ordering: int = Field(primary_key=True)
 
     title: str
-    region: Optional[str]
-    language: Optional[str]
+    region: Optional[str] = Field(sa_column=Column(CodedText("region")))
+    language: Optional[str] = Field(sa_column=Column(CodedText("language")))
 
-    types: Optional[list[str]] = Field(sa_column=Column(ARRAY(TEXT)))
+    types: Optional[list[str]] = Field(sa_column=Column(ARRAY(CodedText("aka_type"))))
 
-    attributes: Optional[list[str]] = Field(sa_column=Column(ARRAY(TEXT)))
+    attributes: Optional[list[str]] = Field(sa_column=Column(ARRAY(CodedText("aka_attribute"))))
 
     is_original: Optional[bool]
 
 
 class TitlePrincipal(SQLModel, table=True):
-    """Credits for a title (canonical IMDb credit table)"""
+    """Credits for a title (canonical IMDb credit table), hash partitioned by tconst"""
 
     __tablename__ = "title_principals"
+    __table_args__ = ({"postgresql_partition_by": "HASH (tconst)"},)
 
     tconst: str = Field(
         foreign_key="titles.tconst",
         primary_key=True,
-        index=True,
     )
     ordering: int = Field(primary_key=True)
 
@@ -129,7 +152,7 @@ class TitlePrincipal(SQLModel, table=True):
         index=True,
     )
 
-    category: str = Field(index=True)
+    category: str = Field(sa_column=Column(CodedText("category"), nullable=False, index=True))
     job: Optional[str] = None
     characters: Optional[list[str]] = Field(
         default=None,
@@ -137,6 +160,150 @@ class TitlePrincipal(SQLModel, table=True):
     )
 
 
+class Filmography(SQLModel, table=True):
+    """one credit per person and title with denormalized title fields, rebuilt at principals ingest"""
+
+    __tablename__ = "filmography"
+    __table_args__ = (
+        Index(
+            "ix_filmography_nconst_start_year",
+            "nconst",
+            text("start_year DESC NULLS LAST"),
+            "primary_title",
+            "tconst",
+        ),
+    )
+
+    nconst: str = Field(primary_key=True)
+    tconst: str = Field(primary_key=True)
+    ordering: int
+    category: str = Field(sa_column=Column(CodedText("category"), nullable=False))
+    categories: list[str] = Field(sa_column=Column(ARRAY(CodedText("category")), nullable=False))
+    job: Optional[str] = None
+    characters: Optional[list[str]] = Field(default=None, sa_column=Column(ARRAY(TEXT)))
+    title_type: str = Field(sa_column=Column(CodedText("title_type"), nullable=False))
+    primary_title: str
+    original_title: Optional[str]
+    start_year: Optional[int]
+    end_year: Optional[int]
+    average_rating: Optional[float]
+    num_votes: Optional[int]
+
+
+class Collaborator(SQLModel, table=True):
+    """top collaborators of a person by shared titles, refreshed at principals ingest"""
+
+    __tablename__ = "collaborators"
+
+    nconst: str = Field(primary_key=True)
+    rank: int = Field(primary_key=True)
+    collaborator_nconst: str
+    shared_titles: int
+    last_shared_year: Optional[int]
+
+
+class SimilarTitle(SQLModel, table=True):
+    """top similar titles by tf-idf cosine of genres, type, decade and principals"""
+
+    __tablename__ = "similar_titles"
+
+    tconst: str = Field(primary_key=True)
+    rank: int = Field(primary_key=True)
+    similar_tconst: str
+    score: float
+
+
+class Leaderboard(SQLModel, table=True):
+    """
+    Top titles by weighted rating per genre, title type and decade.
+    Empty genre or title type and decade 0 stand for all values.
+    """
+
+    __tablename__ = "leaderboards"
+
+    genre: str = Field(primary_key=True)
+    title_type: str = Field(primary_key=True)
+    decade: int = Field(primary_key=True)
+    rank: int = Field(primary_key=True)
+    tconst: str
+    weighted_rating: float
+
+
+class RollupTitleYear(SQLModel, table=True):
+    """title counts by start year and type, year 0 for unknown"""
+
+    __tablename__ = "rollup_title_years"
+
+    start_year: int = Field(primary_key=True)
+    title_type: str = Field(primary_key=True)
+    total: int
+
+
+class RollupTitleGenre(SQLModel, table=True):
+    """title counts by start year, type and genre, empty genre for none"""
+
+    __tablename__ = "rollup_title_genres"
+
+    start_year: int = Field(primary_key=True)
+    title_type: str = Field(primary_key=True)
+    genre: str = Field(primary_key=True)
+    total: int
+
+
+class RollupRuntime(SQLModel, table=True):
+    """title counts by type and runtime in 10 minute buckets"""
+
+    __tablename__ = "rollup_runtimes"
+
+    title_type: str = Field(primary_key=True)
+    runtime_bucket: int = Field(primary_key=True)
+    total: int
+
+
+class RollupRating(SQLModel, table=True):
+    """rating histogram in steps of 0.1"""
+
+    __tablename__ = "rollup_ratings"
+
+    rating_tenths: int = Field(primary_key=True)
+    total: int
+
+
+class RollupProfession(SQLModel, table=True):
+    """people counts by profession"""
+
+    __tablename__ = "rollup_professions"
+
+    profession: str = Field(primary_key=True)
+    total: int
+
+
+class RatingHistory(SQLModel, table=True):
+    """ratings changed by an import, one row per title and import day, partitioned by month"""
+
+    __tablename__ = "rating_history"
+    __table_args__ = (
+        Index("ix_rating_history_snapshot_date", "snapshot_date", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (snapshot_date)"},
+    )
+
+    tconst: str = Field(primary_key=True)
+    snapshot_date: date = Field(primary_key=True)
+    average_rating: float
+    num_votes: int
+
+
+class DictionaryCode(SQLModel, table=True):
+    """smallint code of a low cardinality text value, per domain like genre or category"""
+
+    __tablename__ = "dictionary_codes"
+    __table_args__ = (Index("ix_dictionary_codes_domain_value", "domain", "value", unique=True),)
+
+    domain: str = Field(primary_key=True)
+    code: int = Field(sa_column=Column(SmallInteger, primary_key=True, autoincrement=False))
+    value: str
+
+
 class ImportTask(SQLModel, table=True):
     """Track metadata and timing for each imported IMDb dataset file."""
 
@@ -148,3 +315,5 @@ class ImportTask(SQLModel, table=True):
     size_raw: int = Field(sa_column=Column(BigInteger, nullable=False))
     import_start_time: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
     duration: float
+    row_count: Optional[int] = Field(default=None, sa_column=Column(BigInteger, nullable=True))
+    failed: bool = Field(default=False, sa_column=Column(Boolean, nullable=False, server_default=text("false")))
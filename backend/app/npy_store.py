@@ -0,0 +1,69 @@
+"""arrays persisted as a directory of npy files, swapped in place by builds and memory mapped by readers"""
+
+import json
+import logging
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, ClassVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def swap_npy_dir(arrays: dict[str, np.ndarray], meta: dict[str, Any], target_dir: Path) -> None:
+    """write arrays as npy files and meta with its build time, then swap the directory in place"""
+    tmp_dir = target_dir.with_name(f"{target_dir.name}.tmp")
+    old_dir = target_dir.with_name(f"{target_dir.name}.old")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    for name, array in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", array)
+
+    meta = {**meta, "built_at": datetime.now(timezone.utc).isoformat()}
+    (tmp_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if target_dir.exists():
+        target_dir.rename(old_dir)
+    tmp_dir.rename(target_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class NpyDirectory:
+    """
+    Read-only view of a directory written by swap_npy_dir, ARRAY_NAMES are
+    memory mapped and reloaded when a new build replaced the files.
+    Subclasses derive their lookups of a new build in _on_load.
+    """
+
+    ARRAY_NAMES: ClassVar[tuple[str, ...]] = ()
+    DESCRIPTION: ClassVar[str] = ""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.meta: dict[str, Any] = {}
+        self._arrays: dict[str, np.ndarray] = {}
+        self._loaded_mtime: int | None = None
+
+    def load_if_changed(self) -> bool:
+        """map arrays of a new build, False if none is available"""
+        meta_path = self.directory / "meta.json"
+        try:
+            mtime = meta_path.stat().st_mtime_ns
+            if mtime != self._loaded_mtime:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                arrays = {name: np.load(self.directory / f"{name}.npy", mmap_mode="r") for name in self.ARRAY_NAMES}
+                self._on_load(meta, arrays)
+                self.meta, self._arrays = meta, arrays
+                self._loaded_mtime = mtime
+                logger.info("loaded %s built_at=%s", self.DESCRIPTION, meta["built_at"])
+        except FileNotFoundError:
+            pass
+
+        return bool(self._arrays)
+
+    def _on_load(self, meta: dict[str, Any], arrays: dict[str, np.ndarray]) -> None:
+        """derive lookups of a new build before it replaces the loaded one"""
@@ -0,0 +1,150 @@
+"""route read-only sessions across healthy, up to date replicas"""
+
+import asyncio
+import logging
+from itertools import count
+from os import environ
+from time import monotonic
+from typing import Any
+
+from database import create_api_engine, engine
+from generation import dataset_generations
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import InterfaceError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+DATABASE_REPLICA_URLS = [url.strip() for url in environ.get("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_STRATEGY = environ.get("DB_REPLICA_STRATEGY", "round_robin")
+DB_REPLICA_CHECK_SECONDS = float(environ.get("DB_REPLICA_CHECK_SECONDS", "10"))
+DB_REPLICA_CHECK_TIMEOUT = float(environ.get("DB_REPLICA_CHECK_TIMEOUT", "2"))
+REPLICA_STRATEGIES: tuple[str, ...] = ("round_robin", "least_connections")
+
+if DB_REPLICA_STRATEGY not in REPLICA_STRATEGIES:
+    raise ValueError(f"failed to parse DB_REPLICA_STRATEGY, expected one of: {', '.join(REPLICA_STRATEGIES)}")
+
+
+class Replica:
+    """one read replica with its own engine and health state"""
+
+    def __init__(self, database_url: str) -> None:
+        url = make_url(database_url)
+        self.name = f"{url.host}:{url.port or 5432}"
+        self.engine = create_api_engine(database_url)
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.healthy = False
+        self.generation = 0
+
+    @property
+    def checked_out(self) -> int:
+        """connections currently in use"""
+        return self.engine.sync_engine.pool.checkedout()  # type: ignore[attr-defined]
+
+    async def probe(self) -> None:
+        """check connectivity and latest import task visible on the replica"""
+        try:
+            async with self.engine.connect() as conn:
+                result = await asyncio.wait_for(
+                    conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM import_tasks")),
+                    timeout=DB_REPLICA_CHECK_TIMEOUT,
+                )
+                self.generation = int(result.scalar_one())
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.warning("replica check failed replica=%s error=%r", self.name, exc)
+            self.healthy = False
+            return
+
+        if not self.healthy:
+            logger.info("replica available replica=%s generation=%s", self.name, self.generation)
+        self.healthy = True
+
+
+class ReplicaRouter:
+    """
+    Pick a replica for read-only sessions by round robin or least connections.
+    Replicas failing the periodic check or lagging behind the latest import
+    task of the primary are skipped, reads fall back to the primary.
+    """
+
+    def __init__(self, database_urls: list[str], strategy: str) -> None:
+        self.replicas = [Replica(database_url) for database_url in database_urls]
+        self.strategy = strategy
+        self.fallbacks = 0
+        self._counter = count()
+        self._checked_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def pick(self) -> Replica | None:
+        """replica to read from, None to use the primary"""
+        if not self.replicas:
+            return None
+
+        await self._check_if_stale()
+        primary_generation = await dataset_generations.latest()
+        candidates = [
+            replica for replica in self.replicas if replica.healthy and replica.generation >= primary_generation
+        ]
+        if not candidates:
+            self.fallbacks += 1
+            return None
+
+        if self.strategy == "least_connections":
+            return min(candidates, key=lambda replica: replica.checked_out)
+
+        return candidates[next(self._counter) % len(candidates)]
+
+    async def pick_engine(self) -> AsyncEngine:
+        """engine of picked replica or primary"""
+        replica = await self.pick()
+        return replica.engine if replica else engine
+
+    def mark_unhealthy(self, replica: Replica) -> None:
+        """skip replica until the next successful check"""
+        if replica.healthy:
+            logger.warning("replica marked unhealthy replica=%s", replica.name)
+        replica.healthy = False
+
+    async def close(self) -> None:
+        """dispose replica engines"""
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> dict[str, Any]:
+        """replica state and fallback counter"""
+        return {
+            "strategy": self.strategy,
+            "fallbacks": self.fallbacks,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "generation": replica.generation,
+                    "checked_out": replica.checked_out,
+                }
+                for replica in self.replicas
+            ],
+        }
+
+    async def _check_if_stale(self) -> None:
+        if self._checked_at is not None and monotonic() - self._checked_at < DB_REPLICA_CHECK_SECONDS:
+            return
+
+        async with self._lock:
+            if self._checked_at is not None and monotonic() - self._checked_at < DB_REPLICA_CHECK_SECONDS:
+                return
+
+            await asyncio.gather(*(replica.probe() for replica in self.replicas))
+            self._checked_at = monotonic()
+
+
+replica_router = ReplicaRouter(DATABASE_REPLICA_URLS, DB_REPLICA_STRATEGY)
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    """error caused by a lost or refused connection"""
+    if isinstance(exc, (OSError, InterfaceError)):
+        return True
+
+    return bool(getattr(exc, "connection_invalidated", False))
@@ -0,0 +1,155 @@
+"""bounded in-process cache of serialized responses tagged by dataset"""
+
+import logging
+from collections import OrderedDict
+from os import environ
+from typing import Any, Awaitable, Callable, NamedTuple
+
+import orjson
+from fastapi import Request, Response
+from generation import dataset_generations
+from http_cache import request_key, route_path
+from singleflight import single_flight
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_MAX_MB = int(environ.get("RESPONSE_CACHE_MAX_MB", "64"))
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class _CacheEntry(NamedTuple):
+    body: bytes
+    dataset_names: tuple[str, ...]
+    generations: tuple[int, ...]
+    size: int
+
+
+class ResponseCache:
+    """
+    LRU cache of response bodies bounded by total bytes.
+    Entries are tagged with the datasets they were built from and are
+    dropped when a new import generation of one of these datasets shows up.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 16
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._keys_by_dataset: dict[str, set[str]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """cache is disabled with a zero size budget"""
+        return self.max_bytes > 0
+
+    def get(self, key: str, generations: tuple[int, ...]) -> bytes | None:
+        """cached body if built from the current generations"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.generations != generations:
+            self._remove(key)
+            self.invalidations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.body
+
+    def put(self, key: str, body: bytes, dataset_names: tuple[str, ...], generations: tuple[int, ...]) -> None:
+        """store body, evict least recently used entries over budget"""
+        size = len(body) + len(key) + ENTRY_OVERHEAD_BYTES
+        if not self.enabled or size > self.max_entry_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = _CacheEntry(body, dataset_names, generations, size)
+        self.size_bytes += size
+        for dataset_name in dataset_names:
+            self._keys_by_dataset.setdefault(dataset_name, set()).add(key)
+
+        while self.size_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def invalidate(self, dataset_names: set[str]) -> None:
+        """drop all entries depending on any of the datasets"""
+        keys = set()
+        for dataset_name in dataset_names:
+            keys.update(self._keys_by_dataset.get(dataset_name, ()))
+
+        for key in keys:
+            self._remove(key)
+
+        self.invalidations += len(keys)
+        if keys:
+            logger.info(
+                "invalidated cached responses count=%s datasets=%s", len(keys), ", ".join(sorted(dataset_names))
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """cache counters"""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        self.size_bytes -= entry.size
+        for dataset_name in entry.dataset_names:
+            keys = self._keys_by_dataset.get(dataset_name)
+            if keys is not None:
+                keys.discard(key)
+
+
+response_cache = ResponseCache(max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024)
+dataset_generations.add_listener(response_cache.invalidate)
+
+
+async def cached_json(
+    request: Request,
+    dataset_names: tuple[str, ...],
+    build: Callable[[], Awaitable[Any]],
+    coalesce: bool = False,
+) -> Response:
+    """
+    Serve json body from cache, build and store it on miss.
+    With coalesce, concurrent misses for the same key share one build.
+    """
+    key = request_key(request)
+    generations = await dataset_generations.get(dataset_names)
+    body = response_cache.get(key, generations)
+    if body is None:
+
+        async def build_body() -> bytes:
+            built = orjson.dumps(await build())
+            response_cache.put(key, built, dataset_names, generations)
+            return built
+
+        if coalesce:
+            body = await single_flight.run(route_path(request), f"{key}|{generations}", build_body)
+        else:
+            body = await build_body()
+
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,24 @@
+"""process role and worker settings"""
+
+from os import environ
+
+ROLE_ALL = "all"
+ROLE_API = "api"
+ROLE_INGEST = "ingest"
+ROLES: tuple[str, ...] = (ROLE_ALL, ROLE_API, ROLE_INGEST)
+
+ROLE = environ.get("ROLE", ROLE_ALL)
+if ROLE not in ROLES:
+    raise ValueError(f"failed to parse ROLE, expected one of: {', '.join(ROLES)}")
+
+WEB_CONCURRENCY = int(environ.get("WEB_CONCURRENCY", "1"))
+
+
+def serves_reads() -> bool:
+    """process serves the read API"""
+    return ROLE in (ROLE_ALL, ROLE_API)
+
+
+def serves_ingest() -> bool:
+    """process runs the ingest subsystem"""
+    return ROLE in (ROLE_ALL, ROLE_INGEST)
@@ -0,0 +1,59 @@
+"""coalesce identical concurrent reads into one execution"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Run at most one build per key at a time.
+    Concurrent callers with the same key await the running build and share
+    its result or exception. If the leading caller is cancelled, for example
+    by a disconnected client, a waiting caller takes over the build.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    async def run(self, route: str, key: str, build: Callable[[], Awaitable[T]]) -> T:
+        """run build for key, or join the build already in flight"""
+        route_stats = self._stats.setdefault(route, {"executed": 0, "coalesced": 0})
+        while (future := self._inflight.get(key)) is not None:
+            route_stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        route_stats["executed"] += 1
+        try:
+            result = await build()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved, the leader raises it
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict[str, Any]:
+        """executed and coalesced counts per route"""
+        return {
+            "inflight": len(self._inflight),
+            "routes": {route: dict(route_stats) for route, route_stats in self._stats.items()},
+        }
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,73 @@
+"""build collaboration graph from principals"""
+
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+
+import asyncpg
+import numpy as np
+from graph import GRAPH_DIR, build_graph_arrays, save_graph
+
+logger = logging.getLogger(__name__)
+
+# binary COPY of three int4 columns: 19 byte header, fixed width rows, 2 byte trailer
+COPY_HEADER_BYTES = 19
+COPY_TRAILER_BYTES = 2
+COPY_ROW_DTYPE = np.dtype(
+    [
+        ("field_count", ">i2"),
+        ("nconst_size", ">i4"),
+        ("nconst", ">i4"),
+        ("tconst_size", ">i4"),
+        ("tconst", ">i4"),
+        ("category_size", ">i4"),
+        ("category", ">i4"),
+    ]
+)
+
+
+async def build_collaboration_graph(conn: asyncpg.Connection) -> None:
+    """export principals as numeric edges and rebuild the graph files"""
+    category_rows = await conn.fetch("""
+        SELECT d.code, d.value
+        FROM dictionary_codes d
+        WHERE d.domain = 'category' AND EXISTS (SELECT 1 FROM title_principals p WHERE p.category = d.code)
+        ORDER BY d.value
+        """)
+    categories = [row["value"] for row in category_rows]
+
+    GRAPH_DIR.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=GRAPH_DIR.parent) as tmp_dir:
+        edges_path = Path(tmp_dir) / "edges.bin"
+        await conn.copy_from_query(
+            """
+            SELECT
+                substr(nconst, 3)::int4,
+                substr(tconst, 3)::int4,
+                (array_position($1::smallint[], category) - 1)::int4
+            FROM title_principals
+            """,
+            [row["code"] for row in category_rows],
+            output=str(edges_path),
+            format="binary",
+        )
+        await asyncio.to_thread(_build_from_copy, edges_path, categories)
+
+
+def _build_from_copy(edges_path: Path, categories: list[str]) -> None:
+    """read binary COPY output and save graph arrays"""
+    edge_count = (edges_path.stat().st_size - COPY_HEADER_BYTES - COPY_TRAILER_BYTES) // COPY_ROW_DTYPE.itemsize
+    logger.info("build collaboration graph edges=%s", edge_count)
+    if edge_count:
+        rows = np.memmap(edges_path, dtype=COPY_ROW_DTYPE, mode="r", offset=COPY_HEADER_BYTES, shape=(edge_count,))
+    else:
+        rows = np.empty(0, dtype=COPY_ROW_DTYPE)
+
+    arrays = build_graph_arrays(
+        rows["nconst"].astype(np.int32),
+        rows["tconst"].astype(np.int32),
+        rows["category"].astype(np.uint8),
+    )
+    del rows
+    save_graph(arrays, categories, GRAPH_DIR)
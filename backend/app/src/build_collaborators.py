@@ -0,0 +1,65 @@
+"""build top collaborators per person"""
+
+import asyncpg
+from src.shadow_tables import create_shadow_table, shadow_name, swap_shadow_table
+
+COLLABORATORS_TOP_K = 50
+COLLABORATORS_PKEY = "collaborators_pkey"
+CHANGED_PEOPLE_TABLE = "changed_principal_people"
+
+
+async def build_collaborators(conn: asyncpg.Connection) -> None:
+    """
+    Refresh collaborators of people with changed credits. Without captured
+    changes all are rebuilt into a shadow table, swapped in by rename.
+    """
+    has_changes = await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", f"pg_temp.{CHANGED_PEOPLE_TABLE}")
+    if not has_changes:
+        shadow_table = await create_shadow_table(conn, "collaborators")
+        await conn.execute(_collaborators_query(shadow_table, ""))
+        await conn.execute(
+            f"ALTER TABLE {shadow_table} ADD CONSTRAINT {shadow_name(COLLABORATORS_PKEY)} PRIMARY KEY (nconst, rank)"
+        )
+        await swap_shadow_table(conn, "collaborators", (COLLABORATORS_PKEY,))
+        await conn.execute("ANALYZE collaborators")
+        return
+
+    people_filter = f"WHERE f.nconst IN (SELECT nconst FROM {CHANGED_PEOPLE_TABLE})"
+    await conn.execute(f"DELETE FROM collaborators WHERE nconst IN (SELECT nconst FROM {CHANGED_PEOPLE_TABLE})")
+    await conn.execute(_collaborators_query("collaborators", people_filter))
+
+
+def _collaborators_query(table_name: str, people_filter: str) -> str:
+    """insert top collaborators by shared titles for filtered people"""
+    return f"""
+        INSERT INTO {table_name} (
+            nconst,
+            rank,
+            collaborator_nconst,
+            shared_titles,
+            last_shared_year
+        )
+        WITH pairs AS (
+            SELECT
+                f.nconst,
+                p.nconst AS collaborator_nconst,
+                COUNT(DISTINCT f.tconst) AS shared_titles,
+                MAX(f.start_year) AS last_shared_year
+            FROM filmography f
+            JOIN title_principals p ON p.tconst = f.tconst AND p.nconst <> f.nconst
+            {people_filter}
+            GROUP BY f.nconst, p.nconst
+        ),
+        ranked AS (
+            SELECT
+                *,
+                row_number() OVER (
+                    PARTITION BY nconst
+                    ORDER BY shared_titles DESC, last_shared_year DESC NULLS LAST, collaborator_nconst
+                ) AS rank
+            FROM pairs
+        )
+        SELECT nconst, rank, collaborator_nconst, shared_titles, last_shared_year
+        FROM ranked
+        WHERE rank <= {COLLABORATORS_TOP_K}
+        """
@@ -0,0 +1,112 @@
+"""build filmography read model of person credits"""
+
+import asyncpg
+from src.shadow_tables import create_shadow_table, shadow_name, swap_shadow_table
+
+FILMOGRAPHY_PKEY = "filmography_pkey"
+FILMOGRAPHY_INDEX = "ix_filmography_nconst_start_year"
+
+
+async def build_filmography(conn: asyncpg.Connection) -> None:
+    """
+    Rebuild filmography from principals, titles and ratings into a shadow
+    table, inserted in index order and indexed after, then swapped in.
+    Categories are coded, their list is ordered by name, not by code.
+    """
+    shadow_table = await create_shadow_table(conn, "filmography")
+    await conn.execute(f"""
+        INSERT INTO {shadow_table} (
+            nconst,
+            tconst,
+            ordering,
+            category,
+            categories,
+            job,
+            characters,
+            title_type,
+            primary_title,
+            original_title,
+            start_year,
+            end_year,
+            average_rating,
+            num_votes
+        )
+        WITH category_order AS (
+            SELECT code, rank() OVER (ORDER BY value) AS position
+            FROM dictionary_codes
+            WHERE domain = 'category'
+        ),
+        person_categories AS (
+            SELECT nconst, tconst, category, MIN(ordering) AS ordering
+            FROM title_principals
+            GROUP BY nconst, tconst, category
+        ),
+        credits AS (
+            SELECT
+                pc.nconst,
+                pc.tconst,
+                MIN(pc.ordering) AS ordering,
+                array_agg(pc.category ORDER BY o.position) AS categories
+            FROM person_categories pc
+            JOIN category_order o ON o.code = pc.category
+            GROUP BY pc.nconst, pc.tconst
+        )
+        SELECT
+            c.nconst,
+            c.tconst,
+            c.ordering,
+            p.category,
+            c.categories,
+            p.job,
+            p.characters,
+            t.title_type,
+            t.primary_title,
+            t.original_title,
+            t.start_year,
+            t.end_year,
+            r.average_rating,
+            r.num_votes
+        FROM credits c
+        JOIN title_principals p ON p.tconst = c.tconst AND p.ordering = c.ordering
+        JOIN titles t ON t.tconst = c.tconst
+        LEFT JOIN title_ratings r ON r.tconst = c.tconst
+        ORDER BY c.nconst, t.start_year DESC NULLS LAST, t.primary_title, c.tconst
+        """)
+    await conn.execute(
+        f"ALTER TABLE {shadow_table} ADD CONSTRAINT {shadow_name(FILMOGRAPHY_PKEY)} PRIMARY KEY (nconst, tconst)"
+    )
+    await conn.execute(f"""
+        CREATE INDEX {shadow_name(FILMOGRAPHY_INDEX)}
+        ON {shadow_table} (nconst, start_year DESC NULLS LAST, primary_title, tconst)
+        """)
+    await swap_shadow_table(conn, "filmography", (FILMOGRAPHY_PKEY, FILMOGRAPHY_INDEX))
+    await conn.execute(f"ALTER TABLE filmography CLUSTER ON {FILMOGRAPHY_INDEX}")
+    await conn.execute("ANALYZE filmography")
+
+
+async def refresh_filmography_titles(conn: asyncpg.Connection) -> None:
+    """update denormalized title and rating fields that changed since the last build"""
+    await conn.execute("""
+        UPDATE filmography f
+        SET
+            title_type = t.title_type,
+            primary_title = t.primary_title,
+            original_title = t.original_title,
+            start_year = t.start_year,
+            end_year = t.end_year,
+            average_rating = r.average_rating,
+            num_votes = r.num_votes
+        FROM titles t
+        LEFT JOIN title_ratings r ON r.tconst = t.tconst
+        WHERE
+            t.tconst = f.tconst
+            AND (
+                f.title_type IS DISTINCT FROM t.title_type
+                OR f.primary_title IS DISTINCT FROM t.primary_title
+                OR f.original_title IS DISTINCT FROM t.original_title
+                OR f.start_year IS DISTINCT FROM t.start_year
+                OR f.end_year IS DISTINCT FROM t.end_year
+                OR f.average_rating IS DISTINCT FROM r.average_rating
+                OR f.num_votes IS DISTINCT FROM r.num_votes
+            )
+        """)
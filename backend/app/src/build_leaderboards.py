@@ -0,0 +1,77 @@
+"""build weighted rating leaderboards per genre, title type and decade"""
+
+from os import environ
+
+import asyncpg
+from dictionary import decode_array_sql, decode_sql
+
+LEADERBOARD_SIZE = 100
+LEADERBOARD_MIN_VOTES = int(environ.get("LEADERBOARD_MIN_VOTES", "1000"))
+
+
+async def build_leaderboards(conn: asyncpg.Connection) -> None:
+    """
+    Rebuild top titles by bayesian weighted rating, with LEADERBOARD_MIN_VOTES
+    as the vote prior and listing threshold. An empty genre or title type and
+    decade 0 hold the leaderboard over all values. Deleted rather than
+    truncated, so readers are not blocked until the ingest commits.
+    """
+    await conn.execute("DELETE FROM leaderboards")
+    await conn.execute(
+        f"""
+        INSERT INTO leaderboards (
+            genre,
+            title_type,
+            decade,
+            rank,
+            tconst,
+            weighted_rating
+        )
+        WITH prior AS (
+            SELECT AVG(average_rating)::float8 AS mean_rating FROM title_ratings
+        ),
+        scored AS (
+            SELECT
+                t.tconst,
+                {decode_sql("title_type", "t.title_type")} AS title_type,
+                t.start_year / 10 * 10 AS decade,
+                {decode_array_sql("genre", "t.genres")} AS genres,
+                r.num_votes,
+                (r.num_votes * r.average_rating::float8 + $1 * p.mean_rating) / (r.num_votes + $1) AS weighted_rating
+            FROM titles t
+            JOIN title_ratings r ON r.tconst = t.tconst
+            CROSS JOIN prior p
+            WHERE r.num_votes >= $1
+        ),
+        keyed AS (
+            SELECT
+                g.genre,
+                tt.title_type,
+                d.decade,
+                s.tconst,
+                s.num_votes,
+                s.weighted_rating
+            FROM scored s
+            CROSS JOIN LATERAL unnest(array_append(COALESCE(s.genres, '{{}}'), '')) AS g(genre)
+            CROSS JOIN LATERAL unnest(ARRAY[s.title_type, '']) AS tt(title_type)
+            CROSS JOIN LATERAL unnest(
+                CASE WHEN s.decade IS NULL THEN ARRAY[0] ELSE ARRAY[s.decade, 0] END
+            ) AS d(decade)
+        ),
+        ranked AS (
+            SELECT
+                *,
+                row_number() OVER (
+                    PARTITION BY genre, title_type, decade
+                    ORDER BY weighted_rating DESC, num_votes DESC, tconst
+                ) AS rank
+            FROM keyed
+        )
+        SELECT genre, title_type, decade, rank, tconst, weighted_rating
+        FROM ranked
+        WHERE rank <= $2
+        """,
+        LEADERBOARD_MIN_VOTES,
+        LEADERBOARD_SIZE,
+    )
+    await conn.execute("ANALYZE leaderboards")
@@ -0,0 +1,85 @@
+"""append changed ratings to the monthly partitioned rating history"""
+
+import logging
+from datetime import date
+from os import environ
+
+import asyncpg
+from src.import_base import delta_tables
+
+logger = logging.getLogger(__name__)
+
+RATING_HISTORY_RAW_MONTHS = int(environ.get("RATING_HISTORY_RAW_MONTHS", "3"))
+COMPACTED_COMMENT = "compacted"
+
+
+def partition_name(month: date) -> str:
+    """partition of rating_history holding month"""
+    return f"rating_history_{month.year:04d}_{month.month:02d}"
+
+
+def _add_months(month: date, months: int) -> date:
+    """first day of month shifted by months"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def create_partition(conn: asyncpg.Connection, month: date) -> None:
+    """create monthly partition if missing"""
+    month = month.replace(day=1)
+    await conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {partition_name(month)}
+        PARTITION OF rating_history
+        FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')
+        """)
+
+
+async def append_rating_history(conn: asyncpg.Connection) -> None:
+    """append ratings changed by this import, all ratings on the first import"""
+    await create_partition(conn, date.today())
+    _, after_table = delta_tables("title_ratings")
+    has_delta = await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", f"pg_temp.{after_table}")
+    source_table = after_table if has_delta else "title_ratings"
+    appended = await conn.execute(f"""
+        INSERT INTO rating_history (tconst, snapshot_date, average_rating, num_votes)
+        SELECT tconst, CURRENT_DATE, average_rating, num_votes
+        FROM {source_table}
+        ON CONFLICT (tconst, snapshot_date) DO UPDATE
+        SET
+            average_rating = EXCLUDED.average_rating,
+            num_votes = EXCLUDED.num_votes
+        """)
+    logger.info("appended rating history %s", appended)
+    await compact_rating_history(conn)
+
+
+async def compact_rating_history(conn: asyncpg.Connection) -> None:
+    """keep only the last snapshot per title in partitions older than RATING_HISTORY_RAW_MONTHS"""
+    cutoff = partition_name(_add_months(date.today().replace(day=1), -RATING_HISTORY_RAW_MONTHS))
+    partitions = await conn.fetch(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE
+            i.inhparent = 'rating_history'::regclass
+            AND c.relname < $1
+            AND obj_description(c.oid, 'pg_class') IS DISTINCT FROM $2
+        ORDER BY c.relname
+        """,
+        cutoff,
+        COMPACTED_COMMENT,
+    )
+    for partition in partitions:
+        relname = partition["relname"]
+        deleted = await conn.execute(f"""
+            DELETE FROM {relname} h
+            USING (
+                SELECT tconst, MAX(snapshot_date) AS snapshot_date
+                FROM {relname}
+                GROUP BY tconst
+            ) latest
+            WHERE h.tconst = latest.tconst AND h.snapshot_date < latest.snapshot_date
+            """)
+        await conn.execute(f"COMMENT ON TABLE {relname} IS '{COMPACTED_COMMENT}'")
+        logger.info("compacted rating history partition=%s %s", relname, deleted)
@@ -0,0 +1,117 @@
+"""maintain rollup tables from upsert deltas"""
+
+from typing import NamedTuple
+
+import asyncpg
+from src.import_base import delta_tables
+
+
+class Rollup(NamedTuple):
+    """row counts of a source table by key columns, coded columns are decoded by the key query"""
+
+    table: str
+    keys: tuple[str, ...]
+    key_query: str
+
+
+TITLE_ROLLUPS: tuple[Rollup, ...] = (
+    Rollup(
+        "rollup_title_years",
+        ("start_year", "title_type"),
+        """
+        SELECT COALESCE(s.start_year, 0) AS start_year, tt.value AS title_type
+        FROM {source} s
+        JOIN dictionary_codes tt ON tt.domain = 'title_type' AND tt.code = s.title_type
+        """,
+    ),
+    Rollup(
+        "rollup_title_genres",
+        ("start_year", "title_type", "genre"),
+        """
+        SELECT
+            COALESCE(s.start_year, 0) AS start_year,
+            tt.value AS title_type,
+            COALESCE(g.value, '') AS genre
+        FROM {source} s
+        JOIN dictionary_codes tt ON tt.domain = 'title_type' AND tt.code = s.title_type
+        LEFT JOIN LATERAL unnest(s.genres) AS sg(code) ON true
+        LEFT JOIN dictionary_codes g ON g.domain = 'genre' AND g.code = sg.code
+        """,
+    ),
+    Rollup(
+        "rollup_runtimes",
+        ("title_type", "runtime_bucket"),
+        """
+        SELECT tt.value AS title_type, s.runtime_minutes / 10 * 10 AS runtime_bucket
+        FROM {source} s
+        JOIN dictionary_codes tt ON tt.domain = 'title_type' AND tt.code = s.title_type
+        WHERE s.runtime_minutes IS NOT NULL
+        """,
+    ),
+)
+RATING_ROLLUPS: tuple[Rollup, ...] = (
+    Rollup(
+        "rollup_ratings",
+        ("rating_tenths",),
+        "SELECT (round(average_rating::numeric, 1) * 10)::int AS rating_tenths FROM {source}",
+    ),
+)
+PROFESSION_ROLLUPS: tuple[Rollup, ...] = (
+    Rollup(
+        "rollup_professions",
+        ("profession",),
+        """
+        SELECT p.value AS profession
+        FROM {source} s
+        CROSS JOIN LATERAL unnest(s.primary_professions) AS sp(code)
+        JOIN dictionary_codes p ON p.domain = 'profession' AND p.code = sp.code
+        """,
+    ),
+)
+
+
+async def refresh_title_rollups(conn: asyncpg.Connection) -> None:
+    """title counts by year, type, genre and runtime"""
+    await _refresh_rollups(conn, "titles", TITLE_ROLLUPS)
+
+
+async def refresh_rating_rollups(conn: asyncpg.Connection) -> None:
+    """rating histogram"""
+    await _refresh_rollups(conn, "title_ratings", RATING_ROLLUPS)
+
+
+async def refresh_profession_rollups(conn: asyncpg.Connection) -> None:
+    """people counts by profession"""
+    await _refresh_rollups(conn, "people", PROFESSION_ROLLUPS)
+
+
+async def _refresh_rollups(conn: asyncpg.Connection, source_table: str, rollups: tuple[Rollup, ...]) -> None:
+    """apply captured delta of source table, rebuild in full without one"""
+    before_table, after_table = delta_tables(source_table)
+    has_delta = await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", f"pg_temp.{after_table}")
+    for rollup in rollups:
+        keys = ", ".join(rollup.keys)
+        if not has_delta:
+            await conn.execute(f"TRUNCATE {rollup.table}")
+            await conn.execute(f"""
+                INSERT INTO {rollup.table} ({keys}, total)
+                SELECT {keys}, COUNT(*)
+                FROM ({rollup.key_query.format(source=source_table)}) k
+                GROUP BY {keys}
+                """)
+            continue
+
+        await conn.execute(f"""
+            INSERT INTO {rollup.table} ({keys}, total)
+            SELECT {keys}, SUM(delta)
+            FROM (
+                SELECT {keys}, 1 AS delta FROM ({rollup.key_query.format(source=after_table)}) a
+                UNION ALL
+                SELECT {keys}, -1 AS delta FROM ({rollup.key_query.format(source=before_table)}) b
+            ) d
+            GROUP BY {keys}
+            HAVING SUM(delta) <> 0
+            ON CONFLICT ({keys}) DO UPDATE
+            SET total = {rollup.table}.total + EXCLUDED.total
+            """)
+        await conn.execute(f"DELETE FROM {rollup.table} WHERE total = 0")
@@ -0,0 +1,31 @@
+"""build per season aggregates of series"""
+
+import asyncpg
+
+
+async def build_series_seasons(conn: asyncpg.Connection) -> None:
+    """rebuild series_seasons from episodes, titles and ratings"""
+    await conn.execute("DELETE FROM series_seasons")
+    await conn.execute("""
+        INSERT INTO series_seasons (
+            parent_tconst,
+            season_number,
+            episode_count,
+            start_year,
+            end_year,
+            mean_rating,
+            total_votes
+        )
+        SELECT
+            e.parent_tconst,
+            e.season_number,
+            COUNT(*),
+            MIN(t.start_year),
+            MAX(t.start_year),
+            AVG(r.average_rating),
+            COALESCE(SUM(r.num_votes), 0)
+        FROM episodes e
+        JOIN titles t ON t.tconst = e.tconst
+        LEFT JOIN title_ratings r ON r.tconst = e.tconst
+        GROUP BY e.parent_tconst, e.season_number
+        """)
@@ -0,0 +1,124 @@
+"""build similar titles from tf-idf weighted title features"""
+
+import asyncio
+import logging
+from os import environ
+
+import asyncpg
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_TITLES_TOP_N = 20
+SIMILAR_MIN_VOTES = int(environ.get("SIMILAR_MIN_VOTES", "1000"))
+SIMILAR_BLOCK_ROWS = int(environ.get("SIMILAR_BLOCK_ROWS", "256"))
+
+
+async def build_similar_titles(conn: asyncpg.Connection) -> None:
+    """rebuild top similar titles of titles with at least SIMILAR_MIN_VOTES votes"""
+    titles = await conn.fetch(
+        """
+        SELECT t.tconst, t.title_type, t.start_year, t.genres
+        FROM titles t
+        JOIN title_ratings r ON r.tconst = t.tconst
+        WHERE r.num_votes >= $1
+        ORDER BY t.tconst
+        """,
+        SIMILAR_MIN_VOTES,
+    )
+    credits = await conn.fetch(
+        """
+        SELECT DISTINCT p.tconst, p.nconst
+        FROM title_principals p
+        JOIN title_ratings r ON r.tconst = p.tconst
+        WHERE r.num_votes >= $1
+        """,
+        SIMILAR_MIN_VOTES,
+    )
+    logger.info("build similar titles titles=%s credits=%s", len(titles), len(credits))
+    records = await asyncio.to_thread(_compute_similar, titles, credits)
+
+    await conn.execute("DELETE FROM similar_titles")
+    await conn.copy_records_to_table(
+        "similar_titles",
+        records=records,
+        columns=("tconst", "rank", "similar_tconst", "score"),
+    )
+    await conn.execute("ANALYZE similar_titles")
+
+
+def _feature_matrix(titles: list[asyncpg.Record], credits: list[asyncpg.Record]) -> tuple[sparse.csr_matrix, int]:
+    """tf-idf weighted, l2 normalized features, categorical columns first"""
+    row_by_tconst = {title["tconst"]: row for row, title in enumerate(titles)}
+    columns: dict[str, int] = {}
+    rows: list[int] = []
+    cols: list[int] = []
+
+    for row, title in enumerate(titles):
+        tokens = [f"type:{title['title_type']}"]
+        if title["start_year"] is not None:
+            tokens.append(f"decade:{title['start_year'] // 10 * 10}")
+        tokens.extend(f"genre:{genre}" for genre in title["genres"] or ())
+        for token in tokens:
+            rows.append(row)
+            cols.append(columns.setdefault(token, len(columns)))
+
+    categorical_count = len(columns)
+    for tconst, nconst in credits:
+        rows.append(row_by_tconst[tconst])
+        cols.append(columns.setdefault(nconst, len(columns)))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(titles), len(columns)),
+    )
+    matrix.data[:] = 1.0
+
+    document_frequency = np.bincount(matrix.indices, minlength=len(columns))
+    idf = np.log(len(titles) / np.maximum(document_frequency, 1)).astype(np.float32)
+    idf[document_frequency < 2] = 0.0  # features of a single title never match
+    matrix = sparse.csr_matrix(matrix.multiply(idf))
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32)
+    return matrix, categorical_count
+
+
+def _compute_similar(titles: list[asyncpg.Record], credits: list[asyncpg.Record]) -> list[tuple[str, int, str, float]]:
+    """
+    Cosine top-n neighbours in row blocks. The few categorical columns are
+    multiplied densely, the many principal columns as sparse products.
+    """
+    if len(titles) < 2:
+        return []
+
+    matrix, categorical_count = _feature_matrix(titles, credits)
+    dense = matrix[:, :categorical_count].toarray()
+    people = matrix[:, categorical_count:].tocsr()
+    people_transposed = people.T.tocsr()
+    top_n = min(SIMILAR_TITLES_TOP_N, len(titles) - 1)
+
+    records: list[tuple[str, int, str, float]] = []
+    for start in range(0, len(titles), SIMILAR_BLOCK_ROWS):
+        stop = min(start + SIMILAR_BLOCK_ROWS, len(titles))
+        scores = dense[start:stop] @ dense.T
+        shared_people = (people[start:stop] @ people_transposed).tocoo()
+        scores[shared_people.row, shared_people.col] += shared_people.data
+        scores[np.arange(stop - start), np.arange(start, stop)] = -1.0
+
+        candidates = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        candidates = np.take_along_axis(candidates, order, axis=1)
+        candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+        for offset in range(stop - start):
+            tconst = titles[start + offset]["tconst"]
+            for rank, (column, score) in enumerate(zip(candidates[offset], candidate_scores[offset]), start=1):
+                if score <= 0:
+                    break
+                records.append((tconst, rank, titles[column]["tconst"], float(score)))
+
+    return records
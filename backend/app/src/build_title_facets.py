@@ -0,0 +1,81 @@
+"""build title facet bitmaps from titles and ratings"""
+
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+
+import asyncpg
+import numpy as np
+from facets import FACETS_DIR, MAX_GENRE_CODE, build_facet_arrays, save_facets
+from src.build_collaboration_graph import COPY_HEADER_BYTES, COPY_TRAILER_BYTES
+
+logger = logging.getLogger(__name__)
+
+COPY_ROW_DTYPE = np.dtype(
+    [
+        ("field_count", ">i2"),
+        ("title_type_size", ">i4"),
+        ("title_type", ">i4"),
+        ("genres_size", ">i4"),
+        ("genres", ">i8"),
+        ("start_year_size", ">i4"),
+        ("start_year", ">i4"),
+        ("rating_size", ">i4"),
+        ("rating", ">i4"),
+    ]
+)
+
+
+async def build_title_facets(conn: asyncpg.Connection) -> None:
+    """export title facet columns and rebuild the bitmap files"""
+    code_rows = await conn.fetch(
+        "SELECT domain, code, value FROM dictionary_codes WHERE domain IN ('title_type', 'genre')"
+    )
+    code_labels = {(row["domain"], row["code"]): row["value"] for row in code_rows}
+
+    FACETS_DIR.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=FACETS_DIR.parent) as tmp_dir:
+        rows_path = Path(tmp_dir) / "titles.bin"
+        await conn.copy_from_query(
+            """
+            SELECT
+                COALESCE(t.title_type, 0)::int4,
+                COALESCE(
+                    (SELECT bit_or(1::int8 << g::int4) FROM unnest(t.genres) AS g WHERE g BETWEEN 1 AND $1),
+                    0
+                ),
+                COALESCE(t.start_year, 0)::int4,
+                COALESCE(round(r.average_rating * 10)::int4, -1)
+            FROM titles t
+            LEFT JOIN title_ratings r ON r.tconst = t.tconst
+            """,
+            MAX_GENRE_CODE,
+            output=str(rows_path),
+            format="binary",
+        )
+        await asyncio.to_thread(_build_from_copy, rows_path, code_labels)
+
+
+def _build_from_copy(rows_path: Path, code_labels: dict[tuple[str, int], str]) -> None:
+    """read binary COPY output and save facet bitmaps"""
+    title_count = (rows_path.stat().st_size - COPY_HEADER_BYTES - COPY_TRAILER_BYTES) // COPY_ROW_DTYPE.itemsize
+    logger.info("build title facets titles=%s", title_count)
+    if title_count:
+        rows = np.memmap(rows_path, dtype=COPY_ROW_DTYPE, mode="r", offset=COPY_HEADER_BYTES, shape=(title_count,))
+    else:
+        rows = np.empty(0, dtype=COPY_ROW_DTYPE)
+
+    arrays, values = build_facet_arrays(
+        rows["title_type"].astype(np.int16),
+        rows["genres"].astype(np.int64),
+        rows["start_year"].astype(np.int16),
+        rows["rating"].astype(np.int16),
+    )
+    del rows
+    labels = {
+        "title_type": [code_labels[("title_type", code)] for code in values["title_type"]],
+        "genre": [code_labels[("genre", code)] for code in values["genre"]],
+        "decade": [str(decade) for decade in values["decade"]],
+    }
+    save_facets(arrays, labels, FACETS_DIR)
@@ -10,33 +10,50 @@ from io import BytesIO
 from os import environ
 from pathlib import Path
 from time import perf_counter
-from typing import AsyncIterator, ClassVar, cast
+from typing import AsyncIterator, Awaitable, Callable, ClassVar, cast
 
 import aiohttp
 import asyncpg
-from database import AsyncSessionLocal
-from models import ImportTask
+from generation import dataset_generations
+from metrics import ingest_phase
+from src.partitions import create_hash_partitions, partition_table
 
 logger = logging.getLogger(__name__)
 
 
+def delta_tables(table_name: str) -> tuple[str, str]:
+    """temp tables with pre and post images of rows changed by an upsert"""
+    return f"delta_{table_name}_before", f"delta_{table_name}_after"
+
+
 class IngestDataset(ABC):
     """
-    Base class for IMDb dataset ingestion using COPY + staging tables.
+    Base class for IMDb dataset ingestion using COPY + staging tables into
+    TABLE_NAME, counted after the merge. Datasets with PARTITIONS stage into a hash partitioned table and merge
+    every partition concurrently. CODES maps dictionary domains to queries
+    of their staged values, new values get a code before the merge.
     """
 
     CHUNK_SIZE_LINES = 100_000
     BASE_URL = "https://datasets.imdbws.com"
     CACHE_DIR = environ["CACHE_DIR"]
     DATASET_NAME: ClassVar[str] = ""
+    TABLE_NAME: ClassVar[str] = ""
+    READ_MODELS: ClassVar[tuple[Callable[[asyncpg.Connection], Awaitable[None]], ...]] = ()
+    PARTITIONS: ClassVar[int] = 0
+    CODES: ClassVar[dict[str, str]] = {}
 
-    def __init__(self, pool: asyncpg.Pool):
-        if not self.DATASET_NAME:
-            raise NotImplementedError(f"{self.__class__.__name__} must define DATASET_NAME")
+    def __init__(self, pool: asyncpg.Pool, partition_pool: asyncpg.Pool | None = None):
+        if not self.DATASET_NAME or not self.TABLE_NAME:
+            raise NotImplementedError(f"{self.__class__.__name__} must define DATASET_NAME and TABLE_NAME")
+        if self.PARTITIONS and partition_pool is None:
+            raise ValueError(f"{self.__class__.__name__} merges partitions and needs a partition_pool")
 
         self.dataset_name = self.DATASET_NAME
         self.pool = pool
+        self.partition_pool = partition_pool
         self.iso_date = datetime.now().date().isoformat()
+        self.row_count: int | None = None
 
     @property
     def gz_path(self) -> Path:
@@ -85,22 +102,29 @@ class IngestDataset(ABC):
         start = perf_counter()
 
         logger.info("import started dataset=%s", self.dataset_name)
-        await self._download_if_needed()
-        self._extract_if_needed()
-
-        async with self.pool.acquire() as conn:
-            db_conn = cast(asyncpg.Connection, conn)
-            async with conn.transaction():
-                await db_conn.execute("SET LOCAL synchronous_commit = off")
-                logger.info("ingest into temporary table staging_table=%s", self.staging_table)
-                await self.create_staging_table(db_conn)
-
-                async for lines in self._read_tsv_in_chunks():
-                    await self.copy_chunk(db_conn, lines)
-
-                await db_conn.execute(f"ANALYZE {self.staging_table}")
-                logger.info("merge temporary table into final table")
-                await self.merge_into_final(db_conn)
+        with ingest_phase(self.dataset_name, "download"):
+            await self._download_if_needed()
+        with ingest_phase(self.dataset_name, "extract"):
+            self._extract_if_needed()
+
+        try:
+            async with self.pool.acquire() as conn:
+                db_conn = cast(asyncpg.Connection, conn)
+                if self.PARTITIONS:
+                    await self._ingest_partitioned(db_conn)
+                else:
+                    await self._ingest(db_conn)
+        except Exception:
+            if self.PARTITIONS:
+                # partitions merged before the failure stay committed, bump the generation all the same
+                logger.error("partitioned import failed, table partially merged dataset=%s", self.dataset_name)
+                self.row_count = None
+                await self._record_import_task(
+                    import_start_time=import_start_time,
+                    duration=perf_counter() - start,
+                    failed=True,
+                )
+            raise
 
         await self._record_import_task(
             import_start_time=import_start_time,
@@ -118,6 +142,123 @@ class IngestDataset(ABC):
         if Path(self.gz_path).exists():
             Path(self.gz_path).unlink()
 
+    async def _ingest(self, conn: asyncpg.Connection) -> None:
+        """stage, merge and rebuild read models in one transaction"""
+        async with conn.transaction():
+            await conn.execute("SET LOCAL synchronous_commit = off")
+            logger.info("ingest into temporary table staging_table=%s", self.staging_table)
+            await self._load_staging_table(conn)
+            await self._register_codes(conn)
+            logger.info("merge temporary table into final table")
+            with ingest_phase(self.dataset_name, "merge"):
+                await self.merge_into_final(conn)
+            await self._count_rows(conn)
+            await self._build_read_models(conn)
+
+    async def _ingest_partitioned(self, conn: asyncpg.Connection) -> None:
+        """
+        Stage into an unlogged table partitioned like the final table, so
+        partition merges on other connections can read it. Merges commit
+        per partition, read models are rebuilt in one transaction after. A
+        failure leaves the merged partitions committed, the import is not atomic.
+        """
+        try:
+            logger.info("ingest into partitioned staging_table=%s", self.staging_table)
+            await self._load_staging_table(conn)
+            await self._register_codes(conn)
+            logger.info("merge staging partitions into final table partitions=%s", self.PARTITIONS)
+            with ingest_phase(self.dataset_name, "merge"):
+                await self.merge_into_final(conn)
+            await self._count_rows(conn)
+            async with conn.transaction():
+                await conn.execute("SET LOCAL synchronous_commit = off")
+                await self._build_read_models(conn)
+        finally:
+            await conn.execute(f"DROP TABLE IF EXISTS {self.staging_table}")
+            await conn.execute("DISCARD TEMP")
+
+    async def _load_staging_table(self, conn: asyncpg.Connection) -> None:
+        """create and fill staging table"""
+        with ingest_phase(self.dataset_name, "stage"):
+            await self.create_staging_table(conn)
+            if self.PARTITIONS:
+                await create_hash_partitions(conn, self.staging_table, self.PARTITIONS, unlogged=True)
+
+            async for lines in self._read_tsv_in_chunks():
+                await self.copy_chunk(conn, lines)
+
+            await conn.execute(f"ANALYZE {self.staging_table}")
+
+    async def _register_codes(self, conn: asyncpg.Connection) -> None:
+        """append codes for staged values not in dictionary_codes yet"""
+        with ingest_phase(self.dataset_name, "register_codes"):
+            for domain, values_query in self.CODES.items():
+                registered = await conn.execute(
+                    f"""
+                    INSERT INTO dictionary_codes (domain, code, value)
+                    SELECT
+                        $1,
+                        (
+                            (SELECT COALESCE(MAX(code), 0) FROM dictionary_codes WHERE domain = $1)
+                            + row_number() OVER (ORDER BY v.value)
+                        )::smallint,
+                        v.value
+                    FROM (
+                        SELECT DISTINCT value
+                        FROM ({values_query.format(staging_table=self.staging_table)}) AS staged(value)
+                        WHERE value IS NOT NULL
+                    ) v
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM dictionary_codes d WHERE d.domain = $1 AND d.value = v.value
+                    )
+                    """,
+                    domain,
+                )
+                logger.info("register dictionary codes domain=%s %s", domain, registered)
+
+    async def _count_rows(self, conn: asyncpg.Connection) -> None:
+        """exact row count of the merged table, partitions are counted concurrently"""
+        with ingest_phase(self.dataset_name, "count"):
+            if not self.PARTITIONS:
+                self.row_count = await conn.fetchval(f"SELECT COUNT(*) FROM {self.TABLE_NAME}")
+            else:
+                partition_counts: list[int] = []
+
+                async def count_partition(partition_conn: asyncpg.Connection, remainder: int) -> None:
+                    partition = partition_table(self.TABLE_NAME, remainder)
+                    partition_counts.append(await partition_conn.fetchval(f"SELECT COUNT(*) FROM {partition}"))
+
+                await self._for_each_partition(count_partition)
+                self.row_count = sum(partition_counts)
+
+        logger.info("counted rows table=%s rows=%s", self.TABLE_NAME, self.row_count)
+
+    async def _build_read_models(self, conn: asyncpg.Connection) -> None:
+        """rebuild read models derived from the merged table"""
+        for build_read_model in self.READ_MODELS:
+            logger.info("rebuild read model %s", build_read_model.__name__)
+            with ingest_phase(self.dataset_name, build_read_model.__name__):
+                await build_read_model(conn)
+
+    async def _for_each_partition(self, work: Callable[[asyncpg.Connection, int], Awaitable[None]]) -> None:
+        """
+        Run work with every partition remainder concurrently, each on its own
+        connection of the partition pool and transaction. Concurrency is bound
+        by the partition pool size, the ingest connection is not part of it.
+        """
+        partition_pool = cast(asyncpg.Pool, self.partition_pool)
+
+        async def run_partition(remainder: int) -> None:
+            async with partition_pool.acquire() as conn:
+                db_conn = cast(asyncpg.Connection, conn)
+                start = perf_counter()
+                async with conn.transaction():
+                    await db_conn.execute("SET LOCAL synchronous_commit = off")
+                    await work(db_conn, remainder)
+                logger.info("%s remainder=%s duration=%.3fs", work.__name__, remainder, perf_counter() - start)
+
+        await asyncio.gather(*(run_partition(remainder) for remainder in range(self.PARTITIONS)))
+
     async def _download_if_needed(self) -> None:
         """download if not exist on file path"""
         if self.gz_path.exists() or self.tsv_path.exists():
@@ -145,18 +286,27 @@ class IngestDataset(ABC):
         self,
         import_start_time: datetime,
         duration: float,
+        failed: bool = False,
     ) -> None:
         """Persist one import task row for this dataset processing run."""
-        import_task = ImportTask(
-            filename=self.dataset_name,
-            size_compressed=self.gz_size,
-            size_raw=self.tsv_size,
-            import_start_time=import_start_time,
-            duration=duration,
-        )
-        async with AsyncSessionLocal() as session:
-            session.add(import_task)
-            await session.commit()
+        async with self.pool.acquire() as conn:
+            import_task_id = await conn.fetchval(
+                """
+                INSERT INTO import_tasks
+                    (filename, size_compressed, size_raw, import_start_time, duration, row_count, failed)
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                RETURNING id
+                """,
+                self.dataset_name,
+                self.gz_size,
+                self.tsv_size,
+                import_start_time,
+                duration,
+                self.row_count,
+                failed,
+            )
+
+        dataset_generations.bump(self.dataset_name, import_task_id)
 
     async def _read_tsv_in_chunks(self) -> AsyncIterator[list[str]]:
         """partial read tsv file"""
@@ -198,6 +348,28 @@ class IngestDataset(ABC):
             quote="\b",
         )
 
+    async def _upsert_with_delta(self, conn: asyncpg.Connection, table_name: str, key: str, upsert: str) -> None:
+        """
+        Run upsert statement and capture changed rows in delta tables.
+        All parts of the statement share one snapshot, so the select of
+        the target table still reads the rows as they were before.
+        """
+        before_table, after_table = delta_tables(table_name)
+        await conn.execute(f"CREATE TEMP TABLE {before_table} (LIKE {table_name}) ON COMMIT DROP")
+        await conn.execute(f"CREATE TEMP TABLE {after_table} (LIKE {table_name}) ON COMMIT DROP")
+        await conn.execute(f"""
+            WITH upserted AS (
+                {upsert}
+                RETURNING {table_name}.*
+            ),
+            previous AS (
+                INSERT INTO {before_table}
+                SELECT t.* FROM {table_name} t WHERE t.{key} IN (SELECT {key} FROM upserted)
+            )
+            INSERT INTO {after_table}
+            SELECT * FROM upserted
+            """)
+
     async def _is_table_empty(self, conn: asyncpg.Connection, table_name: str) -> bool:
         """check if final target table has rows"""
         return bool(await conn.fetchval(f"SELECT NOT EXISTS (SELECT 1 FROM {table_name} LIMIT 1)"))
@@ -6,7 +6,7 @@ from os import environ
 from pathlib import Path
 from typing import Type
 
-import asyncpg
+from database import get_ingest_pool, get_partition_pool
 from src.import_base import IngestDataset
 from src.import_name_basic import IngestNameBasics
 from src.import_title_akas import IngestTitleAkas
@@ -78,18 +78,16 @@ def clean_cache_dir():
 async def import_datasets(dataset_names: list[str] | None = None) -> None:
     """run all imports, or selected imports by dataset names"""
 
-    pool = await asyncpg.create_pool(dsn=environ["DATABASE_URL_SYNC"])
-    try:
-        selected_classes, selected_dataset_names = resolve_datasets(dataset_names)
+    selected_classes, selected_dataset_names = resolve_datasets(dataset_names)
+    pool = await get_ingest_pool()
 
-        logger.info(
-            "Starting dataset imports datasets=%s",
-            ", ".join(selected_dataset_names),
-        )
+    logger.info(
+        "Starting dataset imports datasets=%s",
+        ", ".join(selected_dataset_names),
+    )
 
-        for ingest_class in selected_classes:
-            await ingest_class(pool=pool).run()
-    finally:
-        await pool.close()
+    for ingest_class in selected_classes:
+        partition_pool = await get_partition_pool() if ingest_class.PARTITIONS else None
+        await ingest_class(pool=pool, partition_pool=partition_pool).run()
 
     clean_cache_dir()
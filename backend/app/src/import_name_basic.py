@@ -1,6 +1,8 @@
 """import name basic dataset"""
 
 import asyncpg
+from dictionary import encode_array_sql
+from src.build_rollups import refresh_profession_rollups
 from src.import_base import IngestDataset
 
 
@@ -8,6 +10,9 @@ class IngestNameBasics(IngestDataset):
     """ingest dataset"""
 
     DATASET_NAME = "name.basics.tsv"
+    TABLE_NAME = "people"
+    READ_MODELS = (refresh_profession_rollups,)
+    CODES = {"profession": "SELECT unnest(string_to_array(primary_professions, ',')) FROM {staging_table}"}
 
     async def create_staging_table(self, conn: asyncpg.Connection) -> None:
         await conn.execute(f"""
@@ -46,40 +51,45 @@ class IngestNameBasics(IngestDataset):
                 primary_name,
                 birth_year,
                 death_year,
-                string_to_array(primary_professions, ','),
+                {encode_array_sql("profession", "string_to_array(s.primary_professions, ',')")},
                 string_to_array(known_for_titles, ',')
-            FROM {self.staging_table}
+            FROM {self.staging_table} s
             """)
 
     async def _upsert_existing(self, conn: asyncpg.Connection) -> None:
-        await conn.execute(f"""
-            INSERT INTO people (
-                nconst,
-                primary_name,
-                birth_year,
-                death_year,
-                primary_professions,
-                known_for_titles
-            )
-            SELECT
-                nconst,
-                primary_name,
-                birth_year,
-                death_year,
-                string_to_array(primary_professions, ','),
-                string_to_array(known_for_titles, ',')
-            FROM {self.staging_table}
-            ON CONFLICT (nconst) DO UPDATE
-            SET
-                primary_name = EXCLUDED.primary_name,
-                birth_year = EXCLUDED.birth_year,
-                death_year = EXCLUDED.death_year,
-                primary_professions = EXCLUDED.primary_professions,
-                known_for_titles = EXCLUDED.known_for_titles
-            WHERE
-                people.primary_name IS DISTINCT FROM EXCLUDED.primary_name
-                OR people.birth_year IS DISTINCT FROM EXCLUDED.birth_year
-                OR people.death_year IS DISTINCT FROM EXCLUDED.death_year
-                OR people.primary_professions IS DISTINCT FROM EXCLUDED.primary_professions
-                OR people.known_for_titles IS DISTINCT FROM EXCLUDED.known_for_titles;
-            """)
+        await self._upsert_with_delta(
+            conn,
+            "people",
+            "nconst",
+            f"""
+                INSERT INTO people (
+                    nconst,
+                    primary_name,
+                    birth_year,
+                    death_year,
+                    primary_professions,
+                    known_for_titles
+                )
+                SELECT
+                    nconst,
+                    primary_name,
+                    birth_year,
+                    death_year,
+                    {encode_array_sql("profession", "string_to_array(s.primary_professions, ',')")},
+                    string_to_array(known_for_titles, ',')
+                FROM {self.staging_table} s
+                ON CONFLICT (nconst) DO UPDATE
+                SET
+                    primary_name = EXCLUDED.primary_name,
+                    birth_year = EXCLUDED.birth_year,
+                    death_year = EXCLUDED.death_year,
+                    primary_professions = EXCLUDED.primary_professions,
+                    known_for_titles = EXCLUDED.known_for_titles
+                WHERE
+                    people.primary_name IS DISTINCT FROM EXCLUDED.primary_name
+                    OR people.birth_year IS DISTINCT FROM EXCLUDED.birth_year
+                    OR people.death_year IS DISTINCT FROM EXCLUDED.death_year
+                    OR people.primary_professions IS DISTINCT FROM EXCLUDED.primary_professions
+                    OR people.known_for_titles IS DISTINCT FROM EXCLUDED.known_for_titles
+                """,
+        )
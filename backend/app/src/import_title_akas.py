@@ -1,17 +1,28 @@
 """import title akas"""
 
 import asyncpg
+from dictionary import encode_array_sql, encode_sql
 from src.import_base import IngestDataset
+from src.partitions import HASH_PARTITIONS, partition_table
 
 
 class IngestTitleAkas(IngestDataset):
     """ingest dataset"""
 
     DATASET_NAME = "title.akas.tsv"
+    TABLE_NAME = "title_akas"
+    PARTITIONS = HASH_PARTITIONS
+    CODES = {
+        "region": "SELECT region FROM {staging_table}",
+        "language": "SELECT language FROM {staging_table}",
+        "aka_type": "SELECT unnest(string_to_array(types, ',')) FROM {staging_table}",
+        "aka_attribute": "SELECT unnest(string_to_array(attributes, ',')) FROM {staging_table}",
+    }
 
     async def create_staging_table(self, conn: asyncpg.Connection) -> None:
+        await conn.execute(f"DROP TABLE IF EXISTS {self.staging_table}")
         await conn.execute(f"""
-            CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} (
+            CREATE TABLE {self.staging_table} (
                 title_id TEXT,
                 ordering INTEGER,
                 title TEXT,
@@ -20,7 +31,7 @@ class IngestTitleAkas(IngestDataset):
                 types TEXT,
                 attributes TEXT,
                 is_original BOOLEAN
-            ) ON COMMIT DROP;
+            ) PARTITION BY HASH (title_id);
             """)
 
     async def merge_into_final(self, conn: asyncpg.Connection) -> None:
@@ -34,8 +45,11 @@ class IngestTitleAkas(IngestDataset):
         return await self._is_table_empty(conn, "title_akas")
 
     async def _insert_first_import(self, conn: asyncpg.Connection) -> None:
+        await self._for_each_partition(self._insert_partition)
+
+    async def _insert_partition(self, conn: asyncpg.Connection, remainder: int) -> None:
         await conn.execute(f"""
-            INSERT INTO title_akas (
+            INSERT INTO {partition_table("title_akas", remainder)} (
                 title_id,
                 ordering,
                 title,
@@ -49,26 +63,23 @@ class IngestTitleAkas(IngestDataset):
                 s.title_id,
                 s.ordering,
                 s.title,
-                s.region,
-                s.language,
-                CASE
-                    WHEN s.types IS NULL THEN NULL
-                    ELSE string_to_array(s.types, ',')
-                END,
-                CASE
-                    WHEN s.attributes IS NULL THEN NULL
-                    ELSE string_to_array(s.attributes, ',')
-                END,
+                {encode_sql("region", "s.region")},
+                {encode_sql("language", "s.language")},
+                {encode_array_sql("aka_type", "string_to_array(s.types, ',')")},
+                {encode_array_sql("aka_attribute", "string_to_array(s.attributes, ',')")},
                 s.is_original
-            FROM {self.staging_table} s
+            FROM {partition_table(self.staging_table, remainder)} s
             WHERE EXISTS (
                 SELECT 1 FROM titles t WHERE t.tconst = s.title_id
             )
             """)
 
     async def _upsert_existing(self, conn: asyncpg.Connection) -> None:
+        await self._for_each_partition(self._upsert_partition)
+
+    async def _upsert_partition(self, conn: asyncpg.Connection, remainder: int) -> None:
         await conn.execute(f"""
-            INSERT INTO title_akas (
+            INSERT INTO {partition_table("title_akas", remainder)} AS ta (
                 title_id,
                 ordering,
                 title,
@@ -82,18 +93,12 @@ class IngestTitleAkas(IngestDataset):
                 s.title_id,
                 s.ordering,
                 s.title,
-                s.region,
-                s.language,
-                CASE
-                    WHEN s.types IS NULL THEN NULL
-                    ELSE string_to_array(s.types, ',')
-                END,
-                CASE
-                    WHEN s.attributes IS NULL THEN NULL
-                    ELSE string_to_array(s.attributes, ',')
-                END,
+                {encode_sql("region", "s.region")},
+                {encode_sql("language", "s.language")},
+                {encode_array_sql("aka_type", "string_to_array(s.types, ',')")},
+                {encode_array_sql("aka_attribute", "string_to_array(s.attributes, ',')")},
                 s.is_original
-            FROM {self.staging_table} s
+            FROM {partition_table(self.staging_table, remainder)} s
             WHERE EXISTS (
                 SELECT 1 FROM titles t WHERE t.tconst = s.title_id
             )
@@ -106,10 +111,10 @@ class IngestTitleAkas(IngestDataset):
                 attributes = EXCLUDED.attributes,
                 is_original = EXCLUDED.is_original
             WHERE
-                title_akas.title IS DISTINCT FROM EXCLUDED.title
-                OR title_akas.region IS DISTINCT FROM EXCLUDED.region
-                OR title_akas.language IS DISTINCT FROM EXCLUDED.language
-                OR title_akas.types IS DISTINCT FROM EXCLUDED.types
-                OR title_akas.attributes IS DISTINCT FROM EXCLUDED.attributes
-                OR title_akas.is_original IS DISTINCT FROM EXCLUDED.is_original;
+                ta.title IS DISTINCT FROM EXCLUDED.title
+                OR ta.region IS DISTINCT FROM EXCLUDED.region
+                OR ta.language IS DISTINCT FROM EXCLUDED.language
+                OR ta.types IS DISTINCT FROM EXCLUDED.types
+                OR ta.attributes IS DISTINCT FROM EXCLUDED.attributes
+                OR ta.is_original IS DISTINCT FROM EXCLUDED.is_original;
             """)
@@ -1,6 +1,12 @@
 """import title basic dataset"""
 
 import asyncpg
+from dictionary import encode_array_sql, encode_sql
+from src.build_filmography import refresh_filmography_titles
+from src.build_leaderboards import build_leaderboards
+from src.build_rollups import refresh_title_rollups
+from src.build_series_seasons import build_series_seasons
+from src.build_title_facets import build_title_facets
 from src.import_base import IngestDataset
 
 
@@ -8,6 +14,18 @@ class IngestTitleBasics(IngestDataset):
     """ingest title basic dataset"""
 
     DATASET_NAME = "title.basics.tsv"
+    TABLE_NAME = "titles"
+    READ_MODELS = (
+        build_series_seasons,
+        refresh_filmography_titles,
+        build_leaderboards,
+        refresh_title_rollups,
+        build_title_facets,
+    )
+    CODES = {
+        "title_type": "SELECT title_type FROM {staging_table}",
+        "genre": "SELECT unnest(string_to_array(genres, ',')) FROM {staging_table}",
+    }
 
     async def create_staging_table(self, conn: asyncpg.Connection) -> None:
         await conn.execute(f"""
@@ -48,59 +66,64 @@ class IngestTitleBasics(IngestDataset):
                 genres
             )
             SELECT
-                tconst,
-                title_type,
-                primary_title,
-                NULLIF(original_title, ''),
-                is_adult,
-                start_year,
-                end_year,
-                runtime_minutes,
-                string_to_array(genres, ',')
-            FROM {self.staging_table}
+                s.tconst,
+                {encode_sql("title_type", "s.title_type")},
+                s.primary_title,
+                NULLIF(s.original_title, ''),
+                s.is_adult,
+                s.start_year,
+                s.end_year,
+                s.runtime_minutes,
+                {encode_array_sql("genre", "string_to_array(s.genres, ',')")}
+            FROM {self.staging_table} s
             """)
 
     async def _upsert_existing(self, conn: asyncpg.Connection) -> None:
-        await conn.execute(f"""
-            INSERT INTO titles (
-                tconst,
-                title_type,
-                primary_title,
-                original_title,
-                is_adult,
-                start_year,
-                end_year,
-                runtime_minutes,
-                genres
-            )
-            SELECT
-                tconst,
-                title_type,
-                primary_title,
-                NULLIF(original_title, ''),
-                is_adult,
-                start_year,
-                end_year,
-                runtime_minutes,
-                string_to_array(genres, ',')
-            FROM {self.staging_table}
-            ON CONFLICT (tconst) DO UPDATE
-            SET
-                title_type = EXCLUDED.title_type,
-                primary_title = EXCLUDED.primary_title,
-                original_title = EXCLUDED.original_title,
-                is_adult = EXCLUDED.is_adult,
-                start_year = EXCLUDED.start_year,
-                end_year = EXCLUDED.end_year,
-                runtime_minutes = EXCLUDED.runtime_minutes,
-                genres = EXCLUDED.genres
-            WHERE
-                titles.title_type IS DISTINCT FROM EXCLUDED.title_type
-                OR titles.primary_title IS DISTINCT FROM EXCLUDED.primary_title
-                OR titles.original_title IS DISTINCT FROM EXCLUDED.original_title
-                OR titles.is_adult IS DISTINCT FROM EXCLUDED.is_adult
-                OR titles.start_year IS DISTINCT FROM EXCLUDED.start_year
-                OR titles.end_year IS DISTINCT FROM EXCLUDED.end_year
-                OR titles.runtime_minutes IS DISTINCT FROM EXCLUDED.runtime_minutes
-                OR titles.genres IS DISTINCT FROM EXCLUDED.genres
-            """)
+        await self._upsert_with_delta(
+            conn,
+            "titles",
+            "tconst",
+            f"""
+                INSERT INTO titles (
+                    tconst,
+                    title_type,
+                    primary_title,
+                    original_title,
+                    is_adult,
+                    start_year,
+                    end_year,
+                    runtime_minutes,
+                    genres
+                )
+                SELECT
+                    s.tconst,
+                    {encode_sql("title_type", "s.title_type")},
+                    s.primary_title,
+                    NULLIF(s.original_title, ''),
+                    s.is_adult,
+                    s.start_year,
+                    s.end_year,
+                    s.runtime_minutes,
+                    {encode_array_sql("genre", "string_to_array(s.genres, ',')")}
+                FROM {self.staging_table} s
+                ON CONFLICT (tconst) DO UPDATE
+                SET
+                    title_type = EXCLUDED.title_type,
+                    primary_title = EXCLUDED.primary_title,
+                    original_title = EXCLUDED.original_title,
+                    is_adult = EXCLUDED.is_adult,
+                    start_year = EXCLUDED.start_year,
+                    end_year = EXCLUDED.end_year,
+                    runtime_minutes = EXCLUDED.runtime_minutes,
+                    genres = EXCLUDED.genres
+                WHERE
+                    titles.title_type IS DISTINCT FROM EXCLUDED.title_type
+                    OR titles.primary_title IS DISTINCT FROM EXCLUDED.primary_title
+                    OR titles.original_title IS DISTINCT FROM EXCLUDED.original_title
+                    OR titles.is_adult IS DISTINCT FROM EXCLUDED.is_adult
+                    OR titles.start_year IS DISTINCT FROM EXCLUDED.start_year
+                    OR titles.end_year IS DISTINCT FROM EXCLUDED.end_year
+                    OR titles.runtime_minutes IS DISTINCT FROM EXCLUDED.runtime_minutes
+                    OR titles.genres IS DISTINCT FROM EXCLUDED.genres
+                """,
+        )
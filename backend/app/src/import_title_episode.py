@@ -1,6 +1,7 @@
 """import title episodes"""
 
 import asyncpg
+from src.build_series_seasons import build_series_seasons
 from src.import_base import IngestDataset
 
 
@@ -8,6 +9,8 @@ class IngestTitleEpisodes(IngestDataset):
     """ingest dataset"""
 
     DATASET_NAME = "title.episode.tsv"
+    TABLE_NAME = "episodes"
+    READ_MODELS = (build_series_seasons,)
 
     async def create_staging_table(self, conn: asyncpg.Connection) -> None:
         await conn.execute(f"""
@@ -1,24 +1,46 @@
 """import title principals"""
 
 import asyncpg
+from dictionary import encode_sql
+from src.build_collaboration_graph import build_collaboration_graph
+from src.build_collaborators import CHANGED_PEOPLE_TABLE, build_collaborators
+from src.build_filmography import build_filmography
+from src.build_similar_titles import build_similar_titles
 from src.import_base import IngestDataset
+from src.partitions import HASH_PARTITIONS, partition_table
+
+SECONDARY_INDEXES: dict[str, str] = {
+    "ix_title_principals_nconst": "nconst",
+    "ix_title_principals_category": "category",
+}
 
 
 class IngestTitlePrincipals(IngestDataset):
     """ingest dataset"""
 
     DATASET_NAME = "title.principals.tsv"
+    TABLE_NAME = "title_principals"
+    # filmography is swapped in late, its table lock is held until commit
+    READ_MODELS = (
+        build_collaboration_graph,
+        build_similar_titles,
+        build_filmography,
+        build_collaborators,
+    )
+    PARTITIONS = HASH_PARTITIONS
+    CODES = {"category": "SELECT category FROM {staging_table}"}
 
     async def create_staging_table(self, conn: asyncpg.Connection) -> None:
+        await conn.execute(f"DROP TABLE IF EXISTS {self.staging_table}")
         await conn.execute(f"""
-            CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} (
+            CREATE TABLE {self.staging_table} (
                 tconst TEXT,
                 ordering INTEGER,
                 nconst TEXT,
                 category TEXT,
                 job TEXT,
                 characters TEXT
-            ) ON COMMIT DROP;
+            ) PARTITION BY HASH (tconst);
             """)
 
     async def merge_into_final(self, conn: asyncpg.Connection) -> None:
@@ -34,52 +56,101 @@ class IngestTitlePrincipals(IngestDataset):
     async def _insert_first_import(self, conn: asyncpg.Connection) -> None:
         await self._drop_secondary_indexes(conn)
         try:
-            await conn.execute(f"""
-                INSERT INTO title_principals (
-                    tconst,
-                    ordering,
-                    nconst,
-                    category,
-                    job,
-                    characters
-                )
-                SELECT
-                    s.tconst,
-                    s.ordering,
-                    s.nconst,
-                    s.category,
-                    s.job,
-                    CASE
-                        WHEN s.characters IS NULL THEN NULL
-                        ELSE (
-                            SELECT array_agg(value)
-                            FROM jsonb_array_elements_text(s.characters::jsonb)
-                        )
-                    END
-                FROM {self.staging_table} s
-                WHERE EXISTS (
-                    SELECT 1 FROM titles t WHERE t.tconst = s.tconst
-                )
-                AND EXISTS (
-                    SELECT 1 FROM people p WHERE p.nconst = s.nconst
-                )
-                """)
+            await self._for_each_partition(self._insert_partition)
         finally:
             await self._create_secondary_indexes(conn)
 
+    async def _insert_partition(self, conn: asyncpg.Connection, remainder: int) -> None:
+        await conn.execute(f"""
+            INSERT INTO {partition_table("title_principals", remainder)} (
+                tconst,
+                ordering,
+                nconst,
+                category,
+                job,
+                characters
+            )
+            SELECT
+                s.tconst,
+                s.ordering,
+                s.nconst,
+                {encode_sql("category", "s.category")},
+                s.job,
+                CASE
+                    WHEN s.characters IS NULL THEN NULL
+                    ELSE (
+                        SELECT array_agg(value)
+                        FROM jsonb_array_elements_text(s.characters::jsonb)
+                    )
+                END
+            FROM {partition_table(self.staging_table, remainder)} s
+            WHERE EXISTS (
+                SELECT 1 FROM titles t WHERE t.tconst = s.tconst
+            )
+            AND EXISTS (
+                SELECT 1 FROM people p WHERE p.nconst = s.nconst
+            )
+            """)
+
     async def _drop_secondary_indexes(self, conn: asyncpg.Connection) -> None:
-        await conn.execute("DROP INDEX IF EXISTS ix_title_principals_tconst")
-        await conn.execute("DROP INDEX IF EXISTS ix_title_principals_nconst")
-        await conn.execute("DROP INDEX IF EXISTS ix_title_principals_category")
+        for index_name in SECONDARY_INDEXES:
+            await conn.execute(f"DROP INDEX IF EXISTS {index_name}")
 
     async def _create_secondary_indexes(self, conn: asyncpg.Connection) -> None:
-        await conn.execute("CREATE INDEX IF NOT EXISTS ix_title_principals_tconst ON title_principals (tconst)")
-        await conn.execute("CREATE INDEX IF NOT EXISTS ix_title_principals_nconst ON title_principals (nconst)")
-        await conn.execute("CREATE INDEX IF NOT EXISTS ix_title_principals_category ON title_principals (category)")
+        """create indexes on the parent only, build them per partition concurrently, then attach"""
+        for index_name, column in SECONDARY_INDEXES.items():
+            await conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON ONLY title_principals ({column})")
+
+        await self._for_each_partition(self._create_partition_indexes)
+        for index_name in SECONDARY_INDEXES:
+            for remainder in range(self.PARTITIONS):
+                partition_index = partition_table(index_name, remainder)
+                await conn.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {partition_index}")
+
+    async def _create_partition_indexes(self, conn: asyncpg.Connection, remainder: int) -> None:
+        for index_name, column in SECONDARY_INDEXES.items():
+            await conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS {partition_table(index_name, remainder)}
+                ON {partition_table("title_principals", remainder)} ({column})
+                """)
+
+    async def _capture_changed_titles(self, conn: asyncpg.Connection) -> None:
+        """titles with new or recast credits, and the people credited before the merge"""
+        await conn.execute(f"""
+            CREATE TEMP TABLE changed_principal_titles AS
+            SELECT DISTINCT s.tconst
+            FROM {self.staging_table} s
+            LEFT JOIN title_principals p ON p.tconst = s.tconst AND p.ordering = s.ordering
+            WHERE
+                p.tconst IS NULL
+                OR p.nconst IS DISTINCT FROM s.nconst
+                OR p.category IS DISTINCT FROM {encode_sql("category", "s.category")}
+            """)
+        await conn.execute(f"""
+            CREATE TEMP TABLE {CHANGED_PEOPLE_TABLE} AS
+            SELECT p.nconst
+            FROM title_principals p
+            WHERE p.tconst IN (SELECT tconst FROM changed_principal_titles)
+            """)
+
+    async def _capture_changed_people(self, conn: asyncpg.Connection) -> None:
+        """add people credited on changed titles after the merge"""
+        await conn.execute(f"""
+            INSERT INTO {CHANGED_PEOPLE_TABLE} (nconst)
+            SELECT p.nconst
+            FROM title_principals p
+            WHERE p.tconst IN (SELECT tconst FROM changed_principal_titles)
+            """)
+        await conn.execute(f"ANALYZE {CHANGED_PEOPLE_TABLE}")
 
     async def _upsert_existing(self, conn: asyncpg.Connection) -> None:
+        await self._capture_changed_titles(conn)
+        await self._for_each_partition(self._upsert_partition)
+        await self._capture_changed_people(conn)
+
+    async def _upsert_partition(self, conn: asyncpg.Connection, remainder: int) -> None:
         await conn.execute(f"""
-            INSERT INTO title_principals (
+            INSERT INTO {partition_table("title_principals", remainder)} AS tp (
                 tconst,
                 ordering,
                 nconst,
@@ -91,7 +162,7 @@ class IngestTitlePrincipals(IngestDataset):
                 s.tconst,
                 s.ordering,
                 s.nconst,
-                s.category,
+                {encode_sql("category", "s.category")},
                 s.job,
                 CASE
                     WHEN s.characters IS NULL THEN NULL
@@ -100,7 +171,7 @@ class IngestTitlePrincipals(IngestDataset):
                         FROM jsonb_array_elements_text(s.characters::jsonb)
                     )
                 END
-            FROM {self.staging_table} s
+            FROM {partition_table(self.staging_table, remainder)} s
             WHERE EXISTS (
                 SELECT 1 FROM titles t WHERE t.tconst = s.tconst
             )
@@ -114,8 +185,8 @@ class IngestTitlePrincipals(IngestDataset):
                 job = EXCLUDED.job,
                 characters = EXCLUDED.characters
             WHERE
-                title_principals.nconst IS DISTINCT FROM EXCLUDED.nconst
-                OR title_principals.category IS DISTINCT FROM EXCLUDED.category
-                OR title_principals.job IS DISTINCT FROM EXCLUDED.job
-                OR title_principals.characters IS DISTINCT FROM EXCLUDED.characters;
+                tp.nconst IS DISTINCT FROM EXCLUDED.nconst
+                OR tp.category IS DISTINCT FROM EXCLUDED.category
+                OR tp.job IS DISTINCT FROM EXCLUDED.job
+                OR tp.characters IS DISTINCT FROM EXCLUDED.characters;
             """)
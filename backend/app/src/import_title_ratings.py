@@ -1,6 +1,12 @@
 """import title ratings"""
 
 import asyncpg
+from src.build_filmography import refresh_filmography_titles
+from src.build_leaderboards import build_leaderboards
+from src.build_rating_history import append_rating_history
+from src.build_rollups import refresh_rating_rollups
+from src.build_series_seasons import build_series_seasons
+from src.build_title_facets import build_title_facets
 from src.import_base import IngestDataset
 
 
@@ -8,6 +14,15 @@ class IngestTitleRatings(IngestDataset):
     """ingest dataset"""
 
     DATASET_NAME = "title.ratings.tsv"
+    TABLE_NAME = "title_ratings"
+    READ_MODELS = (
+        build_series_seasons,
+        refresh_filmography_titles,
+        build_leaderboards,
+        refresh_rating_rollups,
+        append_rating_history,
+        build_title_facets,
+    )
 
     async def create_staging_table(self, conn: asyncpg.Connection) -> None:
         await conn.execute(f"""
@@ -42,21 +57,26 @@ class IngestTitleRatings(IngestDataset):
             """)
 
     async def _upsert_existing(self, conn: asyncpg.Connection) -> None:
-        await conn.execute(f"""
-            INSERT INTO title_ratings (tconst, average_rating, num_votes)
-            SELECT
-                s.tconst,
-                s.average_rating,
-                s.num_votes
-            FROM {self.staging_table} s
-            WHERE EXISTS (
-                SELECT 1 FROM titles t WHERE t.tconst = s.tconst
-            )
-            ON CONFLICT (tconst) DO UPDATE
-            SET
-                average_rating = EXCLUDED.average_rating,
-                num_votes = EXCLUDED.num_votes
-            WHERE
-                title_ratings.average_rating IS DISTINCT FROM EXCLUDED.average_rating
-                OR title_ratings.num_votes IS DISTINCT FROM EXCLUDED.num_votes;
-            """)
+        await self._upsert_with_delta(
+            conn,
+            "title_ratings",
+            "tconst",
+            f"""
+                INSERT INTO title_ratings (tconst, average_rating, num_votes)
+                SELECT
+                    s.tconst,
+                    s.average_rating,
+                    s.num_votes
+                FROM {self.staging_table} s
+                WHERE EXISTS (
+                    SELECT 1 FROM titles t WHERE t.tconst = s.tconst
+                )
+                ON CONFLICT (tconst) DO UPDATE
+                SET
+                    average_rating = EXCLUDED.average_rating,
+                    num_votes = EXCLUDED.num_votes
+                WHERE
+                    title_ratings.average_rating IS DISTINCT FROM EXCLUDED.average_rating
+                    OR title_ratings.num_votes IS DISTINCT FROM EXCLUDED.num_votes
+                """,
+        )
@@ -0,0 +1,152 @@
+"""audit indexes for redundancy, usage and coverage of api lookups"""
+
+from datetime import datetime
+from typing import NamedTuple
+
+import asyncpg
+
+
+class IndexInfo(NamedTuple):
+    """index of a table, partitioned indexes summed over their partitions"""
+
+    table: str
+    name: str
+    method: str
+    columns: tuple[str, ...]
+    is_unique: bool
+    is_primary: bool
+    is_partial: bool
+    has_expressions: bool
+    size_bytes: int
+    scans: int
+
+
+class RouteLookup(NamedTuple):
+    """equality lookup an api route needs an index for"""
+
+    route: str
+    table: str
+    columns: tuple[str, ...]
+
+
+class IndexAudit(NamedTuple):
+    """findings of one audit run"""
+
+    indexes: list[IndexInfo]
+    redundant: list[tuple[IndexInfo, IndexInfo]]
+    unused: list[IndexInfo]
+    missing: list[RouteLookup]
+    stats_reset: datetime | None
+
+
+ROUTE_LOOKUPS: tuple[RouteLookup, ...] = (
+    RouteLookup("GET /api/titles", "title_ratings", ("tconst",)),
+    RouteLookup("GET /api/titles/{tconst}", "titles", ("tconst",)),
+    RouteLookup("GET /api/titles/{tconst}/principals", "title_principals", ("tconst",)),
+    RouteLookup("GET /api/titles/{tconst}/principals", "people", ("nconst",)),
+    RouteLookup("GET /api/titles/{tconst}/similar", "similar_titles", ("tconst",)),
+    RouteLookup("GET /api/titles/{tconst}/ratings-history", "rating_history", ("tconst",)),
+    RouteLookup("GET /api/people/{nconst}", "people", ("nconst",)),
+    RouteLookup("GET /api/people/{nconst}", "collaborators", ("nconst",)),
+    RouteLookup("GET /api/people/{nconst}/credits", "filmography", ("nconst",)),
+    RouteLookup("GET /api/series/{tconst}/episodes", "episodes", ("parent_tconst",)),
+    RouteLookup("GET /api/series/{tconst}/seasons", "series_seasons", ("parent_tconst",)),
+    RouteLookup("GET /api/leaderboards", "leaderboards", ("genre", "title_type", "decade")),
+    RouteLookup("GET /api/trending", "rating_history", ("tconst", "snapshot_date")),
+    RouteLookup("GET /api/export/episodes", "episodes", ("parent_tconst",)),
+    RouteLookup("GET /api/export/principals", "title_principals", ("nconst",)),
+)
+
+
+async def fetch_indexes(conn: asyncpg.Connection) -> list[IndexInfo]:
+    """indexes of public tables, partitions are folded into their parent"""
+    rows = await conn.fetch("""
+        SELECT
+            t.relname AS table,
+            i.relname AS name,
+            am.amname AS method,
+            ARRAY(
+                SELECT a.attname
+                FROM unnest(x.indkey::int2[]) WITH ORDINALITY AS k(attnum, position)
+                JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = k.attnum
+                WHERE k.position <= x.indnkeyatts
+                ORDER BY k.position
+            ) AS columns,
+            x.indisunique AS is_unique,
+            x.indisprimary AS is_primary,
+            x.indpred IS NOT NULL AS is_partial,
+            x.indexprs IS NOT NULL AS has_expressions,
+            tree.size_bytes,
+            tree.scans
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_class t ON t.oid = x.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        JOIN pg_am am ON am.oid = i.relam
+        CROSS JOIN LATERAL (
+            SELECT
+                COALESCE(SUM(pg_relation_size(p.relid)), 0)::bigint AS size_bytes,
+                COALESCE(SUM(s.idx_scan), 0)::bigint AS scans
+            FROM pg_partition_tree(x.indexrelid) p
+            LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = p.relid
+        ) tree
+        WHERE n.nspname = 'public' AND NOT t.relispartition AND NOT i.relispartition
+        ORDER BY t.relname, i.relname
+        """)
+    return [IndexInfo(**{**dict(row), "columns": tuple(row["columns"])}) for row in rows]  # type: ignore[arg-type]
+
+
+def find_redundant(indexes: list[IndexInfo]) -> list[tuple[IndexInfo, IndexInfo]]:
+    """non unique indexes whose columns lead another index of the same table and method"""
+    redundant: list[tuple[IndexInfo, IndexInfo]] = []
+    for index in indexes:
+        if index.is_unique or index.is_partial or index.has_expressions:
+            continue
+
+        for other in indexes:
+            if (
+                other.name != index.name
+                and other.table == index.table
+                and other.method == index.method
+                and not other.is_partial
+                and other.columns[: len(index.columns)] == index.columns
+                and (len(other.columns) > len(index.columns) or other.is_unique or other.name < index.name)
+            ):
+                redundant.append((index, other))
+                break
+
+    return redundant
+
+
+def find_unused(indexes: list[IndexInfo]) -> list[IndexInfo]:
+    """indexes never scanned since the statistics reset, constraint indexes excluded"""
+    return [index for index in indexes if not index.scans and not index.is_unique]
+
+
+def find_missing(indexes: list[IndexInfo]) -> list[RouteLookup]:
+    """route lookups without an index led by their columns"""
+    missing: list[RouteLookup] = []
+    for lookup in ROUTE_LOOKUPS:
+        covered = any(
+            index.table == lookup.table
+            and not index.is_partial
+            and set(index.columns[: len(lookup.columns)]) == set(lookup.columns)
+            for index in indexes
+        )
+        if not covered:
+            missing.append(lookup)
+
+    return missing
+
+
+async def audit_indexes(conn: asyncpg.Connection) -> IndexAudit:
+    """collect indexes and findings"""
+    indexes = await fetch_indexes(conn)
+    stats_reset = await conn.fetchval("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+    return IndexAudit(
+        indexes=indexes,
+        redundant=find_redundant(indexes),
+        unused=find_unused(indexes),
+        missing=find_missing(indexes),
+        stats_reset=stats_reset,
+    )
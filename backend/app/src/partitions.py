@@ -0,0 +1,50 @@
+"""hash partition helpers for large ingest tables"""
+
+import logging
+from time import perf_counter
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+HASH_PARTITIONS = 16
+PARTITIONED_TABLES: tuple[str, ...] = ("title_principals", "title_akas")
+
+
+def partition_table(table_name: str, remainder: int) -> str:
+    """name of hash partition with remainder"""
+    return f"{table_name}_p{remainder}"
+
+
+async def create_hash_partitions(
+    conn: asyncpg.Connection, table_name: str, partitions: int, unlogged: bool = False
+) -> None:
+    """create all hash partitions of a table partitioned by hash"""
+    table_kind = "UNLOGGED TABLE" if unlogged else "TABLE"
+    for remainder in range(partitions):
+        await conn.execute(f"""
+            CREATE {table_kind} IF NOT EXISTS {partition_table(table_name, remainder)}
+            PARTITION OF {table_name}
+            FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})
+            """)
+
+
+async def count_partitions(conn: asyncpg.Connection, table_name: str) -> int:
+    """number of partitions attached to table"""
+    return await conn.fetchval("SELECT COUNT(*) FROM pg_inherits WHERE inhparent = $1::regclass", table_name)
+
+
+async def vacuum_partitions(conn: asyncpg.Connection, table_name: str, remainders: list[int] | None = None) -> None:
+    """vacuum and analyze partitions one at a time, all partitions if remainders is None"""
+    partitions = await count_partitions(conn, table_name)
+    if not partitions:
+        raise ValueError(f"{table_name} is not partitioned")
+
+    for remainder in remainders if remainders is not None else range(partitions):
+        if not 0 <= remainder < partitions:
+            raise ValueError(f"{table_name} has no partition {remainder}, expected 0 to {partitions - 1}")
+
+        partition = partition_table(table_name, remainder)
+        start = perf_counter()
+        await conn.execute(f"VACUUM (ANALYZE) {partition}")
+        logger.info("vacuumed partition=%s duration=%.3fs", partition, perf_counter() - start)
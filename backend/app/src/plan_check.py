@@ -0,0 +1,192 @@
+"""explain canonical api queries and check their plans against expectations and a baseline"""
+
+import difflib
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+import asyncpg
+from api.params import CategoryParams, ListSeriesEpisodesParams, ListTitlesParams, SearchParams
+from api.people import person_credits_query
+from api.search import search_people_query, search_titles_query
+from api.series import series_episodes_query
+from api.titles import list_titles_query, title_principals_query
+from database import engine
+from dictionary import code_dictionary
+from sqlalchemy import Select
+from src.partitions import PARTITIONED_TABLES
+
+PLAN_BASELINE = Path(__file__).resolve().parent.parent / "plan_baseline.json"
+PARTITION_NAMES = re.compile(rf"\b({'|'.join(PARTITIONED_TABLES)})_p\d+")
+
+# tables too large to ever scan sequentially for a route
+LARGE_TABLES: tuple[str, ...] = (
+    "titles",
+    "people",
+    "title_ratings",
+    "episodes",
+    "title_akas",
+    "title_principals",
+    "filmography",
+)
+
+
+class PlanCase(NamedTuple):
+    """route query with representative parameters and plan expectations"""
+
+    name: str
+    build: Callable[[], Select]
+    max_cost: float
+    seq_scan_allowed: tuple[str, ...] = ()
+
+
+class PlanResult(NamedTuple):
+    """checked plan of a case"""
+
+    case: PlanCase
+    total_cost: float
+    shape: list[str]
+    violations: list[str]
+    diff: list[str]
+
+
+PLAN_CASES: tuple[PlanCase, ...] = (
+    PlanCase(
+        "list_titles_by_tconst",
+        lambda: list_titles_query(ListTitlesParams(), ["tt0111161", "tt0068646", "tt0903747"]),
+        max_cost=100,
+    ),
+    PlanCase(
+        "list_titles_filtered",
+        lambda: list_titles_query(ListTitlesParams(genre="Drama", title_type="movie", year_from=2000, min_rating=7)),
+        max_cost=50_000,
+        # no index on genres, the limit stops the scan early
+        seq_scan_allowed=("titles",),
+    ),
+    PlanCase(
+        "list_title_principals",
+        lambda: title_principals_query("tt0111161", CategoryParams()),
+        max_cost=500,
+    ),
+    PlanCase(
+        "list_title_principals_category",
+        lambda: title_principals_query("tt0111161", CategoryParams(category="actor")),
+        max_cost=500,
+    ),
+    PlanCase(
+        "list_person_credits",
+        lambda: person_credits_query("nm0000151", CategoryParams()),
+        max_cost=1_000,
+    ),
+    PlanCase(
+        "list_person_credits_category",
+        lambda: person_credits_query("nm0000151", CategoryParams(category="actor")),
+        max_cost=1_000,
+    ),
+    PlanCase(
+        "list_series_episodes",
+        lambda: series_episodes_query("tt0903747", ListSeriesEpisodesParams(season_number=1)),
+        max_cost=1_000,
+    ),
+    PlanCase(
+        "search_titles",
+        lambda: search_titles_query(SearchParams(q="godfather", title_type="movie")),
+        max_cost=500_000,
+        # substring search has no index, guard the cost only
+        seq_scan_allowed=("titles",),
+    ),
+    PlanCase(
+        "search_people",
+        lambda: search_people_query(SearchParams(q="freeman")),
+        max_cost=500_000,
+        seq_scan_allowed=("people",),
+    ),
+)
+
+
+def compile_sql(stmt: Select) -> str:
+    """statement as sql with inlined parameters"""
+    return str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _relation(node: dict[str, Any]) -> str | None:
+    """scanned table of node, partitions folded into their parent"""
+    relation = node.get("Relation Name")
+    return PARTITION_NAMES.sub(r"\1", relation) if relation else None
+
+
+def _walk(node: dict[str, Any], depth: int = 0) -> list[tuple[int, dict[str, Any]]]:
+    """plan nodes depth first"""
+    nodes = [(depth, node)]
+    for child in node.get("Plans", []):
+        nodes.extend(_walk(child, depth + 1))
+    return nodes
+
+
+def plan_shape(plan: dict[str, Any]) -> list[str]:
+    """one line per node with type, join type, index and table, costs left out to keep the baseline stable"""
+    shape: list[str] = []
+    for depth, node in _walk(plan):
+        line = node["Node Type"]
+        if "Join Type" in node:
+            line += f" ({node['Join Type']})"
+        if "Index Name" in node:
+            index_name = PARTITION_NAMES.sub(r"\1", node["Index Name"])
+            line += f" using {index_name}"
+        if relation := _relation(node):
+            line += f" on {relation}"
+        shape.append("  " * depth + line)
+    return shape
+
+
+def check_plan(case: PlanCase, plan: dict[str, Any]) -> list[str]:
+    """violated expectations of plan"""
+    violations: list[str] = []
+    for _, node in _walk(plan):
+        relation = _relation(node)
+        if node["Node Type"] == "Seq Scan" and relation in LARGE_TABLES and relation not in case.seq_scan_allowed:
+            violations.append(f"seq scan on {relation}")
+
+    if plan["Total Cost"] > case.max_cost:
+        violations.append(f"estimated cost {plan['Total Cost']:.0f} above ceiling {case.max_cost:.0f}")
+
+    return violations
+
+
+def load_baseline(path: Path) -> dict[str, list[str]]:
+    """stored plan shapes by case name"""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, results: list[PlanResult]) -> None:
+    """store plan shapes of results, keeping stored cases not in results"""
+    shapes = load_baseline(path)
+    shapes.update({result.case.name: result.shape for result in results})
+    path.write_text(json.dumps(shapes, indent=2) + "\n")
+
+
+async def check_plans(
+    conn: asyncpg.Connection, baseline: dict[str, list[str]], case_names: list[str] | None = None
+) -> list[PlanResult]:
+    """explain every case and compare with expectations and baseline"""
+    rows = await conn.fetch("SELECT domain, code, value FROM dictionary_codes")
+    code_dictionary.load(rows, generation=0)
+
+    results: list[PlanResult] = []
+    for case in PLAN_CASES:
+        if case_names and case.name not in case_names:
+            continue
+
+        explained = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {compile_sql(case.build())}")
+        plan = json.loads(explained)[0]["Plan"]
+        shape = plan_shape(plan)
+        diff: list[str] = []
+        if case.name in baseline:
+            diff = list(difflib.unified_diff(baseline[case.name], shape, "baseline", "current", lineterm=""))
+
+        results.append(PlanResult(case, plan["Total Cost"], shape, check_plan(case, plan), diff))
+
+    return results
@@ -0,0 +1,28 @@
+"""read model tables rebuilt into a shadow table and swapped in by rename"""
+
+import asyncpg
+
+
+def shadow_name(name: str) -> str:
+    """name of the shadow copy of a table or index"""
+    return f"{name}_new"
+
+
+async def create_shadow_table(conn: asyncpg.Connection, table_name: str) -> str:
+    """empty copy of table_name without indexes, filled in index order before its indexes are built"""
+    shadow_table = shadow_name(table_name)
+    await conn.execute(f"DROP TABLE IF EXISTS {shadow_table}")
+    await conn.execute(f"CREATE TABLE {shadow_table} (LIKE {table_name} INCLUDING DEFAULTS)")
+    return shadow_table
+
+
+async def swap_shadow_table(conn: asyncpg.Connection, table_name: str, index_names: tuple[str, ...]) -> None:
+    """
+    Replace table_name by its shadow table, and index_names by the shadow
+    indexes. Readers of the table only wait from the drop until the
+    transaction commits, not for the whole rebuild.
+    """
+    await conn.execute(f"DROP TABLE {table_name}")
+    await conn.execute(f"ALTER TABLE {shadow_name(table_name)} RENAME TO {table_name}")
+    for index_name in index_names:
+        await conn.execute(f"ALTER INDEX {shadow_name(index_name)} RENAME TO {index_name}")
@@ -0,0 +1,127 @@
+"""statement and pool timeout responses, cancellation of requests of disconnected clients"""
+
+import asyncio
+import logging
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from http_cache import route_path
+from metrics import metrics
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+QUERY_CANCELED_SQLSTATE = "57014"
+# nginx convention for a request closed by the client before the response
+CLIENT_CLOSED_STATUS = 499
+
+
+def is_statement_timeout(exc: DBAPIError) -> bool:
+    """statement cancelled by statement_timeout or a cancel request"""
+    for error in (exc.orig, getattr(exc.orig, "__cause__", None)):
+        if getattr(error, "sqlstate", None) == QUERY_CANCELED_SQLSTATE:
+            return True
+
+    return False
+
+
+async def statement_timeout_handler(request: Request, exc: Exception) -> Response:
+    """answer cancelled statements with 504, other database errors stay unhandled"""
+    if not isinstance(exc, DBAPIError) or not is_statement_timeout(exc):
+        raise exc
+
+    route = route_path(request)
+    metrics.db_timeouts.inc(route, "statement")
+    logger.warning("statement timeout route=%s", route)
+    return JSONResponse(status_code=504, content={"detail": "query exceeded its time budget"})
+
+
+async def pool_timeout_handler(request: Request, exc: Exception) -> Response:
+    """answer failed connection checkouts with 503"""
+    route = route_path(request)
+    metrics.db_timeouts.inc(route, "pool")
+    logger.warning("pool timeout route=%s: %s", route, exc)
+    return JSONResponse(
+        status_code=503, content={"detail": "no database connection available"}, headers={"Retry-After": "1"}
+    )
+
+
+EXCEPTION_HANDLERS = {
+    DBAPIError: statement_timeout_handler,
+    PoolTimeoutError: pool_timeout_handler,
+}
+
+
+class _DisconnectWatch:
+    """response progress and client disconnect of one request"""
+
+    def __init__(self, receive: Receive, send: Send) -> None:
+        self.receive = receive
+        self.send = send
+        self.messages: asyncio.Queue[Message] = asyncio.Queue()
+        self.response_started = False
+        self.response_complete = False
+        self.disconnected = False
+
+    async def send_tracked(self, message: Message) -> None:
+        """forward message to the client, tracking whether the response is complete"""
+        if message["type"] == "http.response.start":
+            self.response_started = True
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            self.response_complete = True
+
+        await self.send(message)
+
+    async def watch(self, handler: asyncio.Task) -> None:
+        """forward received messages to the handler, cancel it on a disconnect before the response completed"""
+        while True:
+            message = await self.receive()
+            self.messages.put_nowait(message)
+            if message["type"] == "http.disconnect":
+                if not self.response_complete:
+                    self.disconnected = True
+                    handler.cancel()
+                return
+
+
+class CancelOnDisconnectMiddleware:
+    """
+    Cancel the request handler when the client disconnects before the
+    response is complete. Cancelling an awaited asyncpg query sends a cancel
+    request to its backend, the same as pg_cancel_backend, and the session
+    returns the connection to the pool right away.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = _DisconnectWatch(receive, send)
+        handler = asyncio.create_task(self.app(scope, request.messages.get, request.send_tracked))
+        watcher = asyncio.create_task(request.watch(handler))
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not request.disconnected:
+                handler.cancel()
+                raise
+
+            await self._disconnected(scope, request)
+        finally:
+            watcher.cancel()
+
+    async def _disconnected(self, scope: Scope, request: _DisconnectWatch) -> None:
+        """count and log the cancelled request, answer it if no response was started"""
+        route = getattr(scope.get("route"), "path", "unmatched")
+        metrics.http_disconnects.inc(route)
+        logger.info("client disconnected, cancelled route=%s", route)
+        if not request.response_started:
+            # dropped by the server, lets outer middlewares record the request
+            await request.send({"type": "http.response.start", "status": CLIENT_CLOSED_STATUS, "headers": []})
+            await request.send({"type": "http.response.body", "body": b""})
@@ -24,6 +24,14 @@ const CATEGORY_FIELD: EndpointField = {
   placeholder: "actor",
 };
 
+const ENVELOPE_FIELD: EndpointField = {
+  key: "envelope",
+  label: "Envelope",
+  in: "query",
+  type: "text",
+  placeholder: "true",
+};
+
 function paginationFields(): EndpointField[] {
   return [{ ...PAGE_FIELD }, { ...SIZE_FIELD }];
 }
@@ -105,6 +113,7 @@ export const endpointConfigs: EndpointConfig[] = [
         type: "text",
         placeholder: "movie",
       },
+      { ...ENVELOPE_FIELD },
       ...paginationFields(),
     ],
   },
@@ -144,12 +153,46 @@ export const endpointConfigs: EndpointConfig[] = [
       ...paginationFields(),
     ],
   },
+  {
+    id: "title-similar",
+    title: "Similar Titles",
+    method: "GET",
+    path: "/api/titles/:tconst/similar",
+    description: "Precomputed most similar titles.",
+    fields: [
+      {
+        key: "tconst",
+        label: "tconst",
+        in: "path",
+        type: "text",
+        required: true,
+        placeholder: "tt0111161",
+      },
+    ],
+  },
+  {
+    id: "title-ratings-history",
+    title: "Title Ratings History",
+    method: "GET",
+    path: "/api/titles/:tconst/ratings-history",
+    description: "Rating and votes of a title over time.",
+    fields: [
+      {
+        key: "tconst",
+        label: "tconst",
+        in: "path",
+        type: "text",
+        required: true,
+        placeholder: "tt0111161",
+      },
+    ],
+  },
   {
     id: "person-detail",
     title: "Get Person",
     method: "GET",
     path: "/api/people/:nconst",
-    description: "Get one person by nconst.",
+    description: "Get one person by nconst with top collaborators.",
     fields: [
       {
         key: "nconst",
@@ -159,6 +202,13 @@ export const endpointConfigs: EndpointConfig[] = [
         required: true,
         placeholder: "nm0000209",
       },
+      {
+        key: "collaborators",
+        label: "Collaborators",
+        in: "query",
+        type: "number",
+        defaultValue: "10",
+      },
     ],
   },
   {
@@ -204,6 +254,23 @@ export const endpointConfigs: EndpointConfig[] = [
       ...paginationFields(),
     ],
   },
+  {
+    id: "series-seasons",
+    title: "Series Seasons",
+    method: "GET",
+    path: "/api/series/:tconst/seasons",
+    description: "Season summary for a series.",
+    fields: [
+      {
+        key: "tconst",
+        label: "Series tconst",
+        in: "path",
+        type: "text",
+        required: true,
+        placeholder: "tt0944947",
+      },
+    ],
+  },
   {
     id: "search-titles",
     title: "Search Titles",
@@ -227,6 +294,7 @@ export const endpointConfigs: EndpointConfig[] = [
         placeholder: "movie",
       },
       { key: "year_from", label: "Year From", in: "query", type: "number" },
+      { ...ENVELOPE_FIELD },
       ...paginationFields(),
     ],
   },
@@ -245,6 +313,208 @@ export const endpointConfigs: EndpointConfig[] = [
         required: true,
         placeholder: "keanu",
       },
+      { ...ENVELOPE_FIELD },
+      ...paginationFields(),
+    ],
+  },
+  {
+    id: "analytics-titles",
+    title: "Analytics: Titles",
+    method: "GET",
+    path: "/api/analytics/titles",
+    description: "Title counts grouped by start_year, title_type or genre.",
+    fields: [
+      {
+        key: "group_by",
+        label: "Group By",
+        in: "query",
+        type: "text",
+        defaultValue: "start_year",
+      },
+      {
+        key: "title_type",
+        label: "Title Type",
+        in: "query",
+        type: "text",
+        placeholder: "movie",
+      },
+      {
+        key: "genre",
+        label: "Genre",
+        in: "query",
+        type: "text",
+        placeholder: "Drama",
+      },
+      {
+        key: "year_from",
+        label: "Year From",
+        in: "query",
+        type: "number",
+      },
+      {
+        key: "year_to",
+        label: "Year To",
+        in: "query",
+        type: "number",
+      },
+    ],
+  },
+  {
+    id: "analytics-ratings",
+    title: "Analytics: Ratings",
+    method: "GET",
+    path: "/api/analytics/ratings",
+    description: "Rating histogram in steps of 0.1.",
+    fields: [],
+  },
+  {
+    id: "analytics-runtimes",
+    title: "Analytics: Runtimes",
+    method: "GET",
+    path: "/api/analytics/runtimes",
+    description: "Title counts per runtime in 10 minute buckets.",
+    fields: [
+      {
+        key: "title_type",
+        label: "Title Type",
+        in: "query",
+        type: "text",
+        placeholder: "movie",
+      },
+      {
+        key: "max_minutes",
+        label: "Max Minutes",
+        in: "query",
+        type: "number",
+      },
+    ],
+  },
+  {
+    id: "analytics-professions",
+    title: "Analytics: Professions",
+    method: "GET",
+    path: "/api/analytics/professions",
+    description: "People counts per profession.",
+    fields: [],
+  },
+  {
+    id: "leaderboards",
+    title: "Leaderboards",
+    method: "GET",
+    path: "/api/leaderboards",
+    description: "Top titles by weighted rating per genre, type and decade.",
+    fields: [
+      {
+        key: "genre",
+        label: "Genre",
+        in: "query",
+        type: "text",
+        placeholder: "Sci-Fi",
+      },
+      {
+        key: "title_type",
+        label: "Title Type",
+        in: "query",
+        type: "text",
+        placeholder: "movie",
+      },
+      {
+        key: "decade",
+        label: "Decade",
+        in: "query",
+        type: "number",
+        placeholder: "1980",
+      },
+      ...paginationFields(),
+    ],
+  },
+  {
+    id: "trending",
+    title: "Trending",
+    method: "GET",
+    path: "/api/trending",
+    description: "Titles with the largest vote gain or rating change.",
+    fields: [
+      {
+        key: "days",
+        label: "Days",
+        in: "query",
+        type: "number",
+        placeholder: "7",
+      },
+      {
+        key: "metric",
+        label: "Metric",
+        in: "query",
+        type: "text",
+        placeholder: "votes",
+      },
+      {
+        key: "min_votes",
+        label: "Min Votes",
+        in: "query",
+        type: "number",
+        placeholder: "1000",
+      },
+      ...paginationFields(),
+    ],
+  },
+  {
+    id: "graph-path",
+    title: "Collaboration Path",
+    method: "GET",
+    path: "/api/graph/path",
+    description: "Shortest connection between two people over shared titles.",
+    fields: [
+      {
+        key: "source",
+        label: "Source nconst",
+        in: "query",
+        type: "text",
+        required: true,
+        placeholder: "nm0000102",
+      },
+      {
+        key: "target",
+        label: "Target nconst",
+        in: "query",
+        type: "text",
+        required: true,
+        placeholder: "nm0000209",
+      },
+      {
+        key: "max_hops",
+        label: "Max Hops",
+        in: "query",
+        type: "number",
+        defaultValue: "6",
+      },
+      { ...CATEGORY_FIELD },
+    ],
+  },
+  {
+    id: "graph-neighborhood",
+    title: "Collaboration Neighborhood",
+    method: "GET",
+    path: "/api/graph/people/:nconst/neighborhood",
+    description: "People within a number of hops of a person.",
+    fields: [
+      {
+        key: "nconst",
+        label: "nconst",
+        in: "path",
+        type: "text",
+        required: true,
+        placeholder: "nm0000209",
+      },
+      {
+        key: "hops",
+        label: "Hops",
+        in: "query",
+        type: "number",
+        defaultValue: "1",
+      },
+      { ...CATEGORY_FIELD },
       ...paginationFields(),
     ],
   },